@@ -1,12 +1,14 @@
 import os
-import logging
 
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import DeclarativeBase
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+from logging_config import configure_logging
+
+# Configure logging once for the whole process (see logging_config for LOG_* variables)
+configure_logging()
 
 
 class Base(DeclarativeBase):
@@ -19,8 +21,8 @@ app = Flask(__name__)
 # Use a fixed secret key if environment variable is not set
 app.secret_key = os.environ.get("SESSION_SECRET", "a_secure_secret_key_for_coinex_trading_bot")
 
-# Configure the SQLite database
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///trading_bot.db"
+# Configure the database (SQLite unless DATABASE_URL is set)
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///trading_bot.db")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_recycle": 300,
@@ -35,5 +37,14 @@ with app.app_context():
     import models  # noqa: F401
     db.create_all()
 
+    # Create the configuration version row up front; changes only ever update it
+    if db.session.get(models.ConfigVersion, 1) is None:
+        db.session.add(models.ConfigVersion(id=1, version=0))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another worker process created it first
+            db.session.rollback()
+
 # Import routes after db has been initialized
 from routes import *  # noqa: F401, E402
@@ -0,0 +1,349 @@
+import os
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Dict, Generator, Iterable, List, Optional
+
+import ccxt.async_support as ccxt_async
+
+from candles import Candles
+from candle_store import CandleStore, candle_store as shared_candle_store
+from coinex_api import (CoinExAPI, ENDPOINT_WEIGHTS, LOG_EVERY, ORDER_ENDPOINTS, PRIORITY_ORDER,
+                        PRIORITY_UI, RATE_LIMIT_TIMEOUT, OHLCVRequest, OHLCVStoreMixin, rate_limiter)
+from market_cache import market_cache
+
+logger = logging.getLogger(__name__)
+
+
+async def gather_bounded(awaitables: Iterable[Awaitable], limit: int = 10,
+                         return_exceptions: bool = False) -> List:
+    """
+    Await several coroutines concurrently with at most limit running at once
+
+    Args:
+        awaitables: Coroutines to run
+        limit: Maximum number of coroutines in progress at the same time
+        return_exceptions: Return exceptions as results instead of raising the first one
+
+    Returns:
+        Results in the order of the given coroutines
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(awaitable: Awaitable):
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(*(run(awaitable) for awaitable in awaitables),
+                                return_exceptions=return_exceptions)
+
+
+class AsyncCoinExAPI(OHLCVStoreMixin):
+    """
+    Asyncio variant of CoinExAPI built on ccxt.async_support
+
+    Exposes the same methods as coroutines so requests for many pairs can
+    overlap their network waits. Must be used from a single event loop and
+    closed with close() (or used as an async context manager).
+    """
+
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 candle_store: Optional[CandleStore] = shared_candle_store,
+                 base_timeframe: Optional[str] = None, priority: int = PRIORITY_UI):
+        """
+        Initialize the async CoinEx API connection
+
+        Args:
+            api_key: API key for CoinEx
+            api_secret: API secret for CoinEx
+            candle_store: Local candle store consulted before fetching OHLCV data
+                (None to always fetch from the exchange)
+            base_timeframe: Timeframe fetched from the exchange from which higher
+                timeframes are resampled locally (defaults to OHLCV_BASE_TIMEFRAME or '1h')
+            priority: Rate-limit priority for non-order requests (PRIORITY_BOT or PRIORITY_UI)
+        """
+        self.api_key = api_key or os.environ.get('COINEX_API_KEY', '')
+        self.api_secret = api_secret or os.environ.get('COINEX_API_SECRET', '')
+        self.candle_store = candle_store
+        self.base_timeframe = base_timeframe or os.environ.get('OHLCV_BASE_TIMEFRAME', '1h')
+        self.priority = priority
+        self._resamplers = {}
+        self._resamplers_lock = threading.Lock()
+
+        # Requests are throttled by the rate_limiter shared with the synchronous clients
+        self.exchange = ccxt_async.coinex({
+            'apiKey': self.api_key,
+            'secret': self.api_secret,
+            'enableRateLimit': False,
+        })
+
+        self.authenticated = bool(self.api_key and self.api_secret)
+        market_cache.attach(self.exchange)
+
+    async def close(self) -> None:
+        """Close the underlying HTTP session"""
+        await self.exchange.close()
+
+    async def __aenter__(self) -> "AsyncCoinExAPI":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _request(self, endpoint: str, *args, **kwargs):
+        """
+        Call an exchange endpoint once the shared rate limiter allows it
+
+        Args:
+            endpoint: Name of the CCXT method (e.g., 'fetch_ohlcv')
+            *args: Positional arguments for the method
+            **kwargs: Keyword arguments for the method
+
+        Returns:
+            Result of the CCXT coroutine
+        """
+        priority = PRIORITY_ORDER if endpoint in ORDER_ENDPOINTS else self.priority
+        # The limiter blocks, so wait for it on a worker thread
+        await asyncio.to_thread(rate_limiter.acquire, ENDPOINT_WEIGHTS.get(endpoint, 1), priority,
+                                RATE_LIMIT_TIMEOUT)
+        return await getattr(self.exchange, endpoint)(*args, **kwargs)
+
+    async def get_markets(self) -> List[Dict]:
+        """
+        Get all available markets from CoinEx
+
+        Returns:
+            List of market dictionaries
+        """
+        try:
+            markets = []
+            # Only blocks on a cold start without a snapshot
+            for symbol, market in (await asyncio.to_thread(market_cache.get_markets)).items():
+                # Filter for spot markets only
+                if market['spot']:
+                    markets.append({
+                        'symbol': symbol,
+                        'base': market['base'],
+                        'quote': market['quote'],
+                        'active': market['active'],
+                        'precision': market['precision'],
+                        'limits': market['limits'],
+                    })
+            return markets
+        except Exception as e:
+            logger.error(f"Error getting markets: {str(e)}")
+            return []
+
+    async def get_ticker(self, symbol: str) -> Dict:
+        """
+        Get current ticker for a specific symbol
+
+        Args:
+            symbol: Trading pair symbol (e.g., 'BTC/USDT')
+
+        Returns:
+            Ticker information
+        """
+        try:
+            ccxt_symbol = CoinExAPI._to_ccxt_symbol(symbol)
+            logger.debug(f"Getting ticker for {symbol} (CCXT format: {ccxt_symbol})", extra={'every': LOG_EVERY})
+            return await self._request('fetch_ticker', ccxt_symbol)
+        except Exception as e:
+            logger.error(f"Error getting ticker for {symbol}: {str(e)}")
+            return {}
+
+    async def get_tickers(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Get current tickers for several symbols in a single request
+
+        Args:
+            symbols: Trading pair symbols (e.g., ['BTC/USDT', 'ETH/USDT'])
+
+        Returns:
+            Ticker information keyed by the symbols as given
+        """
+        if not symbols:
+            return {}
+
+        try:
+            ccxt_symbols = {symbol: CoinExAPI._to_ccxt_symbol(symbol) for symbol in symbols}
+            logger.debug(f"Getting tickers for {len(ccxt_symbols)} symbols", extra={'every': LOG_EVERY})
+            tickers = await self._request('fetch_tickers', sorted(set(ccxt_symbols.values())))
+            return {
+                symbol: tickers[ccxt_symbol]
+                for symbol, ccxt_symbol in ccxt_symbols.items()
+                if ccxt_symbol in tickers
+            }
+        except Exception as e:
+            logger.error(f"Error getting tickers: {str(e)}")
+            return {}
+
+    async def get_balance(self) -> Dict:
+        """
+        Get account balance
+
+        Returns:
+            Balance information
+        """
+        if not self.authenticated:
+            logger.error("API credentials required for balance check")
+            return {}
+
+        try:
+            return await self._request('fetch_balance')
+        except Exception as e:
+            logger.error(f"Error getting balance: {str(e)}")
+            return {}
+
+    async def get_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> Candles:
+        """
+        Get OHLCV (candlestick) data
+
+        Args:
+            symbol: Trading pair symbol (e.g., 'BTC/USDT')
+            timeframe: Timeframe for candles ('1m', '5m', '15m', '1h', '4h', '1d', etc.)
+            limit: Number of candles to retrieve
+
+        Returns:
+            Columnar OHLCV candles (empty on error)
+        """
+        try:
+            ccxt_symbol = CoinExAPI._to_ccxt_symbol(symbol)
+            logger.debug(f"Getting OHLCV for {symbol} (CCXT format: {ccxt_symbol})", extra={'every': LOG_EVERY})
+            return await self._run_steps(self._ohlcv_steps(ccxt_symbol, timeframe, limit))
+        except Exception as e:
+            logger.error(f"Error getting OHLCV data for {symbol}: {str(e)}")
+            return Candles()
+
+    async def get_ohlcv_many(self, symbols: List[str], timeframe: str = '1h', limit: int = 100,
+                             concurrency: int = 10, timeout: Optional[float] = None) -> Dict[str, Optional[Candles]]:
+        """
+        Get OHLCV data for several symbols concurrently
+
+        Args:
+            symbols: Trading pair symbols
+            timeframe: Timeframe for candles
+            limit: Number of candles to retrieve per symbol
+            concurrency: Maximum number of requests in flight
+            timeout: Seconds each symbol may take once started (no limit if None)
+
+        Returns:
+            Candles keyed by symbol (empty candles for symbols that failed,
+            None for symbols that timed out)
+        """
+        async def fetch(symbol: str) -> Optional[Candles]:
+            try:
+                return await asyncio.wait_for(self.get_ohlcv(symbol, timeframe, limit), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"OHLCV fetch for {symbol} {timeframe} timed out after {timeout}s")
+                return None
+
+        results = await gather_bounded((fetch(symbol) for symbol in symbols), limit=concurrency)
+        return dict(zip(symbols, results))
+
+    async def _run_steps(self, steps: Generator[OHLCVRequest, Any, Any]) -> Any:
+        """
+        Run OHLCVStoreMixin steps, awaiting each request
+
+        The code between requests reads and writes the candle store, which
+        blocks on file I/O, so it runs on a worker thread.
+
+        Args:
+            steps: Generator returned by one of the *_steps methods
+
+        Returns:
+            Result of the steps
+        """
+        done, value = await asyncio.to_thread(self._advance, steps)
+        while not done:
+            args, kwargs = value
+            ohlcv = await self._request('fetch_ohlcv', *args, **kwargs)
+            done, value = await asyncio.to_thread(self._advance, steps, ohlcv)
+        return value
+
+    async def create_order(self, symbol: str, order_type: str, side: str,
+                           amount: float, price: Optional[float] = None) -> Dict:
+        """
+        Create a new order
+
+        Args:
+            symbol: Trading pair symbol (e.g., 'BTC/USDT')
+            order_type: Type of order ('limit' or 'market')
+            side: Order side ('buy' or 'sell')
+            amount: Order amount
+            price: Order price (required for limit orders)
+
+        Returns:
+            Order information
+        """
+        if not self.authenticated:
+            logger.error("API credentials required for creating orders")
+            return {}
+
+        try:
+            return await self._request('create_order', symbol, order_type, side, amount, price)
+        except Exception as e:
+            logger.error(f"Error creating order: {str(e)}")
+            return {}
+
+    async def cancel_order(self, order_id: str, symbol: str) -> Dict:
+        """
+        Cancel an existing order
+
+        Args:
+            order_id: ID of the order to cancel
+            symbol: Trading pair symbol (e.g., 'BTC/USDT')
+
+        Returns:
+            Result of the cancellation
+        """
+        if not self.authenticated:
+            logger.error("API credentials required for cancelling orders")
+            return {}
+
+        try:
+            return await self._request('cancel_order', order_id, symbol)
+        except Exception as e:
+            logger.error(f"Error cancelling order {order_id}: {str(e)}")
+            return {}
+
+    async def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict]:
+        """
+        Get open orders
+
+        Args:
+            symbol: Trading pair symbol (optional)
+
+        Returns:
+            List of open orders
+        """
+        if not self.authenticated:
+            logger.error("API credentials required for getting open orders")
+            return []
+
+        try:
+            return await self._request('fetch_open_orders', symbol=symbol)
+        except Exception as e:
+            logger.error(f"Error getting open orders: {str(e)}")
+            return []
+
+    async def get_order_history(self, symbol: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """
+        Get order history
+
+        Args:
+            symbol: Trading pair symbol (optional)
+            limit: Maximum number of orders to retrieve
+
+        Returns:
+            List of historical orders
+        """
+        if not self.authenticated:
+            logger.error("API credentials required for getting order history")
+            return []
+
+        try:
+            return await self._request('fetch_closed_orders', symbol=symbol, limit=limit)
+        except Exception as e:
+            logger.error(f"Error getting order history: {str(e)}")
+            return []
@@ -1,22 +1,42 @@
 import os
 import time
+import asyncio
 import logging
 import threading
 import datetime
 from typing import Dict, List, Optional, Tuple
 
 from app import app, db
-from models import TradingPair, TradingStrategy, Trade, BotSettings
-from coinex_api import CoinExAPI
-from trading_strategies import get_strategy_by_name
+from models import Trade
+from coinex_api import CoinExAPI, PRIORITY_BOT, market_stream
+from async_coinex_api import AsyncCoinExAPI
+from scheduler import CandleCloseScheduler, can_schedule
+from execution import create_execution_pool
+from trading_strategies import strategy_registry
+from config_snapshot import ConfigSnapshot, config_store
 
-# Configure logging
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-handler = logging.StreamHandler()
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+
+# Timeframe of strategies that do not set one in their parameters
+DEFAULT_TIMEFRAME = '1h'
+
+# Seconds to wait after a candle closes before evaluating its strategies
+CANDLE_GRACE = float(os.environ.get('BOT_CANDLE_GRACE', 2))
+
+# Seconds before a candle close whose evaluation failed is tried again
+CANDLE_RETRY_DELAY = float(os.environ.get('BOT_CANDLE_RETRY_DELAY', 10))
+
+# Longest wait between iterations, so new strategies and settings are picked up
+MAX_IDLE_WAIT = 30.0
+
+# Seconds between warnings about strategies on timeframes the scheduler cannot run
+UNSUPPORTED_LOG_EVERY = 3600.0
+
+
+def strategy_timeframe(strategy) -> str:
+    """Get the candle timeframe a strategy runs on"""
+    return (strategy.parameters or {}).get('timeframe', DEFAULT_TIMEFRAME)
+
 
 class TradingBot:
     """
@@ -28,19 +48,23 @@ class TradingBot:
         self.settings = None
         self.is_running = False
         self.thread = None
-        self.last_check_time = {}  # Store last check time for each trading pair
+        self.scheduler = CandleCloseScheduler(CANDLE_GRACE, CANDLE_RETRY_DELAY)  # Next candle close per (symbol, timeframe)
+        self._wakeup = threading.Event()  # Set to interrupt the wait between iterations
         self.daily_trades = {}  # Store count of daily trades for each trading pair
+        self.loop = None  # Event loop of the bot thread, used for concurrent fetching
+        self.async_api = None
+        self.executor = None  # Thread/process pools for fetching and signal computation
     
     def initialize(self):
         """Initialize the bot with settings from the database"""
         with app.app_context():
-            self.settings = db.session.query(BotSettings).first()
+            self.settings = config_store.current().settings
             if not self.settings:
                 logger.warning("No settings found in database. Bot cannot start.")
                 return False
             
             # Initialize API with stored credentials
-            self.api = CoinExAPI(self.settings.api_key, self.settings.api_secret)
+            self.api = CoinExAPI(self.settings.api_key, self.settings.api_secret, priority=PRIORITY_BOT)
             
             # Check if API is properly initialized
             if not self.api.authenticated:
@@ -61,6 +85,7 @@ class TradingBot:
             return False
         
         self.is_running = True
+        self._wakeup.clear()
         self.thread = threading.Thread(target=self._run_bot)
         self.thread.daemon = True
         self.thread.start()
@@ -75,6 +100,7 @@ class TradingBot:
             return False
         
         self.is_running = False
+        self._wakeup.set()
         if self.thread:
             self.thread.join(timeout=5.0)
         
@@ -83,92 +109,234 @@ class TradingBot:
     
     def _run_bot(self):
         """Main bot loop that runs in a separate thread"""
+        self.loop = asyncio.new_event_loop()
+        try:
+            self._run_loop()
+        finally:
+            if self.async_api:
+                self.loop.run_until_complete(self.async_api.close())
+                self.async_api = None
+            if self.executor:
+                self.executor.shutdown()
+                self.executor = None
+            self.loop.close()
+            self.loop = None
+    
+    def _run_loop(self):
+        """Run bot iterations until stopped, waking when the next candle closes"""
         while self.is_running:
+            wait = MAX_IDLE_WAIT
             try:
                 with app.app_context():
-                    # Reload settings to get the latest configuration
-                    self.settings = db.session.query(BotSettings).first()
+                    # Get the latest configuration; this only queries the database
+                    # when the configuration version changed
+                    config = config_store.current()
+                    self.settings = config.settings
                     
                     # If bot is disabled in settings, pause execution
                     if not self.settings or not self.settings.is_active:
                         logger.info("Bot is disabled in settings. Pausing execution.")
-                        time.sleep(30)  # Check again after 30 seconds
+                        self._wakeup.wait(30)  # Check again after 30 seconds
                         continue
                     
-                    # Process active strategies
-                    self._process_strategies()
+                    # Process strategies whose candles closed
+                    self._process_strategies(config)
+                    
+                    next_due = self.scheduler.next_due()
+                    if next_due is not None:
+                        wait = min(MAX_IDLE_WAIT, max(0.0, next_due - time.time()))
                     
             except Exception as e:
-                logger.error(f"Error in bot main loop: {str(e)}")
+                logger.error("Error in bot main loop: %s", e)
             
-            # Sleep before the next iteration
-            time.sleep(60)  # Run every minute
+            # Sleep until the next candle close, waking early to pick up new strategies
+            self._wakeup.wait(wait)
     
-    def _process_strategies(self):
-        """Process all active trading strategies"""
+    def _process_strategies(self, config: Optional[ConfigSnapshot] = None):
+        """Process the active trading strategies whose candle has closed"""
         # Reset daily trades counter if it's a new day
         self._reset_daily_trades_if_needed()
         
-        # Get all active strategies
-        active_strategies = db.session.query(TradingStrategy).filter_by(is_active=True).all()
+        # Active strategies with their trading pairs, from the configuration snapshot
+        active_strategies = (config or config_store.current()).strategies
         
         if not active_strategies:
             logger.info("No active strategies found")
             return
         
-        logger.info(f"Processing {len(active_strategies)} active strategies")
+        # Keep live market data streaming for all active pairs
+        active_symbols = sorted({s.trading_pair.symbol for s in active_strategies if s.trading_pair})
+        market_stream.watch(active_symbols)
         
-        for strategy in active_strategies:
-            try:
-                # Get the trading pair for this strategy
-                trading_pair = db.session.query(TradingPair).get(strategy.trading_pair_id)
-                
-                if not trading_pair or not trading_pair.is_active:
-                    logger.warning(f"Strategy {strategy.id} skipped - trading pair inactive or not found")
-                    continue
-                
-                # Check if we've exceeded daily trade limit for this pair
-                pair_key = f"{trading_pair.id}_{datetime.date.today().isoformat()}"
-                if self.daily_trades.get(pair_key, 0) >= self.settings.max_daily_trades:
-                    logger.info(f"Daily trade limit reached for {trading_pair.symbol}")
-                    continue
-                
-                # Check if enough time has passed since the last check for this pair
-                pair_time_key = f"{trading_pair.id}_last_check"
-                last_check = self.last_check_time.get(pair_time_key, 0)
-                current_time = time.time()
-                
-                # Only check each pair every 5 minutes to avoid excessive API calls
-                if current_time - last_check < 300:  # 5 minutes in seconds
-                    continue
-                
-                self.last_check_time[pair_time_key] = current_time
-                
-                # Get market data for the trading pair
-                ohlcv_data = self.api.get_ohlcv(trading_pair.symbol, timeframe='1h', limit=100)
-                
-                if not ohlcv_data:
-                    logger.warning(f"No OHLCV data available for {trading_pair.symbol}")
-                    continue
-                
-                # Create the strategy instance
-                strategy_instance = get_strategy_by_name(strategy.strategy_type, strategy.parameters)
-                
-                if not strategy_instance:
-                    logger.error(f"Failed to create strategy instance for {strategy.name}")
-                    continue
-                
-                # Get the trading signal
-                signal = strategy_instance.get_signal(ohlcv_data)
-                
-                logger.info(f"Strategy {strategy.name} ({trading_pair.symbol}): Signal = {signal}")
+        # Release cached instances of strategies that were deactivated or deleted
+        strategy_registry.retain(s.id for s in active_strategies)
+        
+        # Schedule every (symbol, timeframe) with an active strategy and take the due ones
+        # Weekly and monthly timeframes have no fixed candle length, so they are skipped
+        now = time.time()
+        keys = {(s.trading_pair.symbol, strategy_timeframe(s)) for s in active_strategies if s.trading_pair}
+        unsupported = sorted(key for key in keys if not can_schedule(key[1]))
+        if unsupported:
+            logger.warning("Not running strategies on %s - timeframes must divide a day",
+                           unsupported, extra={'every': UNSUPPORTED_LOG_EVERY})
+        self.scheduler.sync(keys.difference(unsupported), now)
+        due = set(self.scheduler.pop_due(now))
+        due_strategies = [s for s in active_strategies
+                          if s.trading_pair and (s.trading_pair.symbol, strategy_timeframe(s)) in due]
+        
+        if not due_strategies:
+            return
+        
+        logger.info("Processing %d strategies on %d closed candles", len(due_strategies), len(due))
+        
+        # Tickers for all active pairs, read from the stream (or fetched in one request)
+        # when the first trade is due
+        tickers = None
+        
+        # Group due strategies by (trading pair, timeframe) so each candle series is
+        # fetched and analyzed once and fanned out to every strategy on it
+        groups = {}
+        for strategy in due_strategies:
+            groups.setdefault((strategy.trading_pair_id, strategy_timeframe(strategy)), []).append(strategy)
+        
+        if self.executor is None:
+            self.executor = create_execution_pool()
+        
+        # Skip groups on inactive or exhausted pairs
+        today = datetime.date.today().isoformat()
+        trading_pairs = {}
+        for (trading_pair_id, timeframe), strategies in groups.items():
+            trading_pair = strategies[0].trading_pair
+            if not trading_pair or not trading_pair.is_active:
+                logger.warning("Strategies %s skipped - trading pair inactive or not found",
+                               [s.id for s in strategies])
+                continue
+            if self.daily_trades.get(f"{trading_pair.id}_{today}", 0) >= self.settings.max_daily_trades:
+                logger.info("Daily trade limit reached for %s", trading_pair.symbol)
+                continue
+            trading_pairs[(trading_pair_id, timeframe)] = trading_pair
+        
+        # Fetch candles for all due pairs concurrently, retrying failed pairs
+        # on the I/O threads with a deadline. Pairs whose fetch timed out are not
+        # tried again here; they fail and the scheduler retries them
+        prefetched = self._prefetch_ohlcv(self._prefetch_keys(due_strategies))
+        candles = {}
+        fallback = {}
+        for key, trading_pair in trading_pairs.items():
+            if (trading_pair.symbol, key[1]) in prefetched:
+                candles[key] = prefetched[(trading_pair.symbol, key[1])]
+            else:
+                fallback[key] = (trading_pair.symbol, key[1], 100)
+        candles.update(self.executor.map_io(self.api.get_ohlcv, fallback))
+        
+        # Compute the signals of each group, in worker processes if configured
+        tasks = {}
+        for key, trading_pair in trading_pairs.items():
+            ohlcv_data = candles.get(key)
+            # Signals are taken on closed candles only; drop the candle that opened
+            # at the close being handled
+            if ohlcv_data and ohlcv_data.timestamp[-1] >= self.scheduler.last_close(key[1], now) * 1000:
+                ohlcv_data = candles[key] = ohlcv_data[:-1]
+            if not ohlcv_data:
+                logger.warning("No OHLCV data available for %s", trading_pair.symbol)
+                continue
+            tasks[key] = (ohlcv_data, trading_pair.symbol, key[1],
+                          [(s.id, s.updated_at, s.strategy_type, dict(s.parameters)) for s in groups[key]])
+        signals = self.executor.evaluate(tasks)
+        
+        # Groups whose fetch or evaluation failed are tried again shortly instead
+        # of waiting for their next candle close
+        failed = [(trading_pairs[key].symbol, key[1]) for key in trading_pairs if key not in signals]
+        if failed:
+            logger.warning("Retrying %d closed candles in %ss", len(failed), self.scheduler.retry_delay)
+            self.scheduler.retry(failed, now)
+        
+        # Execute trades on this thread, which owns the database session
+        for key, group_signals in signals.items():
+            trading_pair = trading_pairs[key]
+            timeframe = key[1]
+            pair_key = f"{trading_pair.id}_{today}"
+            for strategy, signal in zip(groups[key], group_signals):
+                try:
+                    if signal is None:
+                        logger.error("Failed to create strategy instance for %s", strategy.name)
+                        continue
+                    
+                    logger.info("Strategy %s (%s %s): Signal = %s", strategy.name, trading_pair.symbol, timeframe, signal)
+                    
+                    if signal not in ['BUY', 'SELL']:
+                        continue
+                    
+                    # Check if we've exceeded daily trade limit for this pair
+                    if self.daily_trades.get(pair_key, 0) >= self.settings.max_daily_trades:
+                        logger.info("Daily trade limit reached for %s", trading_pair.symbol)
+                        break
+                    
+                    if tickers is None:
+                        tickers = market_stream.get_tickers(active_symbols, fallback=self.api.get_tickers)
+                    
+                    # Prefer the live price, falling back to the latest candle close
+                    current_price = (tickers.get(trading_pair.symbol, {}).get('last')
+                                     or float(candles[key].close[-1]))
+                    self._execute_trade(strategy, trading_pair, signal, float(current_price))
                 
-                # Execute trades based on the signal
-                if signal in ['BUY', 'SELL']:
-                    self._execute_trade(strategy, trading_pair, signal, ohlcv_data[-1]['close'])
+                except Exception as e:
+                    logger.error("Error processing strategy %s: %s", strategy.id, e)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            # stats() takes the executor lock, so skip it unless it is logged
+            logger.debug("Execution stages: %s", self.executor.stats()['stages'])
+    
+    def _prefetch_keys(self, strategies) -> List[Tuple[str, str]]:
+        """Get (symbol, timeframe) pairs of the strategies that will be checked in this cycle"""
+        today = datetime.date.today().isoformat()
+        keys = set()
+        
+        for strategy in strategies:
+            trading_pair = strategy.trading_pair
+            if not trading_pair or not trading_pair.is_active:
+                continue
+            if self.daily_trades.get(f"{trading_pair.id}_{today}", 0) >= self.settings.max_daily_trades:
+                continue
+            keys.add((trading_pair.symbol, strategy_timeframe(strategy)))
+        
+        return sorted(keys)
+    
+    def _prefetch_ohlcv(self, keys: List[Tuple[str, str]]) -> Dict:
+        """
+        Fetch candles for several (symbol, timeframe) pairs concurrently on the bot thread's event loop
+
+        Each pair may take the execution pool's task timeout; pairs that time
+        out map to None and pairs that failed otherwise are left out.
+        """
+        if not keys or self.loop is None:
+            return {}
+        
+        symbols_by_timeframe = {}
+        for symbol, timeframe in keys:
+            symbols_by_timeframe.setdefault(timeframe, []).append(symbol)
+        
+        try:
+            if self.async_api is None:
+                self.async_api = AsyncCoinExAPI(self.settings.api_key, self.settings.api_secret,
+                                                priority=PRIORITY_BOT)
+            timeframes = list(symbols_by_timeframe)
             
-            except Exception as e:
-                logger.error(f"Error processing strategy {strategy.id}: {str(e)}")
+            async def fetch_all():
+                return await asyncio.gather(*(
+                    self.async_api.get_ohlcv_many(symbols_by_timeframe[timeframe], timeframe, 100,
+                                                  timeout=self.executor.task_timeout)
+                    for timeframe in timeframes
+                ))
+            
+            results = self.loop.run_until_complete(fetch_all())
+            # Leave failed pairs to the synchronous client
+            return {(symbol, timeframe): candles
+                    for timeframe, prefetched in zip(timeframes, results)
+                    for symbol, candles in prefetched.items() if candles is None or len(candles)}
+        except Exception as e:
+            logger.error("Error prefetching OHLCV data: %s", e)
+            return {}
     
     def _execute_trade(self, strategy, trading_pair, signal, current_price):
         """Execute a trade based on the strategy signal"""
@@ -176,7 +344,7 @@ class TradingBot:
         pair_key = f"{trading_pair.id}_{datetime.date.today().isoformat()}"
         
         if self.daily_trades.get(pair_key, 0) >= self.settings.max_daily_trades:
-            logger.info(f"Daily trade limit reached for {trading_pair.symbol}")
+            logger.info("Daily trade limit reached for %s", trading_pair.symbol)
             return
         
         try:
@@ -197,7 +365,7 @@ class TradingBot:
             if signal == 'BUY':
                 currency = trading_pair.quote_currency
                 if currency not in balance:
-                    logger.warning(f"No {currency} balance available for buying")
+                    logger.warning("No %s balance available for buying", currency)
                     return
                 
                 available_balance = float(balance[currency]['free'])
@@ -207,14 +375,14 @@ class TradingBot:
             else:  # SELL
                 currency = trading_pair.base_currency
                 if currency not in balance:
-                    logger.warning(f"No {currency} balance available for selling")
+                    logger.warning("No %s balance available for selling", currency)
                     return
                 
                 available_balance = float(balance[currency]['free'])
                 trade_amount = min(available_balance * 0.1, self.settings.max_trade_size / current_price)
             
             if trade_amount <= 0:
-                logger.warning(f"Calculated trade amount is zero or negative: {trade_amount}")
+                logger.warning("Calculated trade amount is zero or negative: %s", trade_amount)
                 return
             
             # Create order
@@ -228,7 +396,7 @@ class TradingBot:
             )
             
             if not order:
-                logger.error(f"Failed to create {signal} order for {trading_pair.symbol}")
+                logger.error("Failed to create %s order for %s", signal, trading_pair.symbol)
                 return
             
             # Record the trade in the database
@@ -249,10 +417,10 @@ class TradingBot:
             # Update daily trades counter
             self.daily_trades[pair_key] = self.daily_trades.get(pair_key, 0) + 1
             
-            logger.info(f"Successfully executed {signal} order for {trading_pair.symbol}")
+            logger.info("Successfully executed %s order for %s", signal, trading_pair.symbol)
             
         except Exception as e:
-            logger.error(f"Error executing trade: {str(e)}")
+            logger.error("Error executing trade: %s", e)
     
     def _reset_daily_trades_if_needed(self):
         """Reset daily trades counter if it's a new day"""
@@ -0,0 +1,241 @@
+import os
+import threading
+import numpy as np
+from typing import Optional
+
+from candles import Candles, PRICE_COLUMNS
+
+# One fixed-size binary record per candle
+RECORD_DTYPE = np.dtype([('timestamp', '<i8')] + [(name, '<f8') for name in PRICE_COLUMNS])
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'candles')
+
+
+class CandleStore:
+    """
+    Append-only on-disk candle store
+
+    Candles are kept in one binary file of fixed-size records per
+    (symbol, timeframe), sorted by timestamp. New candles are appended; a
+    candle with the same timestamp as the last stored one (the still-forming
+    candle) overwrites it in place. Older history can be prepended with
+    backfill(). Reads fetch only the requested tail of the file.
+
+    The store also remembers, in memory, when the first stored candle is
+    the start of the exchange's history, so callers stop asking for older
+    candles that do not exist.
+    """
+
+    def __init__(self, directory: str = DEFAULT_STORE_DIR):
+        """
+        Initialize the candle store
+
+        Args:
+            directory: Directory holding the candle files (created on first write)
+        """
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._history_start = {}  # (symbol, timeframe) -> first timestamp with no older candles
+
+    def _path(self, symbol: str, timeframe: str) -> str:
+        """Get the file path for a symbol and timeframe"""
+        safe_symbol = symbol.replace('/', '_').replace(':', '_')
+        return os.path.join(self.directory, safe_symbol, f"{timeframe}.bin")
+
+    @staticmethod
+    def _to_records(candles: Candles) -> np.ndarray:
+        """Convert candles to a structured record array"""
+        records = np.empty(len(candles), dtype=RECORD_DTYPE)
+        records['timestamp'] = candles.timestamp
+        for name in PRICE_COLUMNS:
+            records[name] = candles.column(name)
+        return records
+
+    @staticmethod
+    def _to_candles(records: np.ndarray) -> Candles:
+        """Convert a structured record array to candles"""
+        return Candles(records['timestamp'], *(records[name] for name in PRICE_COLUMNS))
+
+    def count(self, symbol: str, timeframe: str) -> int:
+        """
+        Get the number of stored candles
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Candle timeframe
+
+        Returns:
+            Number of complete records in the file
+        """
+        path = self._path(symbol, timeframe)
+        if not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // RECORD_DTYPE.itemsize
+
+    def _read_record(self, symbol: str, timeframe: str, index: int) -> Optional[np.void]:
+        """Read a single record, negative indices counting from the end"""
+        count = self.count(symbol, timeframe)
+        if not count:
+            return None
+        if index < 0:
+            index += count
+        records = np.fromfile(self._path(symbol, timeframe), dtype=RECORD_DTYPE, count=1,
+                              offset=index * RECORD_DTYPE.itemsize)
+        return records[0] if len(records) else None
+
+    def first_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        """
+        Get the timestamp of the oldest stored candle
+
+        Returns:
+            Timestamp in milliseconds or None if nothing is stored
+        """
+        with self._lock:
+            record = self._read_record(symbol, timeframe, 0)
+            return int(record['timestamp']) if record is not None else None
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        """
+        Get the timestamp of the newest stored candle
+
+        Returns:
+            Timestamp in milliseconds or None if nothing is stored
+        """
+        with self._lock:
+            record = self._read_record(symbol, timeframe, -1)
+            return int(record['timestamp']) if record is not None else None
+
+    def mark_history_start(self, symbol: str, timeframe: str) -> None:
+        """
+        Record that no candles older than the first stored one are available
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Candle timeframe
+        """
+        with self._lock:
+            first_timestamp = self.first_timestamp(symbol, timeframe)
+            if first_timestamp is not None:
+                self._history_start[(symbol, timeframe)] = first_timestamp
+
+    def at_history_start(self, symbol: str, timeframe: str) -> bool:
+        """
+        Check whether the first stored candle was marked as the start of history
+
+        The mark no longer applies once the first stored candle changes
+        (e.g. when the store is replaced).
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Candle timeframe
+
+        Returns:
+            True if mark_history_start() was called for the current first candle
+        """
+        with self._lock:
+            first_timestamp = self._history_start.get((symbol, timeframe))
+            return first_timestamp is not None and first_timestamp == self.first_timestamp(symbol, timeframe)
+
+    def read(self, symbol: str, timeframe: str, limit: Optional[int] = None) -> Candles:
+        """
+        Read the most recent stored candles
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Candle timeframe
+            limit: Maximum number of candles to read (all if None)
+
+        Returns:
+            Candles, oldest first
+        """
+        with self._lock:
+            count = self.count(symbol, timeframe)
+            if not count:
+                return Candles()
+            read_count = count if limit is None else min(limit, count)
+            records = np.fromfile(self._path(symbol, timeframe), dtype=RECORD_DTYPE, count=read_count,
+                                  offset=(count - read_count) * RECORD_DTYPE.itemsize)
+            return self._to_candles(records)
+
+    def write(self, symbol: str, timeframe: str, candles: Candles, replace: bool = False) -> None:
+        """
+        Append newer candles to the store
+
+        Candles older than the last stored one are ignored; one with the same
+        timestamp replaces the stored record.
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Candle timeframe
+            candles: Candles sorted by timestamp
+            replace: Discard the stored candles and keep only these
+        """
+        records = self._to_records(candles)
+        path = self._path(symbol, timeframe)
+        itemsize = RECORD_DTYPE.itemsize
+
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if replace or not os.path.exists(path):
+                self._replace_file(path, records)
+                return
+            if not len(records):
+                return
+
+            with open(path, 'r+b') as f:
+                # Drop a partial record left behind by an interrupted write
+                count = f.seek(0, os.SEEK_END) // itemsize
+                f.truncate(count * itemsize)
+
+                position = count
+                if count:
+                    f.seek((count - 1) * itemsize)
+                    last_timestamp = np.frombuffer(f.read(itemsize), dtype=RECORD_DTYPE)[0]['timestamp']
+                    records = records[records['timestamp'] >= last_timestamp]
+                    if len(records) and records[0]['timestamp'] == last_timestamp:
+                        position = count - 1
+
+                if len(records):
+                    f.seek(position * itemsize)
+                    f.write(records.tobytes())
+
+    def backfill(self, symbol: str, timeframe: str, candles: Candles) -> int:
+        """
+        Prepend older candles to the store
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Candle timeframe
+            candles: Candles sorted by timestamp; only those older than the
+                first stored candle are used
+
+        Returns:
+            Number of candles added
+        """
+        records = self._to_records(candles)
+        path = self._path(symbol, timeframe)
+
+        with self._lock:
+            first_timestamp = self.first_timestamp(symbol, timeframe)
+            if first_timestamp is None:
+                self.write(symbol, timeframe, candles)
+                return len(records)
+
+            older = records[records['timestamp'] < first_timestamp]
+            if not len(older):
+                return 0
+            stored = np.fromfile(path, dtype=RECORD_DTYPE, count=self.count(symbol, timeframe))
+            self._replace_file(path, np.concatenate((older, stored)))
+            return len(older)
+
+    @staticmethod
+    def _replace_file(path: str, records: np.ndarray) -> None:
+        """Atomically replace a candle file with the given records"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(records.tobytes())
+        os.replace(temp_path, path)
+
+
+# Shared by all CoinExAPI instances in this process
+candle_store = CandleStore(os.environ.get('CANDLE_STORE_DIR', DEFAULT_STORE_DIR))
@@ -0,0 +1,255 @@
+import numpy as np
+from datetime import datetime
+from typing import Dict, Iterator, List, Sequence, Union
+
+# Price/volume columns stored as float64 arrays, in CCXT row order
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+class Candles:
+    """
+    Columnar OHLCV container
+
+    Timestamps are kept in an int64 array and open/high/low/close/volume in
+    contiguous float64 arrays, so indicators read whole columns without any
+    per-candle objects. Integer indexing returns a candle dictionary for
+    compatibility with code written against the old list-of-dicts format;
+    slicing returns a Candles view over the same arrays. Views handed out
+    earlier never change: append() and extend() only write past the current
+    end, and truncate() moves the kept candles to new buffers unless told
+    that no views are held.
+    """
+
+    def __init__(self, timestamp: Sequence[int] = (), open: Sequence[float] = (),
+                 high: Sequence[float] = (), low: Sequence[float] = (),
+                 close: Sequence[float] = (), volume: Sequence[float] = ()):
+        """
+        Initialize candles from column data
+
+        Args:
+            timestamp: Candle open times in milliseconds
+            open: Open prices
+            high: High prices
+            low: Low prices
+            close: Closing prices
+            volume: Traded volumes
+        """
+        self._timestamp = np.asarray(timestamp, dtype=np.int64)
+        self._columns = {
+            "open": np.asarray(open, dtype=np.float64),
+            "high": np.asarray(high, dtype=np.float64),
+            "low": np.asarray(low, dtype=np.float64),
+            "close": np.asarray(close, dtype=np.float64),
+            "volume": np.asarray(volume, dtype=np.float64),
+        }
+        self._size = len(self._timestamp)
+
+    @classmethod
+    def from_ccxt(cls, rows: Sequence[Sequence[float]]) -> "Candles":
+        """
+        Build candles from CCXT OHLCV rows
+
+        Args:
+            rows: [timestamp, open, high, low, close, volume] rows
+
+        Returns:
+            Candles instance
+        """
+        if len(rows) == 0:
+            return cls()
+        data = np.asarray(rows, dtype=np.float64)
+        return cls(data[:, 0].astype(np.int64), *(data[:, i + 1] for i in range(len(PRICE_COLUMNS))))
+
+    @classmethod
+    def from_dicts(cls, candles: List[Dict]) -> "Candles":
+        """
+        Build candles from a list of OHLCV dictionaries
+
+        Args:
+            candles: Dictionaries with timestamp, open, high, low, close and volume
+
+        Returns:
+            Candles instance
+        """
+        return cls(
+            [candle.get('timestamp', 0) for candle in candles],
+            *([candle.get(column, np.nan) for candle in candles] for column in PRICE_COLUMNS)
+        )
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self._timestamp[:self._size]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._columns["open"][:self._size]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._columns["high"][:self._size]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._columns["low"][:self._size]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._columns["close"][:self._size]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._columns["volume"][:self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get a column by name
+
+        Args:
+            name: 'timestamp', 'open', 'high', 'low', 'close' or 'volume'
+
+        Returns:
+            Array view of the column
+        """
+        if name == "timestamp":
+            return self.timestamp
+        return self._columns[name][:self._size]
+
+    def append(self, timestamp: int, open: float, high: float, low: float,
+               close: float, volume: float) -> None:
+        """
+        Append one candle, growing the buffers geometrically
+
+        Args:
+            timestamp: Candle open time in milliseconds
+            open: Open price
+            high: High price
+            low: Low price
+            close: Closing price
+            volume: Traded volume
+        """
+        if self._size == len(self._timestamp):
+            self._grow(max(16, 2 * self._size))
+        self._timestamp[self._size] = timestamp
+        for name, value in zip(PRICE_COLUMNS, (open, high, low, close, volume)):
+            self._columns[name][self._size] = value
+        self._size += 1
+
+    def extend(self, other: "Candles") -> None:
+        """
+        Append all candles of another Candles instance
+
+        Args:
+            other: Candles to append
+        """
+        needed = self._size + len(other)
+        if needed > len(self._timestamp):
+            self._grow(max(needed, 2 * self._size))
+        self._timestamp[self._size:needed] = other.timestamp
+        for name in PRICE_COLUMNS:
+            self._columns[name][self._size:needed] = other.column(name)
+        self._size = needed
+
+    def truncate(self, size: int, keep_views: bool = True) -> None:
+        """
+        Keep only the first size candles
+
+        By default the kept candles are copied to new buffers, so later
+        appends do not overwrite candles still visible through earlier views.
+
+        Args:
+            size: Number of candles to keep
+            keep_views: Copy to new buffers; pass False only if no views of
+                this instance are held, to drop the candles in place
+        """
+        size = max(0, min(size, self._size))
+        if size < self._size:
+            self._size = size
+            if keep_views:
+                self._grow(len(self._timestamp))
+
+    def _grow(self, capacity: int) -> None:
+        """Reallocate the buffers with room for capacity candles"""
+        timestamp = np.empty(capacity, dtype=np.int64)
+        timestamp[:self._size] = self.timestamp
+        self._timestamp = timestamp
+        for name in PRICE_COLUMNS:
+            column = np.empty(capacity, dtype=np.float64)
+            column[:self._size] = self._columns[name][:self._size]
+            self._columns[name] = column
+
+    def candle(self, index: int) -> Dict:
+        """
+        Get one candle as a dictionary
+
+        Args:
+            index: Candle position (negative values count from the end)
+
+        Returns:
+            Dictionary in the format previously returned by CoinExAPI.get_ohlcv
+        """
+        timestamp = int(self.timestamp[index])
+        candle = {
+            'timestamp': timestamp,
+            'datetime': datetime.fromtimestamp(timestamp / 1000).strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        for name in PRICE_COLUMNS:
+            candle[name] = float(self._columns[name][:self._size][index])
+        return candle
+
+    def to_dicts(self) -> List[Dict]:
+        """
+        Convert to a list of candle dictionaries, e.g. for JSON responses
+
+        Returns:
+            List of OHLCV dictionaries
+        """
+        columns = [self.timestamp.tolist()] + [self.column(name).tolist() for name in PRICE_COLUMNS]
+        return [
+            {
+                'timestamp': timestamp,
+                'datetime': datetime.fromtimestamp(timestamp / 1000).strftime('%Y-%m-%d %H:%M:%S'),
+                'open': open_price,
+                'high': high,
+                'low': low,
+                'close': close,
+                'volume': volume
+            }
+            for timestamp, open_price, high, low, close, volume in zip(*columns)
+        ]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Dict, "Candles"]:
+        if isinstance(key, slice):
+            return Candles(self.timestamp[key], *(self.column(name)[key] for name in PRICE_COLUMNS))
+        return self.candle(key)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.to_dicts())
+
+    def __copy__(self) -> "Candles":
+        # A view has its own buffers bookkeeping, so appending to it leaves this instance alone
+        return self[:]
+
+    def __repr__(self) -> str:
+        return f"<Candles {self._size}>"
+
+
+def as_candles(ohlcv_data: Union[Candles, List]) -> Candles:
+    """
+    Normalize OHLCV input to Candles
+
+    Args:
+        ohlcv_data: Candles, a list of OHLCV dictionaries or CCXT OHLCV rows
+
+    Returns:
+        Candles instance (the input itself if it already is one)
+    """
+    if isinstance(ohlcv_data, Candles):
+        return ohlcv_data
+    if not ohlcv_data:
+        return Candles()
+    if isinstance(ohlcv_data[0], dict):
+        return Candles.from_dicts(ohlcv_data)
+    return Candles.from_ccxt(ohlcv_data)
@@ -1,44 +1,509 @@
 import os
 import ccxt
+import copy
+import gzip
+import json
+import time
+import asyncio
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Union
+import aiohttp
+import itertools
+import threading
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Tuple, Union
+
+from candles import Candles
+from candle_store import CandleStore, candle_store as shared_candle_store
+from market_cache import market_cache
+from resampling import TimeframeResampler, can_resample, timeframe_to_ms
 
 logger = logging.getLogger(__name__)
 
-class CoinExAPI:
+# Per-call request logs are emitted at most once per this many seconds per call site
+LOG_EVERY = 10.0
+
+
+class _Call:
+    """An in-flight call whose result is shared with coalesced callers"""
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one
+
+    While a call for a key is in progress, other callers with the same key
+    wait for it and receive its result (or exception) instead of issuing
+    their own request. If the call is interrupted (e.g. KeyboardInterrupt),
+    waiting callers get a RuntimeError. Each waiting caller gets a shallow copy of the
+    result, so adding keys to a dictionary or appending to candles does not
+    affect the other callers; nested objects are shared and must be treated
+    as read-only.
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight"""
+        self._calls: Dict[Tuple, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Tuple, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, or wait for an identical call that is already running
+
+        Args:
+            key: Hashable identity of the call
+            fn: Function performing the call
+
+        Returns:
+            Result of fn; coalesced callers receive a shallow copy
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.copy(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            # Waiters must not take an interrupted call for a None result; they
+            # get an ordinary error instead of the leader's interrupt
+            call.error = e if isinstance(e, Exception) else RuntimeError(f"Coalesced call {key} was interrupted")
+            raise
+        finally:
+            # Publish and release the key whatever happened, so waiters never hang
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get coalescing statistics
+
+        Returns:
+            Dictionary with executed, coalesced and in-flight call counts
+        """
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls)
+            }
+
+
+# Shared by all CoinExAPI instances, so the bot and dashboard requests coalesce too
+single_flight = SingleFlight()
+
+# Request priority classes, lower values are served first
+PRIORITY_ORDER = 0  # Order placement and cancellation
+PRIORITY_BOT = 1  # Market data for the trading bot
+PRIORITY_UI = 2  # Dashboard and other UI reads
+PRIORITY_BACKGROUND = 3  # Market metadata refreshes
+
+PRIORITY_NAMES = {PRIORITY_ORDER: 'order', PRIORITY_BOT: 'bot', PRIORITY_UI: 'ui',
+                  PRIORITY_BACKGROUND: 'background'}
+
+# Relative cost of each endpoint in rate-limit tokens
+ENDPOINT_WEIGHTS = {
+    'fetch_ticker': 1,
+    'fetch_tickers': 4,
+    'fetch_ohlcv': 1,
+    'fetch_balance': 2,
+    'create_order': 1,
+    'cancel_order': 1,
+    'fetch_open_orders': 2,
+    'fetch_closed_orders': 2,
+    'load_markets': 5,
+}
+
+# Endpoints that always use order priority
+ORDER_ENDPOINTS = {'create_order', 'cancel_order'}
+
+# Seconds a request may wait for the rate limiter before failing with ccxt.RateLimitExceeded
+RATE_LIMIT_TIMEOUT = float(os.environ.get('COINEX_RATE_TIMEOUT', 30))
+
+
+class RateLimiter:
+    """
+    Token-bucket request scheduler with priority classes
+
+    Tokens refill at a fixed rate up to the bucket capacity. Requests wait in
+    a priority queue; only the request at the head of the queue may take
+    tokens, so a queued order is always served before waiting market data
+    or UI requests. Waiting requests age: every aging seconds spent in the
+    queue raise a request by one class, up to bot priority, so background
+    and UI requests are eventually served under sustained bot load. Orders
+    are never overtaken.
+    """
+
+    def __init__(self, rate: float = 10.0, capacity: float = 20.0, aging: float = 5.0):
+        """
+        Initialize the rate limiter
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens (burst size)
+            aging: Seconds of waiting that raise a request by one priority class
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.aging = aging
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        # Waiting requests as (priority, sequence number, enqueue time)
+        self._queue: List[Tuple[int, int, float]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+
+        self._queued = {priority: 0 for priority in PRIORITY_NAMES}
+        self._granted = {priority: 0 for priority in PRIORITY_NAMES}
+        self._timed_out = {priority: 0 for priority in PRIORITY_NAMES}
+        self._wait_time = {priority: 0.0 for priority in PRIORITY_NAMES}
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last refill"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _head(self, now: float) -> Tuple[int, int, float]:
+        """Get the request to serve next, taking aging into account; the caller holds the lock"""
+        def rank(ticket: Tuple[int, int, float]) -> Tuple[int, int]:
+            priority, sequence, enqueued = ticket
+            if priority > PRIORITY_BOT:
+                priority = max(PRIORITY_BOT, priority - int((now - enqueued) / self.aging))
+            return priority, sequence
+        return min(self._queue, key=rank)
+
+    def acquire(self, weight: float = 1, priority: int = PRIORITY_UI, timeout: Optional[float] = None) -> float:
+        """
+        Wait until the request may be sent
+
+        Args:
+            weight: Tokens the request costs
+            priority: PRIORITY_ORDER, PRIORITY_BOT, PRIORITY_UI or PRIORITY_BACKGROUND
+            timeout: Maximum seconds to wait before giving up with
+                ccxt.RateLimitExceeded (no limit if None)
+
+        Returns:
+            Seconds spent waiting
+        """
+        weight = min(weight, self.capacity)
+        start = time.monotonic()
+        ticket = (priority, next(self._counter), start)
+        deadline = None if timeout is None else start + timeout
+
+        with self._condition:
+            self._queue.append(ticket)
+            self._queued[priority] += 1
+            at_head = False
+            while True:
+                self._refill()
+                now = time.monotonic()
+                was_head, at_head = at_head, self._head(now) == ticket
+                if at_head and self._tokens >= weight:
+                    break
+                if was_head and not at_head:
+                    # An aged request overtook this one; wake it for the tokens
+                    self._condition.notify_all()
+                if deadline is not None and now >= deadline:
+                    self._queue.remove(ticket)
+                    self._queued[priority] -= 1
+                    self._timed_out[priority] += 1
+                    # The head may have been this request
+                    self._condition.notify_all()
+                    raise ccxt.RateLimitExceeded(
+                        f"Request not admitted by the rate limiter within {timeout}s "
+                        f"({PRIORITY_NAMES.get(priority, priority)} priority)")
+                # The head waits for its tokens; everyone else waits for the head to leave.
+                # Waits are bounded by the aging step, since aging may change the head
+                wait = (weight - self._tokens) / self.rate if at_head else self.aging
+                if deadline is not None:
+                    wait = min(wait, deadline - now)
+                self._condition.wait(wait)
+
+            self._queue.remove(ticket)
+            self._tokens -= weight
+            waited = time.monotonic() - start
+            self._queued[priority] -= 1
+            self._granted[priority] += 1
+            self._wait_time[priority] += waited
+            self._condition.notify_all()
+
+        return waited
+
+    def stats(self) -> Dict:
+        """
+        Get scheduler metrics
+
+        Returns:
+            Dictionary with available tokens and, per priority class, the
+            current queue depth, granted and timed-out requests and total
+            wait time
+        """
+        with self._condition:
+            self._refill()
+            return {
+                'tokens': self._tokens,
+                'queued': {PRIORITY_NAMES[p]: n for p, n in self._queued.items()},
+                'granted': {PRIORITY_NAMES[p]: n for p, n in self._granted.items()},
+                'timed_out': {PRIORITY_NAMES[p]: n for p, n in self._timed_out.items()},
+                'wait_time': {PRIORITY_NAMES[p]: t for p, t in self._wait_time.items()},
+            }
+
+
+# Shared by all exchange clients so the bot and dashboard draw from the same budget
+rate_limiter = RateLimiter(
+    float(os.environ.get('COINEX_RATE_LIMIT', 10)),
+    float(os.environ.get('COINEX_RATE_BURST', 20))
+)
+
+
+# (args, kwargs) of a fetch_ohlcv request yielded by the OHLCVStoreMixin steps
+OHLCVRequest = Tuple[Tuple, Dict[str, Any]]
+
+
+class OHLCVStoreMixin:
+    """
+    Candle store synchronization and resampling shared by the exchange clients
+
+    The logic is written once as generators ("steps") that yield each
+    fetch_ohlcv request as (args, kwargs) and receive its result back
+    through send(); the generator's return value is the final result.
+    CoinExAPI drives the steps with blocking requests, and AsyncCoinExAPI
+    awaits the requests and runs the steps in between, which hold all the
+    candle store reads and writes, on a worker thread.
+
+    Whether CoinEx honours the since argument of fetch_ohlcv has not been
+    verified against the live API, so the steps stay correct when it is
+    ignored and the most recent candles are returned instead (see
+    _sync_steps and _backfill_steps).
+
+    Classes using the mixin provide candle_store, base_timeframe, exchange,
+    _resamplers and _resamplers_lock.
+    """
+    # Maximum number of candles CoinEx returns per OHLCV request
+    MAX_OHLCV_PAGE = 1000
+    # Number of pages fetched to close a gap before restarting from recent history
+    MAX_SYNC_PAGES = 10
+
+    def _ohlcv_steps(self, symbol: str, timeframe: str, limit: int) -> Generator[OHLCVRequest, Any, Candles]:
+        """
+        Get OHLCV data from the candle store or directly from the exchange
+
+        Args:
+            symbol: Trading pair symbol in CCXT format
+            timeframe: Timeframe for candles
+            limit: Number of candles to retrieve
+
+        Returns:
+            Columnar OHLCV candles
+        """
+        if self.candle_store is None:
+            return Candles.from_ccxt((yield (symbol, timeframe), {'limit': limit}))
+
+        if can_resample(self.base_timeframe, timeframe):
+            return (yield from self._resampled_ohlcv_steps(symbol, timeframe, limit))
+        return (yield from self._stored_ohlcv_steps(symbol, timeframe, limit))
+
+    def _stored_ohlcv_steps(self, symbol: str, timeframe: str, limit: int) -> Generator[OHLCVRequest, Any, Candles]:
+        """
+        Get candles from the local store after bringing it up to date
+
+        Args:
+            symbol: Trading pair symbol in CCXT format
+            timeframe: Timeframe for candles
+            limit: Number of candles to retrieve
+
+        Returns:
+            Columnar OHLCV candles
+        """
+        yield from self._sync_steps(symbol, timeframe, limit)
+        yield from self._backfill_steps(symbol, timeframe, limit)
+        return self.candle_store.read(symbol, timeframe, limit=limit)
+
+    def _resampled_ohlcv_steps(self, symbol: str, timeframe: str,
+                               limit: int) -> Generator[OHLCVRequest, Any, Candles]:
+        """
+        Get higher timeframe candles derived from the base timeframe candles
+
+        Args:
+            symbol: Trading pair symbol in CCXT format
+            timeframe: Timeframe for candles (a multiple of the base timeframe)
+            limit: Number of candles to retrieve
+
+        Returns:
+            Columnar OHLCV candles, the last one possibly still forming
+        """
+        ratio = timeframe_to_ms(timeframe) // timeframe_to_ms(self.base_timeframe)
+        # One extra bucket since the oldest one may start before the first base candle
+        base = yield from self._stored_ohlcv_steps(symbol, self.base_timeframe, (limit + 1) * ratio)
+
+        # Resamplers are updated under the lock since the async client runs steps on worker threads
+        with self._resamplers_lock:
+            resampler = self._resamplers.get((symbol, timeframe))
+            if resampler is None:
+                resampler = TimeframeResampler(self.base_timeframe, timeframe)
+                self._resamplers[(symbol, timeframe)] = resampler
+
+            if len(resampler) < limit:
+                resampler.reset()
+            resampler.update(base, limit)
+            return resampler.read(limit)
+
+    def _sync_steps(self, symbol: str, timeframe: str, limit: int) -> Generator[OHLCVRequest, Any, None]:
+        """
+        Bring the stored candles up to date, fetching only candles newer than
+        the last stored timestamp
+
+        Pages are sized from the number of missing candles, so an exchange
+        that ignores since and returns its most recent candles still
+        returns the ones needed. A full page that does not reach back to
+        since means the exchange ignored it across a larger gap; the store
+        then restarts from recent history rather than keeping the gap.
+
+        Args:
+            symbol: Trading pair symbol in CCXT format
+            timeframe: Timeframe for candles
+            limit: Number of candles to fetch when nothing is stored yet
+        """
+        store = self.candle_store
+        last_timestamp = store.last_timestamp(symbol, timeframe)
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        now = self.exchange.milliseconds()
+        # Open time of the candle still forming
+        current = now - now % timeframe_ms
+
+        if last_timestamp is not None:
+            missing = (current - last_timestamp) // timeframe_ms + 1
+            if missing <= self.MAX_OHLCV_PAGE * self.MAX_SYNC_PAGES:
+                since = last_timestamp
+                for _ in range(self.MAX_SYNC_PAGES):
+                    # The page starts with the last stored candle, which may still have been
+                    # forming, and has one candle to spare for clock differences
+                    page = min(max(current - since, 0) // timeframe_ms + 2, self.MAX_OHLCV_PAGE)
+                    ohlcv = yield (symbol, timeframe), {'since': since, 'limit': page}
+                    if len(ohlcv) == page and ohlcv[0][0] > since:
+                        break
+                    store.write(symbol, timeframe, Candles.from_ccxt(ohlcv))
+                    if len(ohlcv) < page or ohlcv[-1][0] >= current or ohlcv[-1][0] <= since:
+                        return
+                    since = int(ohlcv[-1][0])
+                else:
+                    return
+                logger.info(f"Exchange did not return {timeframe} candles for {symbol} from {since}, "
+                            f"restarting from recent history")
+            else:
+                logger.info(f"Stored {timeframe} candles for {symbol} are too old, restarting from recent history")
+
+        ohlcv = yield (symbol, timeframe), {'limit': limit}
+        store.write(symbol, timeframe, Candles.from_ccxt(ohlcv), replace=True)
+
+    def _backfill_steps(self, symbol: str, timeframe: str, count: int) -> Generator[OHLCVRequest, Any, None]:
+        """
+        Fetch candles older than the first stored one until count are stored
+
+        The request limit also covers the stored candles, so an exchange
+        that ignores since and returns its most recent candles still yields
+        the older ones, as long as count fits in one page. When a request
+        adds nothing, the store records that its first candle is the start
+        of the available history and later calls stop asking.
+
+        Args:
+            symbol: Trading pair symbol in CCXT format
+            timeframe: Timeframe for candles
+            count: Number of candles the store should hold
+        """
+        store = self.candle_store
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+
+        while store.count(symbol, timeframe) < count and not store.at_history_start(symbol, timeframe):
+            first_timestamp = store.first_timestamp(symbol, timeframe)
+            if first_timestamp is None:
+                break
+            stored = store.count(symbol, timeframe)
+            needed = min(count - stored, self.MAX_OHLCV_PAGE)
+            ohlcv = yield (symbol, timeframe), {'since': first_timestamp - needed * timeframe_ms,
+                                                'limit': min(stored + needed, self.MAX_OHLCV_PAGE)}
+            if not store.backfill(symbol, timeframe, Candles.from_ccxt(ohlcv)):
+                # No older history available
+                store.mark_history_start(symbol, timeframe)
+                break
+
+    @staticmethod
+    def _advance(steps: Generator, value: Any = None) -> Tuple[bool, Any]:
+        """
+        Resume steps with the result of the previous request
+
+        Returns:
+            (True, result of the steps) once they are finished, otherwise
+            (False, next request)
+        """
+        try:
+            return False, steps.send(value)
+        except StopIteration as stop:
+            # StopIteration cannot cross asyncio.to_thread, so it is turned into a flag
+            return True, stop.value
+
+
+class CoinExAPI(OHLCVStoreMixin):
     """
     Class to interact with CoinEx exchange API using CCXT library
     """
-    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None):
+
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 candle_store: Optional[CandleStore] = shared_candle_store,
+                 base_timeframe: Optional[str] = None, priority: int = PRIORITY_UI):
         """
         Initialize the CoinEx API connection
         
         Args:
             api_key: API key for CoinEx
             api_secret: API secret for CoinEx
+            candle_store: Local candle store consulted before fetching OHLCV data
+                (None to always fetch from the exchange)
+            base_timeframe: Timeframe fetched from the exchange from which higher
+                timeframes are resampled locally (defaults to OHLCV_BASE_TIMEFRAME or '1h')
+            priority: Rate-limit priority for non-order requests (PRIORITY_BOT or PRIORITY_UI)
         """
         self.api_key = api_key or os.environ.get('COINEX_API_KEY', '')
         self.api_secret = api_secret or os.environ.get('COINEX_API_SECRET', '')
+        self.candle_store = candle_store
+        self.base_timeframe = base_timeframe or os.environ.get('OHLCV_BASE_TIMEFRAME', '1h')
+        self.priority = priority
+        self._resamplers = {}
+        self._resamplers_lock = threading.Lock()
         
-        # Initialize the CCXT exchange object
+        # Initialize the CCXT exchange object; requests are throttled by the shared rate_limiter
         self.exchange = ccxt.coinex({
             'apiKey': self.api_key,
             'secret': self.api_secret,
-            'enableRateLimit': True,
+            'enableRateLimit': False,
         })
         
         self.authenticated = bool(self.api_key and self.api_secret)
         
-        # Try to load markets on initialization
-        try:
-            if self.authenticated:
-                self.exchange.load_markets()
-                logger.info("Successfully connected to CoinEx API and loaded markets")
-            else:
-                logger.warning("Initialized without API credentials - limited functionality available")
-        except Exception as e:
-            logger.error(f"Error connecting to CoinEx API: {str(e)}")
+        if not self.authenticated:
+            logger.warning("Initialized without API credentials - limited functionality available")
+        
+        # Use the shared market metadata instead of downloading it per instance
+        market_cache.attach(self.exchange)
     
     def get_markets(self) -> List[Dict]:
         """
@@ -48,9 +513,8 @@ class CoinExAPI:
             List of market dictionaries
         """
         try:
-            self.exchange.load_markets()
             markets = []
-            for symbol, market in self.exchange.markets.items():
+            for symbol, market in market_cache.get_markets().items():
                 # Filter for spot markets only
                 if market['spot']:
                     markets.append({
@@ -66,6 +530,50 @@ class CoinExAPI:
             logger.error(f"Error getting markets: {str(e)}")
             return []
     
+    def _request(self, endpoint: str, *args, **kwargs):
+        """
+        Call an exchange endpoint once the rate limiter allows it
+        
+        Args:
+            endpoint: Name of the CCXT method (e.g., 'fetch_ohlcv')
+            *args: Positional arguments for the method
+            **kwargs: Keyword arguments for the method
+            
+        Returns:
+            Result of the CCXT method
+        """
+        priority = PRIORITY_ORDER if endpoint in ORDER_ENDPOINTS else self.priority
+        rate_limiter.acquire(ENDPOINT_WEIGHTS.get(endpoint, 1), priority, RATE_LIMIT_TIMEOUT)
+        return getattr(self.exchange, endpoint)(*args, **kwargs)
+    
+    @staticmethod
+    def _to_ccxt_symbol(symbol: str) -> str:
+        """
+        Convert a symbol to CCXT format
+        
+        Args:
+            symbol: Trading pair symbol (e.g., 'BTC/USDT' or 'BTCUSDT')
+            
+        Returns:
+            Symbol in CCXT format (e.g., 'BTC/USDT')
+        """
+        # CoinEx uses format like 'BTCUSDT' while CCXT typically expects 'BTC/USDT'
+        if '/' in symbol:
+            # Leave as is, CCXT will handle the conversion
+            return symbol
+        
+        # If given without slash (e.g. 'BTCUSDT'), try to convert to CCXT format
+        # This is just a fallback, symbols should be stored with slashes
+        for common_quote in ['USDT', 'BTC', 'ETH', 'USD']:
+            if symbol.endswith(common_quote):
+                base = symbol[:-len(common_quote)]
+                if base:  # Make sure the base is not empty
+                    return f"{base}/{common_quote}"
+        
+        # If we couldn't parse it, just use as is and let CCXT try
+        logger.warning(f"Could not convert symbol {symbol} to CCXT format, using as is")
+        return symbol
+    
     def get_ticker(self, symbol: str) -> Dict:
         """
         Get current ticker for a specific symbol
@@ -77,35 +585,42 @@ class CoinExAPI:
             Ticker information
         """
         try:
-            # Convert symbol format if needed to match CoinEx requirements
-            # CoinEx uses format like 'BTCUSDT' while CCXT typically expects 'BTC/USDT'
-            ccxt_symbol = symbol  # Default to original symbol
-            
-            if '/' in symbol:
-                # Leave as is, CCXT will handle the conversion
-                pass
-            else:
-                # If given without slash (e.g. 'BTCUSDT'), try to convert to CCXT format
-                # This is just a fallback, symbols should be stored with slashes
-                converted = False
-                for common_quote in ['USDT', 'BTC', 'ETH', 'USD']:
-                    if symbol.endswith(common_quote):
-                        base = symbol[:-len(common_quote)]
-                        if base:  # Make sure the base is not empty
-                            ccxt_symbol = f"{base}/{common_quote}"
-                            converted = True
-                            break
-                
-                if not converted:
-                    # If we couldn't parse it, just use as is and let CCXT try
-                    logger.warning(f"Could not convert symbol {symbol} to CCXT format, using as is")
-            
-            logger.info(f"Getting ticker for {symbol} (CCXT format: {ccxt_symbol})")
-            return self.exchange.fetch_ticker(ccxt_symbol)
+            ccxt_symbol = self._to_ccxt_symbol(symbol)
+            logger.debug(f"Getting ticker for {symbol} (CCXT format: {ccxt_symbol})", extra={'every': LOG_EVERY})
+            return single_flight.do(('ticker', ccxt_symbol), lambda: self._request('fetch_ticker', ccxt_symbol))
         except Exception as e:
             logger.error(f"Error getting ticker for {symbol}: {str(e)}")
             return {}
     
+    def get_tickers(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Get current tickers for several symbols in a single request
+        
+        Args:
+            symbols: Trading pair symbols (e.g., ['BTC/USDT', 'ETH/USDT'])
+            
+        Returns:
+            Ticker information keyed by the symbols as given; symbols the
+            exchange returned no ticker for are left out
+        """
+        if not symbols:
+            return {}
+        
+        try:
+            ccxt_symbols = {symbol: self._to_ccxt_symbol(symbol) for symbol in symbols}
+            logger.debug(f"Getting tickers for {len(ccxt_symbols)} symbols", extra={'every': LOG_EVERY})
+            unique_symbols = sorted(set(ccxt_symbols.values()))
+            tickers = single_flight.do(('tickers', tuple(unique_symbols)),
+                                       lambda: self._request('fetch_tickers', unique_symbols))
+            return {
+                symbol: tickers[ccxt_symbol]
+                for symbol, ccxt_symbol in ccxt_symbols.items()
+                if ccxt_symbol in tickers
+            }
+        except Exception as e:
+            logger.error(f"Error getting tickers: {str(e)}")
+            return {}
+    
     def get_balance(self) -> Dict:
         """
         Get account balance
@@ -118,12 +633,12 @@ class CoinExAPI:
             return {}
             
         try:
-            return self.exchange.fetch_balance()
+            return self._request('fetch_balance')
         except Exception as e:
             logger.error(f"Error getting balance: {str(e)}")
             return {}
     
-    def get_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> List:
+    def get_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> Candles:
         """
         Get OHLCV (candlestick) data
         
@@ -133,49 +648,70 @@ class CoinExAPI:
             limit: Number of candles to retrieve
             
         Returns:
-            List of OHLCV candles
+            Columnar OHLCV candles (empty on error)
         """
         try:
-            # Convert symbol format if needed to match CoinEx requirements
-            # CoinEx uses format like 'BTCUSDT' while CCXT typically expects 'BTC/USDT'
-            ccxt_symbol = symbol  # Default to original symbol
-            
-            if '/' in symbol:
-                # Leave as is, CCXT will handle the conversion
-                pass
-            else:
-                # If given without slash (e.g. 'BTCUSDT'), try to convert to CCXT format
-                # This is just a fallback, symbols should be stored with slashes
-                converted = False
-                for common_quote in ['USDT', 'BTC', 'ETH', 'USD']:
-                    if symbol.endswith(common_quote):
-                        base = symbol[:-len(common_quote)]
-                        if base:  # Make sure the base is not empty
-                            ccxt_symbol = f"{base}/{common_quote}"
-                            converted = True
-                            break
-                
-                if not converted:
-                    # If we couldn't parse it, just use as is and let CCXT try
-                    logger.warning(f"Could not convert symbol {symbol} to CCXT format, using as is")
-            
-            logger.info(f"Getting OHLCV for {symbol} (CCXT format: {ccxt_symbol})")
-            ohlcv = self.exchange.fetch_ohlcv(ccxt_symbol, timeframe, limit=limit)
-            return [
-                {
-                    'timestamp': candle[0],
-                    'datetime': datetime.fromtimestamp(candle[0]/1000).strftime('%Y-%m-%d %H:%M:%S'),
-                    'open': candle[1],
-                    'high': candle[2],
-                    'low': candle[3],
-                    'close': candle[4],
-                    'volume': candle[5]
-                }
-                for candle in ohlcv
-            ]
+            ccxt_symbol = self._to_ccxt_symbol(symbol)
+            logger.debug(f"Getting OHLCV for {symbol} (CCXT format: {ccxt_symbol})", extra={'every': LOG_EVERY})
+            return single_flight.do(('ohlcv', ccxt_symbol, timeframe, limit),
+                                    lambda: self._fetch_ohlcv(ccxt_symbol, timeframe, limit))
         except Exception as e:
             logger.error(f"Error getting OHLCV data for {symbol}: {str(e)}")
-            return []
+            return Candles()
+
+    def _fetch_ohlcv(self, symbol: str, timeframe: str, limit: int) -> Candles:
+        """
+        Get OHLCV data from the candle store or directly from the exchange
+
+        Args:
+            symbol: Trading pair symbol in CCXT format
+            timeframe: Timeframe for candles
+            limit: Number of candles to retrieve
+
+        Returns:
+            Columnar OHLCV candles
+        """
+        return self._run_steps(self._ohlcv_steps(symbol, timeframe, limit))
+
+    def _run_steps(self, steps: Generator[OHLCVRequest, Any, Any]) -> Any:
+        """
+        Run OHLCVStoreMixin steps with blocking requests
+
+        Args:
+            steps: Generator returned by one of the *_steps methods
+
+        Returns:
+            Result of the steps
+        """
+        done, value = self._advance(steps)
+        while not done:
+            args, kwargs = value
+            done, value = self._advance(steps, self._request('fetch_ohlcv', *args, **kwargs))
+        return value
+
+    def backfill_ohlcv(self, symbol: str, timeframe: str = '1h', count: int = 1000) -> int:
+        """
+        Extend the locally stored candle history backwards
+
+        Args:
+            symbol: Trading pair symbol (e.g., 'BTC/USDT')
+            timeframe: Timeframe for candles
+            count: Number of candles the store should hold afterwards
+
+        Returns:
+            Number of candles stored after backfilling
+        """
+        if self.candle_store is None:
+            logger.error("Backfilling requires a candle store")
+            return 0
+
+        try:
+            self._run_steps(self._sync_steps(symbol, timeframe, min(count, self.MAX_OHLCV_PAGE)))
+            self._run_steps(self._backfill_steps(symbol, timeframe, count))
+            return self.candle_store.count(symbol, timeframe)
+        except Exception as e:
+            logger.error(f"Error backfilling OHLCV data for {symbol}: {str(e)}")
+            return 0
     
     def create_order(self, symbol: str, order_type: str, side: str, 
                      amount: float, price: Optional[float] = None) -> Dict:
@@ -197,7 +733,7 @@ class CoinExAPI:
             return {}
             
         try:
-            return self.exchange.create_order(symbol, order_type, side, amount, price)
+            return self._request('create_order', symbol, order_type, side, amount, price)
         except Exception as e:
             logger.error(f"Error creating order: {str(e)}")
             return {}
@@ -218,7 +754,7 @@ class CoinExAPI:
             return {}
             
         try:
-            return self.exchange.cancel_order(order_id, symbol)
+            return self._request('cancel_order', order_id, symbol)
         except Exception as e:
             logger.error(f"Error cancelling order {order_id}: {str(e)}")
             return {}
@@ -238,7 +774,7 @@ class CoinExAPI:
             return []
             
         try:
-            return self.exchange.fetch_open_orders(symbol=symbol)
+            return self._request('fetch_open_orders', symbol=symbol)
         except Exception as e:
             logger.error(f"Error getting open orders: {str(e)}")
             return []
@@ -259,7 +795,424 @@ class CoinExAPI:
             return []
             
         try:
-            return self.exchange.fetch_closed_orders(symbol=symbol, limit=limit)
+            return self._request('fetch_closed_orders', symbol=symbol, limit=limit)
         except Exception as e:
             logger.error(f"Error getting order history: {str(e)}")
             return []
+
+
+# Channels pushed to MarketDataStream subscribers
+STREAM_CHANNELS = ('ticker', 'kline', 'depth', 'trades')
+
+# Public CoinEx v2 spot WebSocket; set COINEX_WS_URL to it to enable streaming
+COINEX_SPOT_WS_URL = 'wss://socket.coinex.com/v2/spot'
+
+
+class MarketDataStream:
+    """
+    WebSocket market data subscription layer for CoinEx
+
+    Consumes the ticker (state), depth and deals channels of the CoinEx v2
+    spot WebSocket on a background thread, keeps the latest ticker, order
+    book and klines per symbol, and pushes updates to subscriber callbacks.
+    The v2 spot feed has no kline channel, so klines are built from deals.
+    Readers fall back to REST for symbols without fresh streamed data,
+    e.g. while the connection is down. Streaming is opt-in: without a URL
+    (COINEX_WS_URL unset) no connection is opened and every read falls back.
+    """
+
+    def __init__(self, url: Optional[str] = None, timeframes: Tuple[str, ...] = ('1m',),
+                 depth_limit: int = 20, max_age: float = 30.0, record_path: Optional[str] = None):
+        """
+        Initialize the market data stream
+
+        Args:
+            url: WebSocket URL, e.g. COINEX_SPOT_WS_URL (defaults to COINEX_WS_URL;
+                streaming is disabled if it is empty or unset)
+            timeframes: Timeframes of the klines built from deals
+            depth_limit: Number of order book levels to subscribe to
+            max_age: Seconds after which streamed data is no longer served
+            record_path: Optional JSONL file all received messages are appended to,
+                for replay with fake_coinex_ws
+        """
+        self.url = os.environ.get('COINEX_WS_URL', '') if url is None else url
+        self.timeframes = timeframes
+        self.depth_limit = depth_limit
+        self.max_age = max_age
+        self.record_path = record_path
+
+        self.tickers: Dict[str, Dict] = {}
+        self.order_books: Dict[str, Dict] = {}
+        self.klines: Dict[Tuple[str, str], List] = {}
+        # Last update per (channel, symbol); each channel's data goes stale on its own
+        self._updated_at: Dict[Tuple[str, str], float] = {}
+        self._symbols: Dict[str, str] = {}  # Market id -> symbol
+        self._subscribers: List[Callable[[str, str, Any], None]] = []
+        self._lock = threading.Lock()
+
+        self.connected = False
+        self.messages = 0
+        self.reconnects = 0
+        self._loop = None
+        self._ws = None
+        self._thread = None
+        self._stopping = False
+        # Set from stop() on the stream loop, cutting a reconnect backoff short
+        self._wakeup: Optional[asyncio.Event] = None
+        self._request_id = itertools.count(1)
+        self._started_at = time.time()
+
+    @staticmethod
+    def _market_id(symbol: str) -> str:
+        """Convert a symbol to a CoinEx market id (e.g., 'BTC/USDT' -> 'BTCUSDT')"""
+        return CoinExAPI._to_ccxt_symbol(symbol).replace('/', '')
+
+    def start(self) -> None:
+        """Start the stream thread if streaming is enabled and it is not running"""
+        if not self.url:
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='market-stream', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Close the connection and stop the stream thread"""
+        self._stopping = True
+        loop = self._loop
+        if loop:
+            try:
+                loop.call_soon_threadsafe(self._wake)
+                if self._ws:
+                    asyncio.run_coroutine_threadsafe(self._ws.close(), loop)
+            except RuntimeError:
+                # The loop closed in the meantime
+                pass
+        if self._thread:
+            self._thread.join(timeout=5.0)
+
+    def _wake(self) -> None:
+        """Interrupt the reconnect backoff; runs on the stream loop"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def watch(self, symbols: Iterable[str]) -> None:
+        """
+        Stream market data for the given symbols, starting the stream if needed
+
+        Args:
+            symbols: Trading pair symbols
+        """
+        new_ids = []
+        with self._lock:
+            for symbol in symbols:
+                market_id = self._market_id(symbol)
+                if market_id not in self._symbols:
+                    self._symbols[market_id] = symbol
+                    new_ids.append(market_id)
+
+        if new_ids and self.connected and self._loop:
+            asyncio.run_coroutine_threadsafe(self._subscribe(self._ws, new_ids), self._loop)
+        self.start()
+
+    def subscribe(self, callback: Callable[[str, str, Any], None]) -> None:
+        """
+        Register a callback for streamed updates
+
+        Args:
+            callback: Called from the stream thread as callback(channel, symbol, data)
+                with channel one of STREAM_CHANNELS
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[str, str, Any], None]) -> None:
+        """
+        Remove a callback registered with subscribe()
+
+        Args:
+            callback: Callback to remove
+        """
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def is_fresh(self, symbol: str, channel: str = 'ticker') -> bool:
+        """
+        Whether streamed data for the symbol is recent enough to serve
+
+        Args:
+            symbol: Trading pair symbol
+            channel: Channel whose data is checked ('ticker', 'depth' or 'trades')
+
+        Returns:
+            True if the channel was updated for the symbol within max_age
+        """
+        with self._lock:
+            return self._is_fresh(symbol, channel)
+
+    def _is_fresh(self, symbol: str, channel: str) -> bool:
+        """is_fresh() for callers that hold the lock"""
+        return self.connected and time.time() - self._updated_at.get((channel, symbol), 0) <= self.max_age
+
+    def get_ticker(self, symbol: str) -> Optional[Dict]:
+        """
+        Get the streamed ticker for a symbol
+
+        Args:
+            symbol: Trading pair symbol
+
+        Returns:
+            Ticker dictionary, or None if no fresh ticker is available
+        """
+        with self._lock:
+            return self.tickers.get(symbol) if self._is_fresh(symbol, 'ticker') else None
+
+    def get_tickers(self, symbols: List[str],
+                    fallback: Optional[Callable[[List[str]], Dict[str, Dict]]] = None) -> Dict[str, Dict]:
+        """
+        Get tickers from the stream, fetching the others over REST
+
+        Args:
+            symbols: Trading pair symbols
+            fallback: Function fetching tickers for symbols without fresh streamed
+                data, e.g. CoinExAPI.get_tickers
+
+        Returns:
+            Tickers keyed by symbol
+        """
+        tickers = {}
+        for symbol in symbols:
+            ticker = self.get_ticker(symbol)
+            if ticker:
+                tickers[symbol] = ticker
+
+        missing = [symbol for symbol in symbols if symbol not in tickers]
+        if missing and fallback:
+            tickers.update(fallback(missing))
+        return tickers
+
+    def get_order_book(self, symbol: str) -> Optional[Dict]:
+        """
+        Get the streamed order book for a symbol
+
+        Args:
+            symbol: Trading pair symbol
+
+        Returns:
+            Dictionary with sorted 'bids' and 'asks' [price, amount] lists, or None
+        """
+        with self._lock:
+            book = self.order_books.get(symbol)
+            if not book or not self._is_fresh(symbol, 'depth'):
+                return None
+            return {
+                'bids': sorted(book['bids'].items(), reverse=True)[:self.depth_limit],
+                'asks': sorted(book['asks'].items())[:self.depth_limit],
+                'timestamp': book['timestamp']
+            }
+
+    def get_kline(self, symbol: str, timeframe: str = '1m') -> Optional[List]:
+        """
+        Get the current kline built from streamed deals
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: One of the stream's timeframes
+
+        Returns:
+            [timestamp, open, high, low, close, volume] of the forming candle, or None
+        """
+        with self._lock:
+            kline = self.klines.get((symbol, timeframe))
+            return list(kline) if kline else None
+
+    def stats(self) -> Dict:
+        """
+        Get stream metrics
+
+        Returns:
+            Dictionary with connection state, message and reconnect counts and watched symbols
+        """
+        return {
+            'connected': self.connected,
+            'messages': self.messages,
+            'reconnects': self.reconnects,
+            'symbols': len(self._symbols)
+        }
+
+    def _run(self) -> None:
+        """Run the stream event loop on the stream thread"""
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._connect_forever())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    async def _connect_forever(self) -> None:
+        """Keep a connection open, reconnecting with exponential backoff"""
+        backoff = 1.0
+        self._wakeup = asyncio.Event()
+        async with aiohttp.ClientSession() as session:
+            while not self._stopping:
+                try:
+                    async with session.ws_connect(self.url, heartbeat=20) as ws:
+                        self._ws = ws
+                        self.connected = True
+                        backoff = 1.0
+                        logger.info(f"Connected to market data stream {self.url}")
+                        await self._subscribe(ws, list(self._symbols))
+                        async for message in ws:
+                            if message.type == aiohttp.WSMsgType.BINARY:
+                                self._handle(json.loads(gzip.decompress(message.data)))
+                            elif message.type == aiohttp.WSMsgType.TEXT:
+                                self._handle(json.loads(message.data))
+                            elif message.type == aiohttp.WSMsgType.ERROR:
+                                break
+                except Exception as e:
+                    logger.warning(f"Market data stream error: {str(e)}")
+                finally:
+                    self.connected = False
+                    self._ws = None
+
+                if not self._stopping:
+                    self.reconnects += 1
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), backoff)
+                    except asyncio.TimeoutError:
+                        pass
+                    backoff = min(backoff * 2, 60.0)
+
+    async def _subscribe(self, ws, market_ids: List[str]) -> None:
+        """Subscribe to the state, depth and deals channels of the given markets"""
+        if not market_ids or ws is None:
+            return
+        requests = [
+            ('state.subscribe', {'market_list': market_ids}),
+            ('depth.subscribe', {'market_list': [[market_id, self.depth_limit, '0', True]
+                                                 for market_id in market_ids]}),
+            ('deals.subscribe', {'market_list': market_ids}),
+        ]
+        for method, params in requests:
+            await ws.send_json({'method': method, 'params': params, 'id': next(self._request_id)})
+
+    def _record(self, message: Dict) -> None:
+        """Append a received message to the recording file"""
+        try:
+            with open(self.record_path, 'a') as f:
+                f.write(json.dumps({'t': round(time.time() - self._started_at, 3), 'message': message}) + '\n')
+        except Exception as e:
+            logger.error(f"Error recording market data: {str(e)}")
+
+    def _handle(self, message: Dict) -> None:
+        """Update the local state from a pushed message and notify subscribers"""
+        self.messages += 1
+        if self.record_path:
+            self._record(message)
+
+        method = message.get('method')
+        data = message.get('data') or {}
+        if method == 'state.update':
+            for state in data.get('state_list', []):
+                self._on_ticker(state)
+        elif method == 'depth.update':
+            self._on_depth(data)
+        elif method == 'deals.update':
+            self._on_deals(data)
+        elif message.get('code'):
+            logger.warning(f"Market data stream request failed: {message.get('message')}")
+
+    def _symbol(self, market_id: str) -> str:
+        """Get the symbol for a market id"""
+        return self._symbols.get(market_id, market_id)
+
+    def _on_ticker(self, state: Dict) -> None:
+        """Handle a ticker (market state) update"""
+        symbol = self._symbol(state['market'])
+        last = float(state['last'])
+        open_price = float(state['open'])
+        ticker = {
+            'symbol': symbol,
+            'timestamp': int(time.time() * 1000),
+            'last': last,
+            'open': open_price,
+            'close': last,
+            'high': float(state['high']),
+            'low': float(state['low']),
+            'baseVolume': float(state['volume']),
+            'quoteVolume': float(state.get('value', 0)),
+            'change': last - open_price,
+            'percentage': (last - open_price) / open_price * 100 if open_price else None,
+        }
+        with self._lock:
+            self.tickers[symbol] = ticker
+            self._updated_at[('ticker', symbol)] = time.time()
+        self._notify('ticker', symbol, ticker)
+
+    def _on_depth(self, data: Dict) -> None:
+        """Handle a full or incremental order book update"""
+        symbol = self._symbol(data['market'])
+        depth = data['depth']
+        with self._lock:
+            book = self.order_books.get(symbol)
+            if data.get('is_full') or book is None:
+                book = self.order_books[symbol] = {'bids': {}, 'asks': {}}
+            for side in ('bids', 'asks'):
+                for price, amount in depth.get(side, []):
+                    if float(amount) == 0:
+                        book[side].pop(float(price), None)
+                    else:
+                        book[side][float(price)] = float(amount)
+            book['timestamp'] = depth.get('updated_at')
+            self._updated_at[('depth', symbol)] = time.time()
+        self._notify('depth', symbol, self.get_order_book(symbol))
+
+    def _on_deals(self, data: Dict) -> None:
+        """Handle new deals and fold them into the klines"""
+        symbol = self._symbol(data['market'])
+        # Deals are pushed newest first
+        deals = sorted(data.get('deal_list', []), key=lambda deal: deal['created_at'])
+        closed = []
+        with self._lock:
+            for deal in deals:
+                price = float(deal['price'])
+                amount = float(deal['amount'])
+                for timeframe in self.timeframes:
+                    timeframe_ms = timeframe_to_ms(timeframe)
+                    start = deal['created_at'] - deal['created_at'] % timeframe_ms
+                    kline = self.klines.get((symbol, timeframe))
+                    if kline is None or start > kline[0]:
+                        if kline is not None:
+                            closed.append((timeframe, kline))
+                        self.klines[(symbol, timeframe)] = [start, price, price, price, price, amount]
+                    elif start == kline[0]:
+                        kline[2] = max(kline[2], price)
+                        kline[3] = min(kline[3], price)
+                        kline[4] = price
+                        kline[5] += amount
+            self._updated_at[('trades', symbol)] = time.time()
+
+        self._notify('trades', symbol, deals)
+        for timeframe, kline in closed:
+            self._notify('kline', symbol, {'timeframe': timeframe, 'kline': kline, 'closed': True})
+        for timeframe in self.timeframes:
+            kline = self.get_kline(symbol, timeframe)
+            if kline:
+                self._notify('kline', symbol, {'timeframe': timeframe, 'kline': kline, 'closed': False})
+
+    def _notify(self, channel: str, symbol: str, data: Any) -> None:
+        """Call the subscribers, logging rather than propagating their errors"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(channel, symbol, data)
+            except Exception as e:
+                logger.error(f"Error in market data subscriber: {str(e)}")
+
+
+# Shared stream used by the bot and the dashboard
+market_stream = MarketDataStream()
@@ -0,0 +1,183 @@
+import os
+import time
+import logging
+import threading
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, joinedload
+
+from app import db
+from models import BotSettings, ConfigVersion, TradingStrategy
+
+logger = logging.getLogger(__name__)
+
+
+class PairConfig(NamedTuple):
+    """Trading pair as seen by the bot"""
+    id: int
+    symbol: str
+    base_currency: str
+    quote_currency: str
+    is_active: bool
+
+
+class StrategyConfig(NamedTuple):
+    """Active strategy with its trading pair"""
+    id: int
+    name: str
+    strategy_type: str
+    parameters: Mapping[str, Any]
+    updated_at: Any
+    trading_pair_id: int
+    trading_pair: Optional[PairConfig]
+
+
+class SettingsConfig(NamedTuple):
+    """Bot settings"""
+    api_key: Optional[str]
+    api_secret: Optional[str]
+    max_daily_trades: int
+    max_trade_size: float
+    risk_level: str
+    is_active: bool
+
+
+class ConfigSnapshot(NamedTuple):
+    """Immutable view of the bot configuration at one config version"""
+    version: int
+    settings: Optional[SettingsConfig]
+    strategies: Tuple[StrategyConfig, ...]
+
+
+def bump_config_version() -> None:
+    """
+    Record a configuration change in the current session
+
+    Call before committing any change to settings, strategies or trading
+    pairs, so the bot reloads its configuration snapshot. The version row
+    is created at startup (see app.py), so this is a plain UPDATE.
+    """
+    db.session.query(ConfigVersion).filter_by(id=1).update(
+        {ConfigVersion.version: ConfigVersion.version + 1}, synchronize_session=False
+    )
+    db.session.info['config_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _config_committed(session: Session) -> None:
+    """Let this process pick up its own changes without waiting for the next check"""
+    if session.info.pop('config_changed', False):
+        config_store.mark_changed()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _config_rolled_back(session: Session) -> None:
+    """Forget a version bump that was rolled back"""
+    session.info.pop('config_changed', None)
+
+
+class ConfigStore:
+    """
+    Holds the current configuration snapshot and swaps it when the version changes
+
+    Between checks, current() returns the snapshot without touching the
+    database. The version row is read after a change in this process and
+    otherwise every check interval (for changes made by other processes);
+    the configuration itself is reloaded only when the version differs.
+    """
+
+    def __init__(self, check_interval: float = 10.0):
+        """
+        Initialize the store
+
+        Args:
+            check_interval: Seconds between version checks when no local change was made
+        """
+        self.check_interval = check_interval
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._checked_at = 0.0
+        self._changed = False
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def mark_changed(self) -> None:
+        """Check the version on the next call to current()"""
+        with self._lock:
+            self._changed = True
+
+    def current(self) -> ConfigSnapshot:
+        """
+        Get the current configuration snapshot
+
+        Must be called inside an application context.
+
+        Returns:
+            ConfigSnapshot instance
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._snapshot is not None and not self._changed and now - self._checked_at < self.check_interval:
+                return self._snapshot
+
+            # A change marked before this read is covered by it, even if another
+            # caller already loaded the new version
+            self._checked_at = now
+            version = self._read_version()
+            self._changed = False
+            if self._snapshot is None or version != self._snapshot.version:
+                self._snapshot = self._load(version)
+                self.loads += 1
+                logger.info(f"Loaded configuration version {version} "
+                            f"({len(self._snapshot.strategies)} active strategies)")
+            return self._snapshot
+
+    @staticmethod
+    def _read_version() -> int:
+        """Read the configuration version from the database"""
+        version = db.session.query(ConfigVersion.version).filter_by(id=1).scalar()
+        return version or 0
+
+    @staticmethod
+    def _load(version: int) -> ConfigSnapshot:
+        """Load settings and active strategies with their pairs in two queries"""
+        settings = db.session.query(BotSettings).first()
+        strategies = (db.session.query(TradingStrategy)
+                      .options(joinedload(TradingStrategy.trading_pair))
+                      .filter_by(is_active=True)
+                      .all())
+
+        return ConfigSnapshot(
+            version=version,
+            settings=SettingsConfig(
+                api_key=settings.api_key,
+                api_secret=settings.api_secret,
+                max_daily_trades=settings.max_daily_trades,
+                max_trade_size=settings.max_trade_size,
+                risk_level=settings.risk_level,
+                is_active=bool(settings.is_active)
+            ) if settings else None,
+            strategies=tuple(
+                StrategyConfig(
+                    id=strategy.id,
+                    name=strategy.name,
+                    strategy_type=strategy.strategy_type,
+                    parameters=MappingProxyType(dict(strategy.parameters or {})),
+                    updated_at=strategy.updated_at,
+                    trading_pair_id=strategy.trading_pair_id,
+                    trading_pair=PairConfig(
+                        id=strategy.trading_pair.id,
+                        symbol=strategy.trading_pair.symbol,
+                        base_currency=strategy.trading_pair.base_currency,
+                        quote_currency=strategy.trading_pair.quote_currency,
+                        is_active=bool(strategy.trading_pair.is_active)
+                    ) if strategy.trading_pair else None
+                )
+                for strategy in strategies
+            )
+        )
+
+
+# Shared by the bot and the routes that edit the configuration
+config_store = ConfigStore(float(os.environ.get('CONFIG_CHECK_INTERVAL', 10)))
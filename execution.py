@@ -0,0 +1,406 @@
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from candles import Candles, PRICE_COLUMNS
+from indicators import IndicatorSet, calculate_indicators, compute_batch
+from trading_strategies import strategy_registry
+
+logger = logging.getLogger(__name__)
+
+# Stages whose queues are measured
+STAGE_FETCH = 'fetch'
+STAGE_SIGNAL = 'signal'
+
+# (shared memory block name, number of candles)
+SharedCandlesHandle = Tuple[str, int]
+
+# (strategy id, row version, strategy type, parameters)
+StrategySpec = Tuple[Hashable, Any, str, Dict]
+
+
+class SharedCandles:
+    """
+    Candles copied once into a shared memory block for worker processes
+
+    The block holds the int64 timestamps followed by one contiguous float64
+    array per price column, so workers attach to it and build Candles views
+    without copying or pickling the arrays. The creating process must call
+    close() when the workers are done to free the block.
+    """
+
+    def __init__(self, candles: Candles):
+        """
+        Copy candles into a new shared memory block
+
+        Args:
+            candles: Candles to share
+        """
+        self.size = len(candles)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, 8 * self.size * (1 + len(PRICE_COLUMNS))))
+        timestamp, columns = self.views(self._shm.buf, self.size)
+        timestamp[:] = candles.timestamp
+        for name, column in zip(PRICE_COLUMNS, columns):
+            column[:] = candles.column(name)
+
+    @property
+    def handle(self) -> SharedCandlesHandle:
+        """Picklable reference passed to worker processes"""
+        return self._shm.name, self.size
+
+    @staticmethod
+    def views(buffer, size: int) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """Get the timestamp and price column arrays over a shared buffer"""
+        timestamp = np.ndarray(size, dtype=np.int64, buffer=buffer)
+        columns = [np.ndarray(size, dtype=np.float64, buffer=buffer, offset=8 * size * (i + 1))
+                   for i in range(len(PRICE_COLUMNS))]
+        return timestamp, columns
+
+    def close(self) -> None:
+        """Release and free the shared memory block"""
+        self._shm.close()
+        self._shm.unlink()
+
+
+def evaluate_signals(candles: Candles, symbol: str, timeframe: str, strategies: List[StrategySpec],
+                     indicators: Optional[IndicatorSet] = None) -> List[Optional[str]]:
+    """
+    Get the signal of several strategies on the same candles
+
+    Indicators are computed once and shared by all strategies, whose
+    instances come from this process's strategy_registry.
+
+    Args:
+        candles: OHLCV candles
+        symbol: Trading pair symbol, used as the indicator cache key
+        timeframe: Candle timeframe, used as the indicator cache key
+        strategies: (strategy id, version, strategy type, parameters) of each strategy
+        indicators: Indicator set for the candles, e.g. filled by batch_indicators (optional)
+
+    Returns:
+        Signal per strategy, None where the strategy could not be created
+    """
+    if indicators is None:
+        indicators = calculate_indicators(candles, symbol=symbol, timeframe=timeframe)
+    signals = []
+    for strategy_id, version, strategy_type, parameters in strategies:
+        strategy = strategy_registry.get(strategy_id, strategy_type, parameters, version)
+        signals.append(strategy.latest_signal(candles, indicators) if strategy else None)
+    return signals
+
+
+def batch_indicators(tasks: Dict[Hashable, Tuple[Candles, str, str, List[StrategySpec]]]) -> Dict[Hashable, IndicatorSet]:
+    """
+    Compute the indicators the strategies of many groups read, across groups at once
+
+    Each distinct indicator request is computed with one compute_batch call
+    over the candles of every group that needs it, instead of once per group.
+
+    Args:
+        tasks: (candles, symbol, timeframe, [(strategy id, version, type, parameters), ...]) keyed by task
+
+    Returns:
+        Filled indicator set keyed by task, to pass to evaluate_signals
+    """
+    indicator_sets = {}
+    requests = {}
+    for key, (candles, symbol, timeframe, strategies) in tasks.items():
+        indicator_sets[key] = calculate_indicators(candles, symbol=symbol, timeframe=timeframe)
+        for strategy_id, version, strategy_type, parameters in strategies:
+            strategy = strategy_registry.get(strategy_id, strategy_type, parameters, version)
+            for name, params in strategy.required_indicators() if strategy else []:
+                request = requests.setdefault((name, tuple(sorted(params.items()))), {})
+                request[key] = indicator_sets[key]
+
+    for (name, params), sets in requests.items():
+        compute_batch(list(sets.values()), name, **dict(params))
+    return indicator_sets
+
+
+def _evaluate_shared_signals(handle: SharedCandlesHandle, symbol: str, timeframe: str,
+                             strategies: List[StrategySpec]) -> List[Optional[str]]:
+    """Worker process entry point: evaluate_signals on candles in shared memory"""
+    name, size = handle
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        timestamp, columns = SharedCandles.views(shm.buf, size)
+        signals = evaluate_signals(Candles(timestamp, *columns), symbol, timeframe, strategies)
+        # Views must be dropped before the block can be closed
+        del timestamp, columns
+        return signals
+    finally:
+        shm.close()
+
+
+class StageMetrics:
+    """Queue and run time statistics of one pipeline stage"""
+
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.queued = 0
+        self.running = 0
+        self.queue_time = 0.0
+        self.max_queue_time = 0.0
+        self.run_time = 0.0
+        self.max_run_time = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'timed_out': self.timed_out,
+            'queued': self.queued,
+            'running': self.running,
+            'avg_queue_time': self.queue_time / finished if finished else 0.0,
+            'max_queue_time': self.max_queue_time,
+            'avg_run_time': self.run_time / finished if finished else 0.0,
+            'max_run_time': self.max_run_time,
+        }
+
+
+class ExecutionPool:
+    """
+    Thread pool for exchange I/O and optional process pool for signal computation
+
+    Tasks are submitted per stage and collected with a deadline, so a slow
+    pair is reported as timed out instead of stalling the whole cycle.
+    Without worker processes, signals are computed on the calling thread;
+    a running computation cannot be interrupted there, so the deadline is
+    checked between tasks and the tasks left when it passes are skipped.
+    """
+
+    def __init__(self, io_workers: int = 8, cpu_workers: int = 0, task_timeout: float = 30.0):
+        """
+        Initialize the pools
+
+        Args:
+            io_workers: Threads for exchange requests
+            cpu_workers: Processes for indicator and signal computation (0 disables the process pool)
+            task_timeout: Seconds a batch of tasks may take before unfinished ones are abandoned
+        """
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+        self.task_timeout = task_timeout
+
+        self._io = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix='bot-io')
+        self._cpu = None
+        self._metrics = {STAGE_FETCH: StageMetrics(), STAGE_SIGNAL: StageMetrics()}
+        # Unfinished process pool futures per stage, to tell queued from running tasks
+        self._process_tasks = {STAGE_FETCH: set(), STAGE_SIGNAL: set()}
+        # Reentrant since cancelling a future in _collect runs its done callback on the spot
+        self._lock = threading.RLock()
+
+    def _cpu_pool(self) -> ProcessPoolExecutor:
+        """
+        Start the process pool on first use
+
+        Workers come from a forkserver, so they do not inherit the bot's
+        threads, sockets or held locks. Like spawned processes they import
+        the main module, which must keep its startup code under
+        if __name__ == '__main__' (main.py does).
+        """
+        if self._cpu is None:
+            self._cpu = ProcessPoolExecutor(max_workers=self.cpu_workers,
+                                            mp_context=multiprocessing.get_context('forkserver'))
+            logger.info("Started %d signal worker processes", self.cpu_workers)
+        return self._cpu
+
+    def _timed(self, stage: str, fn: Callable, submitted_at: float) -> Callable:
+        """Wrap a task to record its queue and run time"""
+        def run(*args):
+            started_at = time.monotonic()
+            with self._lock:
+                metrics = self._metrics[stage]
+                metrics.queued -= 1
+                metrics.running += 1
+                metrics.queue_time += started_at - submitted_at
+                metrics.max_queue_time = max(metrics.max_queue_time, started_at - submitted_at)
+            try:
+                return fn(*args)
+            finally:
+                run_time = time.monotonic() - started_at
+                with self._lock:
+                    metrics.running -= 1
+                    metrics.run_time += run_time
+                    metrics.max_run_time = max(metrics.max_run_time, run_time)
+        return run
+
+    def _submit(self, stage: str, executor, fn: Callable, *args) -> Future:
+        with self._lock:
+            self._metrics[stage].submitted += 1
+            self._metrics[stage].queued += 1
+        if isinstance(executor, ProcessPoolExecutor):
+            # Timing wrappers cannot be pickled; time the task from this process instead
+            future = executor.submit(fn, *args)
+            submitted_at = time.monotonic()
+            with self._lock:
+                self._process_tasks[stage].add(future)
+            future.add_done_callback(lambda f: self._record_process_task(stage, f, submitted_at))
+            return future
+        return executor.submit(self._timed(stage, fn, time.monotonic()), *args)
+
+    def _record_process_task(self, stage: str, future: Future, submitted_at: float) -> None:
+        """Record a finished process pool task, counting its whole latency as run time"""
+        run_time = time.monotonic() - submitted_at
+        with self._lock:
+            self._process_tasks[stage].discard(future)
+            if future.cancelled():
+                # Already counted by _collect
+                return
+            metrics = self._metrics[stage]
+            metrics.queued -= 1
+            metrics.run_time += run_time
+            metrics.max_run_time = max(metrics.max_run_time, run_time)
+
+    def _collect(self, stage: str, futures: Dict[Hashable, Future]) -> Dict[Hashable, Any]:
+        """Wait for tasks until the deadline and return the results of the successful ones"""
+        done, not_done = wait(futures.values(), timeout=self.task_timeout)
+        results = {}
+        with self._lock:
+            metrics = self._metrics[stage]
+            for key, future in futures.items():
+                if future in not_done:
+                    # Abandon the task; it still finishes in the background if already running
+                    metrics.timed_out += 1
+                    if future.cancel():
+                        metrics.queued -= 1
+                    logger.warning("%s task for %s timed out after %ss", stage, key, self.task_timeout)
+                elif future.exception() is not None:
+                    metrics.failed += 1
+                    logger.error("%s task for %s failed: %s", stage, key, future.exception())
+                else:
+                    metrics.completed += 1
+                    results[key] = future.result()
+        return results
+
+    def map_io(self, fn: Callable, tasks: Dict[Hashable, Tuple]) -> Dict[Hashable, Any]:
+        """
+        Run I/O tasks on the thread pool
+
+        Args:
+            fn: Function to call
+            tasks: Arguments of each call keyed by task
+
+        Returns:
+            Results keyed by task; failed and timed out tasks are left out
+        """
+        futures = {key: self._submit(STAGE_FETCH, self._io, fn, *args) for key, args in tasks.items()}
+        return self._collect(STAGE_FETCH, futures)
+
+    def evaluate(self, tasks: Dict[Hashable, Tuple[Candles, str, str, List[StrategySpec]]]) -> Dict[Hashable, List]:
+        """
+        Compute strategy signals, in worker processes if enabled
+
+        Args:
+            tasks: (candles, symbol, timeframe, [(strategy id, version, type, parameters), ...]) keyed by task
+
+        Returns:
+            Signals per strategy keyed by task; failed and timed out tasks are left out
+        """
+        if not self.cpu_workers:
+            deadline = time.monotonic() + self.task_timeout
+            try:
+                indicator_sets = batch_indicators(tasks)
+            except Exception as e:
+                logger.error("Error computing batched indicators: %s", e)
+                indicator_sets = {}
+            futures = {}
+            skipped = []
+            for key, args in tasks.items():
+                if time.monotonic() > deadline:
+                    skipped.append(key)
+                else:
+                    futures[key] = self._run_inline(STAGE_SIGNAL, evaluate_signals, *args, indicator_sets.get(key))
+            if skipped:
+                with self._lock:
+                    self._metrics[STAGE_SIGNAL].timed_out += len(skipped)
+                logger.warning("%s tasks for %s skipped after %ss", STAGE_SIGNAL, skipped, self.task_timeout)
+            return self._collect(STAGE_SIGNAL, futures)
+
+        shared = {}
+        futures = {}
+        try:
+            for key, (candles, symbol, timeframe, strategies) in tasks.items():
+                shared[key] = SharedCandles(candles)
+                futures[key] = self._submit(STAGE_SIGNAL, self._cpu_pool(), _evaluate_shared_signals,
+                                            shared[key].handle, symbol, timeframe, strategies)
+            return self._collect(STAGE_SIGNAL, futures)
+        finally:
+            for key, block in shared.items():
+                future = futures.get(key)
+                if future is None or future.done():
+                    block.close()
+                else:
+                    # A worker may still attach to the block; free it once the abandoned task ends
+                    future.add_done_callback(lambda _, block=block: block.close())
+
+    def _run_inline(self, stage: str, fn: Callable, *args) -> Future:
+        """Run a task on the calling thread, returning its settled future"""
+        with self._lock:
+            self._metrics[stage].submitted += 1
+            self._metrics[stage].queued += 1
+        future = Future()
+        try:
+            future.set_result(self._timed(stage, fn, time.monotonic())(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pool sizes and per-stage queue metrics
+
+        Process pool tasks count as running once the pool has handed them
+        to its workers' call queue.
+        """
+        with self._lock:
+            stages = {}
+            for stage, metrics in self._metrics.items():
+                stages[stage] = metrics.to_dict()
+                running = sum(1 for future in self._process_tasks[stage] if future.running())
+                stages[stage]['queued'] -= running
+                stages[stage]['running'] += running
+            return {
+                'io_workers': self.io_workers,
+                'cpu_workers': self.cpu_workers,
+                'task_timeout': self.task_timeout,
+                'stages': stages,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the pools without waiting for abandoned tasks"""
+        self._io.shutdown(wait=False, cancel_futures=True)
+        if self._cpu is not None:
+            self._cpu.shutdown(wait=False, cancel_futures=True)
+            self._cpu = None
+
+
+def create_execution_pool() -> ExecutionPool:
+    """
+    Create the bot's execution pool from the environment
+
+    BOT_IO_WORKERS (default 8) sets the I/O threads, BOT_CPU_WORKERS the
+    signal worker processes (default 0, 'auto' for one per core) and
+    BOT_TASK_TIMEOUT (default 30) the per-task deadline in seconds.
+
+    Returns:
+        ExecutionPool instance
+    """
+    cpu_workers = os.environ.get('BOT_CPU_WORKERS', '0')
+    return ExecutionPool(
+        io_workers=int(os.environ.get('BOT_IO_WORKERS', 8)),
+        cpu_workers=(os.cpu_count() or 1) if cpu_workers == 'auto' else int(cpu_workers),
+        task_timeout=float(os.environ.get('BOT_TASK_TIMEOUT', 30))
+    )
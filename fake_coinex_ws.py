@@ -0,0 +1,225 @@
+"""
+Local stand-in for the CoinEx v2 spot WebSocket
+
+Replays a recording made with MarketDataStream(record_path=...) or, without
+a recording, generates random-walk ticker, depth and deal updates for every
+subscribed market. Point the stream at it with COINEX_WS_URL or the url
+argument to test and benchmark offline:
+
+    python fake_coinex_ws.py --port 8765 --replay recording.jsonl --speed 10
+    COINEX_WS_URL=ws://127.0.0.1:8765/v2/spot python main.py
+"""
+import gzip
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import threading
+from typing import Dict, List, Optional, Set
+
+from aiohttp import web, WSMsgType
+
+logger = logging.getLogger(__name__)
+
+
+class FakeCoinExWebSocketServer:
+    """Minimal CoinEx v2 WebSocket server for offline testing"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, replay_path: Optional[str] = None,
+                 speed: float = 1.0, rate: float = 5.0, compress: bool = True, loop_replay: bool = True):
+        """
+        Initialize the fake server
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            replay_path: JSONL recording to replay; synthetic data is generated if None
+            speed: Replay speed multiplier
+            rate: Synthetic updates per second per market and channel
+            compress: Send gzip-compressed binary frames like CoinEx does
+            loop_replay: Start the recording over when it ends
+        """
+        self.host = host
+        self.port = port
+        self.replay_path = replay_path
+        self.speed = speed
+        self.rate = rate
+        self.compress = compress
+        self.loop_replay = loop_replay
+
+        # Per client: subscribed market ids by channel
+        self._clients: Dict[web.WebSocketResponse, Dict[str, Set[str]]] = {}
+        self._prices: Dict[str, float] = {}
+        self._deal_id = 0
+        self.sent = 0
+
+        self._runner = None
+        self._loop = None
+        self._thread = None
+        self._started = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v2/spot"
+
+    async def _send(self, ws: web.WebSocketResponse, message: Dict) -> None:
+        """Send a message in the CoinEx framing"""
+        payload = json.dumps(message)
+        if self.compress:
+            await ws.send_bytes(gzip.compress(payload.encode()))
+        else:
+            await ws.send_str(payload)
+        self.sent += 1
+
+    async def _handle_client(self, request: web.Request) -> web.WebSocketResponse:
+        """Answer subscriptions and pings for one client"""
+        ws = web.WebSocketResponse(heartbeat=20)
+        await ws.prepare(request)
+        subscriptions = self._clients[ws] = {'state': set(), 'depth': set(), 'deals': set()}
+
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                request_data = json.loads(message.data)
+                method = request_data.get('method', '')
+                channel, _, action = method.partition('.')
+                if action == 'subscribe' and channel in subscriptions:
+                    for market in request_data.get('params', {}).get('market_list', []):
+                        subscriptions[channel].add(market[0] if isinstance(market, list) else market)
+                    await self._send(ws, {'id': request_data.get('id'), 'code': 0, 'message': 'OK'})
+                elif method == 'server.ping':
+                    await self._send(ws, {'id': request_data.get('id'), 'code': 0, 'message': 'OK',
+                                          'data': {'result': 'pong'}})
+                else:
+                    await self._send(ws, {'id': request_data.get('id'), 'code': 20001,
+                                          'message': f"unsupported method {method}"})
+        finally:
+            del self._clients[ws]
+        return ws
+
+    async def _broadcast(self, channel: str, market: str, message: Dict) -> None:
+        """Send a message to every client subscribed to the channel and market"""
+        for ws, subscriptions in list(self._clients.items()):
+            if market in subscriptions[channel] and not ws.closed:
+                await self._send(ws, message)
+
+    async def _replay(self) -> None:
+        """Replay recorded messages at their recorded pace"""
+        with open(self.replay_path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        if not records:
+            return
+
+        while True:
+            start = time.monotonic()
+            for record in records:
+                delay = record['t'] / self.speed - (time.monotonic() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                message = record['message']
+                channel = (message.get('method') or '').split('.')[0]
+                if channel not in ('state', 'depth', 'deals'):
+                    continue
+                data = message.get('data') or {}
+                markets = ([state['market'] for state in data.get('state_list', [])]
+                           if channel == 'state' else [data.get('market')])
+                for market in set(markets):
+                    await self._broadcast(channel, market, message)
+            if not self.loop_replay:
+                return
+
+    def _synthetic_messages(self, market: str) -> List[Dict]:
+        """Generate one ticker, depth and deals update for a market"""
+        price = self._prices.get(market, 100.0) * (1 + random.gauss(0, 0.001))
+        self._prices[market] = price
+        now = int(time.time() * 1000)
+        self._deal_id += 1
+
+        return [
+            {'method': 'state.update', 'id': None, 'data': {'state_list': [{
+                'market': market, 'last': f"{price:.6f}", 'open': '100', 'close': f"{price:.6f}",
+                'high': f"{max(price, 100.0):.6f}", 'low': f"{min(price, 100.0):.6f}",
+                'volume': '1000', 'value': f"{1000 * price:.2f}", 'period': 86400
+            }]}},
+            {'method': 'depth.update', 'id': None, 'data': {'market': market, 'is_full': True, 'depth': {
+                'bids': [[f"{price * (1 - 0.0005 * i):.6f}", '1'] for i in range(1, 11)],
+                'asks': [[f"{price * (1 + 0.0005 * i):.6f}", '1'] for i in range(1, 11)],
+                'last': f"{price:.6f}", 'updated_at': now
+            }}},
+            {'method': 'deals.update', 'id': None, 'data': {'market': market, 'deal_list': [{
+                'deal_id': self._deal_id, 'created_at': now, 'side': random.choice(['buy', 'sell']),
+                'price': f"{price:.6f}", 'amount': '0.1'
+            }]}},
+        ]
+
+    async def _generate(self) -> None:
+        """Push synthetic updates for every subscribed market"""
+        while True:
+            await asyncio.sleep(1 / self.rate)
+            markets = set()
+            for subscriptions in list(self._clients.values()):
+                for channel_markets in subscriptions.values():
+                    markets.update(channel_markets)
+            for market in markets:
+                for message in self._synthetic_messages(market):
+                    await self._broadcast(message['method'].split('.')[0], market, message)
+
+    async def _serve(self) -> None:
+        """Start the HTTP server and the data producer"""
+        app = web.Application()
+        app.router.add_get('/v2/spot', self._handle_client)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"Fake CoinEx WebSocket listening on {self.url}")
+        self._started.set()
+        await (self._replay() if self.replay_path else self._generate())
+
+    def run(self) -> None:
+        """Serve until interrupted"""
+        asyncio.run(self._serve())
+
+    def start(self) -> None:
+        """Serve on a background thread and wait until it is listening"""
+        def target():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self._serve())
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self._loop.run_until_complete(self._runner.cleanup())
+                self._loop.close()
+
+        self._thread = threading.Thread(target=target, name='fake-coinex-ws', daemon=True)
+        self._thread.start()
+        self._started.wait(timeout=5.0)
+
+    def stop(self) -> None:
+        """Stop a server started with start()"""
+        if self._loop:
+            for task in asyncio.all_tasks(self._loop):
+                self._loop.call_soon_threadsafe(task.cancel)
+        if self._thread:
+            self._thread.join(timeout=5.0)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake CoinEx WebSocket server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--replay', help='JSONL recording made with MarketDataStream(record_path=...)')
+    parser.add_argument('--speed', type=float, default=1.0, help='Replay speed multiplier')
+    parser.add_argument('--rate', type=float, default=5.0, help='Synthetic updates per second per market')
+    parser.add_argument('--no-compress', action='store_true', help='Send plain text frames')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    FakeCoinExWebSocketServer(args.host, args.port, args.replay, args.speed, args.rate,
+                              compress=not args.no_compress).run()
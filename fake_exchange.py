@@ -0,0 +1,683 @@
+"""
+Offline stand-in for the CoinEx exchange
+
+FakeMarket simulates deterministic synthetic (or recorded) prices, balances
+and order fills. FakeExchange and AsyncFakeExchange expose it through the
+subset of the ccxt interface the app uses, with configurable latency, error
+rate and rate limit. FakeExchangeServer serves the same market over HTTP,
+and HttpFakeExchange is the matching ccxt-compatible client, so requests
+pay real network and serialization costs. install() makes ccxt.coinex build
+these fakes, so CoinExAPI, TradingBot and the routes run unchanged.
+
+    python fake_exchange.py serve --port 8780 --latency 0.05
+    python fake_exchange.py benchmark --pairs 10 100 1000 --latency 0.05
+"""
+import os
+import json
+import math
+import time
+import zlib
+import random
+import asyncio
+import argparse
+import itertools
+import threading
+import urllib.error
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import ccxt
+import ccxt.async_support
+import numpy as np
+
+DAY_MS = 86400000
+
+# Well-known symbols used first when generating pairs
+DEFAULT_SYMBOLS = ['BTC/USDT', 'ETH/USDT', 'XRP/USDT', 'SOL/USDT', 'DOGE/USDT']
+
+
+class FakeMarket:
+    """
+    Simulated market state shared by fake exchange clients
+
+    Synthetic prices are a deterministic function of symbol and time, so
+    candles fetched at different moments agree with each other. Recorded
+    candles can be supplied per symbol and timeframe instead.
+    """
+
+    def __init__(self, symbols: Optional[List[str]] = None, pairs: int = 10,
+                 recording: Optional[Dict[str, Dict[str, List]]] = None,
+                 balance: Optional[Dict[str, float]] = None, fee_rate: float = 0.002):
+        """
+        Initialize the fake market
+
+        Args:
+            symbols: Trading pair symbols (generated if None)
+            pairs: Number of symbols to generate when symbols is None
+            recording: Recorded candles as {symbol: {timeframe: [[timestamp, o, h, l, c, v], ...]}}
+            balance: Starting free balance per currency
+            fee_rate: Fee charged on filled orders, as a fraction of the cost
+        """
+        if symbols is None:
+            symbols = DEFAULT_SYMBOLS[:pairs] + [f"C{i:04d}/USDT" for i in range(max(0, pairs - len(DEFAULT_SYMBOLS)))]
+        self.symbols = symbols
+        self.recording = recording or {}
+        self.fee_rate = fee_rate
+        self.balance = dict(balance or {'USDT': 100000.0})
+        self.orders: Dict[str, Dict] = {}
+        # Requests and simulated errors across all in-process clients
+        self.requests = 0
+        self.errors = 0
+        self._order_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_recording(cls, path: str, **kwargs) -> "FakeMarket":
+        """
+        Create a market serving candles from a JSON recording
+
+        Args:
+            path: JSON file with {symbol: {timeframe: [[timestamp, o, h, l, c, v], ...]}}
+            **kwargs: Other FakeMarket arguments
+
+        Returns:
+            FakeMarket instance
+        """
+        with open(path) as f:
+            recording = json.load(f)
+        return cls(symbols=list(recording), recording=recording, **kwargs)
+
+    def markets(self) -> Dict[str, Dict]:
+        """Get ccxt-style market metadata for all symbols"""
+        markets = {}
+        for symbol in self.symbols:
+            base, quote = symbol.split('/')
+            markets[symbol] = {
+                'id': f"{base}{quote}", 'symbol': symbol, 'base': base, 'quote': quote,
+                'baseId': base, 'quoteId': quote, 'type': 'spot', 'spot': True, 'active': True,
+                'precision': {'amount': 1e-8, 'price': 1e-8},
+                'limits': {'amount': {'min': 1e-8, 'max': None}, 'cost': {'min': 1.0, 'max': None}},
+            }
+        return markets
+
+    def price(self, symbol: str, timestamps) -> np.ndarray:
+        """
+        Get synthetic prices at the given times
+
+        Args:
+            symbol: Trading pair symbol
+            timestamps: Times in milliseconds
+
+        Returns:
+            Prices as a float array
+        """
+        seed = zlib.crc32(symbol.encode())
+        base = 1 + seed % 1000
+        phases = [(seed >> shift) % 628 / 100 for shift in (3, 11, 19)]
+        t = np.asarray(timestamps, dtype=np.float64)
+        return base * (1
+                       + 0.04 * np.sin(2 * math.pi * t / (3 * DAY_MS) + phases[0])
+                       + 0.015 * np.sin(2 * math.pi * t / (7 * 3600000) + phases[1])
+                       + 0.004 * np.sin(2 * math.pi * t / (53 * 60000) + phases[2]))
+
+    def last_price(self, symbol: str, now: int) -> float:
+        """Get the current price of a symbol"""
+        recorded = self._recorded(symbol)
+        if recorded:
+            return float(recorded[-1][4])
+        return float(self.price(symbol, [now])[0])
+
+    def _recorded(self, symbol: str, timeframe: Optional[str] = None) -> Optional[List]:
+        """Get recorded candles for a symbol, of the given or any timeframe"""
+        timeframes = self.recording.get(symbol)
+        if not timeframes:
+            return None
+        return timeframes.get(timeframe) if timeframe else next(iter(timeframes.values()))
+
+    def ohlcv(self, symbol: str, timeframe: str, since: Optional[int], limit: Optional[int], now: int) -> List[List]:
+        """
+        Get candles like fetch_ohlcv, the last one still forming
+
+        Args:
+            symbol: Trading pair symbol
+            timeframe: Candle timeframe
+            since: Earliest candle open time in milliseconds
+            limit: Maximum number of candles
+            now: Current time in milliseconds
+
+        Returns:
+            [timestamp, open, high, low, close, volume] rows
+        """
+        limit = limit or 100
+        recorded = self._recorded(symbol, timeframe)
+        if recorded is not None:
+            rows = [row for row in recorded if since is None or row[0] >= since]
+            return rows[:limit] if since is not None else rows[-limit:]
+
+        timeframe_ms = int(ccxt.Exchange.parse_timeframe(timeframe) * 1000)
+        last_start = now - now % timeframe_ms
+        if since is None:
+            first_start = last_start - (limit - 1) * timeframe_ms
+        else:
+            first_start = -(-since // timeframe_ms) * timeframe_ms
+        starts = np.arange(first_start, last_start + 1, timeframe_ms, dtype=np.int64)[:limit]
+        if not len(starts):
+            return []
+
+        opens = self.price(symbol, starts)
+        closes = self.price(symbol, np.minimum(starts + timeframe_ms, now))
+        highs = np.maximum(opens, closes) * 1.002
+        lows = np.minimum(opens, closes) * 0.998
+        volumes = 1000 + (starts // timeframe_ms) % 97 * 10.0
+        return np.column_stack((starts, opens, highs, lows, closes, volumes)).tolist()
+
+    def ticker(self, symbol: str, now: int) -> Dict:
+        """Get a ccxt-style ticker"""
+        if symbol not in self.symbols:
+            raise ccxt.BadSymbol(f"fake exchange does not have market symbol {symbol}")
+        samples = self.price(symbol, np.linspace(now - DAY_MS, now, 25))
+        last = self.last_price(symbol, now)
+        open_price = float(samples[0])
+        return {
+            'symbol': symbol, 'timestamp': now, 'last': last, 'close': last, 'open': open_price,
+            'high': float(samples.max()), 'low': float(samples.min()),
+            'bid': last * 0.9995, 'ask': last * 1.0005, 'baseVolume': 1000.0, 'quoteVolume': 1000.0 * last,
+            'change': last - open_price, 'percentage': (last - open_price) / open_price * 100,
+        }
+
+    def fetch_balance(self) -> Dict:
+        """Get a ccxt-style balance"""
+        with self._lock:
+            balance = {currency: {'free': amount, 'used': 0.0, 'total': amount}
+                       for currency, amount in self.balance.items()}
+        balance['free'] = {currency: value['free'] for currency, value in list(balance.items())}
+        balance['total'] = {currency: value['total'] for currency, value in balance.items() if currency != 'free'}
+        return balance
+
+    def create_order(self, symbol: str, order_type: str, side: str, amount: float,
+                     price: Optional[float], now: int) -> Dict:
+        """Fill market orders at the current price; limit orders stay open"""
+        base, quote = symbol.split('/')
+        with self._lock:
+            order_id = str(next(self._order_ids))
+            order = {
+                'id': order_id, 'symbol': symbol, 'type': order_type, 'side': side, 'amount': amount,
+                'price': price, 'filled': 0.0, 'remaining': amount, 'cost': 0.0, 'status': 'open',
+                'timestamp': now, 'fee': {'cost': 0.0, 'currency': quote},
+            }
+            if order_type == 'market':
+                fill_price = self.last_price(symbol, now)
+                cost = fill_price * amount
+                if side == 'buy' and self.balance.get(quote, 0.0) < cost:
+                    raise ccxt.InsufficientFunds(f"fake exchange: not enough {quote}")
+                if side == 'sell' and self.balance.get(base, 0.0) < amount:
+                    raise ccxt.InsufficientFunds(f"fake exchange: not enough {base}")
+
+                fee = cost * self.fee_rate
+                sign = 1 if side == 'buy' else -1
+                self.balance[base] = self.balance.get(base, 0.0) + sign * amount
+                self.balance[quote] = self.balance.get(quote, 0.0) - sign * cost - fee
+                order.update(price=fill_price, filled=amount, remaining=0.0, cost=cost, status='closed',
+                             fee={'cost': fee, 'currency': quote})
+            self.orders[order_id] = order
+            return dict(order)
+
+    def cancel_order(self, order_id: str) -> Dict:
+        """Cancel an open order"""
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None or order['status'] != 'open':
+                raise ccxt.OrderNotFound(f"fake exchange: no open order {order_id}")
+            order['status'] = 'canceled'
+            return dict(order)
+
+    def fetch_orders(self, symbol: Optional[str], status: str, limit: Optional[int] = None) -> List[Dict]:
+        """Get orders with the given status"""
+        with self._lock:
+            orders = [dict(order) for order in self.orders.values()
+                      if order['status'] == status and (symbol is None or order['symbol'] == symbol)]
+        return orders[-limit:] if limit else orders
+
+
+class FakeExchange:
+    """
+    Synchronous ccxt-compatible client of a FakeMarket
+
+    Every request sleeps for the configured latency, fails with
+    ccxt.NetworkError at the configured error rate and with
+    ccxt.RateLimitExceeded above the configured requests per second.
+    """
+
+    id = 'coinex'
+    parse_timeframe = staticmethod(ccxt.Exchange.parse_timeframe)
+
+    def __init__(self, config: Optional[Dict] = None, market: Optional[FakeMarket] = None,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: Optional[float] = None):
+        """
+        Initialize the fake exchange client
+
+        Args:
+            config: ccxt-style options (apiKey, secret, ...); only stored
+            market: Market to serve (a new synthetic one if None)
+            latency: Seconds added to every request
+            jitter: Maximum random seconds added on top of the latency
+            error_rate: Fraction of requests failing with ccxt.NetworkError
+            rate_limit: Requests per second allowed before ccxt.RateLimitExceeded
+        """
+        self.config = config or {}
+        self.market = market or FakeMarket()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+
+        self.markets = None
+        self.currencies = None
+        self.requests = 0
+        self.errors = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def milliseconds(self) -> int:
+        return int(time.time() * 1000)
+
+    def set_markets(self, markets, currencies=None) -> Dict:
+        self.markets = markets if isinstance(markets, dict) else {m['symbol']: m for m in markets}
+        self.currencies = currencies
+        return self.markets
+
+    def stats(self) -> Dict[str, int]:
+        """Get request and simulated error counts"""
+        return {'requests': self.requests, 'errors': self.errors}
+
+    def _admit(self) -> float:
+        """Apply the simulated rate limit and errors, returning the latency to wait"""
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            self.market.requests += 1
+            if self.rate_limit:
+                while self._recent and now - self._recent[0] > 1.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rate_limit:
+                    self.errors += 1
+                    self.market.errors += 1
+                    raise ccxt.RateLimitExceeded("fake exchange: rate limit exceeded")
+                self._recent.append(now)
+            if self.error_rate and random.random() < self.error_rate:
+                self.errors += 1
+                self.market.errors += 1
+                raise ccxt.NetworkError("fake exchange: simulated network error")
+        return self.latency + random.uniform(0, self.jitter)
+
+    def _call(self, fn, *args):
+        time.sleep(self._admit())
+        return fn(*args)
+
+    def load_markets(self, reload: bool = False, params: Optional[Dict] = None) -> Dict:
+        if self.markets is None or reload:
+            self.set_markets(self._call(self.market.markets))
+        return self.markets
+
+    def fetch_ticker(self, symbol: str, params: Optional[Dict] = None) -> Dict:
+        return self._call(self.market.ticker, symbol, self.milliseconds())
+
+    def fetch_tickers(self, symbols: Optional[List[str]] = None, params: Optional[Dict] = None) -> Dict:
+        return self._call(self._tickers, symbols)
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: Optional[int] = None,
+                    limit: Optional[int] = None, params: Optional[Dict] = None) -> List[List]:
+        return self._call(self.market.ohlcv, symbol, timeframe, since, limit, self.milliseconds())
+
+    def fetch_balance(self, params: Optional[Dict] = None) -> Dict:
+        return self._call(self.market.fetch_balance)
+
+    def create_order(self, symbol: str, type: str, side: str, amount: float,
+                     price: Optional[float] = None, params: Optional[Dict] = None) -> Dict:
+        return self._call(self.market.create_order, symbol, type, side, amount, price, self.milliseconds())
+
+    def cancel_order(self, id: str, symbol: Optional[str] = None, params: Optional[Dict] = None) -> Dict:
+        return self._call(self.market.cancel_order, id)
+
+    def fetch_open_orders(self, symbol: Optional[str] = None, since: Optional[int] = None,
+                          limit: Optional[int] = None, params: Optional[Dict] = None) -> List[Dict]:
+        return self._call(self.market.fetch_orders, symbol, 'open', limit)
+
+    def fetch_closed_orders(self, symbol: Optional[str] = None, since: Optional[int] = None,
+                            limit: Optional[int] = None, params: Optional[Dict] = None) -> List[Dict]:
+        return self._call(self.market.fetch_orders, symbol, 'closed', limit)
+
+    def _tickers(self, symbols: Optional[List[str]]) -> Dict[str, Dict]:
+        now = self.milliseconds()
+        return {symbol: self.market.ticker(symbol, now)
+                for symbol in (symbols or self.market.symbols) if symbol in self.market.symbols}
+
+    def close(self) -> None:
+        pass
+
+
+class AsyncFakeExchange(FakeExchange):
+    """Asyncio ccxt-compatible client of a FakeMarket, see FakeExchange"""
+
+    async def _call(self, fn, *args):
+        await asyncio.sleep(self._admit())
+        return fn(*args)
+
+    async def load_markets(self, reload: bool = False, params: Optional[Dict] = None) -> Dict:
+        if self.markets is None or reload:
+            self.set_markets(await self._call(self.market.markets))
+        return self.markets
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeExchangeServer:
+    """
+    Serves a FakeMarket over HTTP for HttpFakeExchange clients
+
+    Each POST /<method> takes {"args": [...], "kwargs": {...}} and returns
+    the result as JSON. This is a transport for the fake, not an emulation
+    of the CoinEx REST API.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8780, market: Optional[FakeMarket] = None, **options):
+        """
+        Initialize the server
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            market: Market to serve (a new synthetic one if None)
+            **options: latency, jitter, error_rate and rate_limit for FakeExchange
+        """
+        self.exchange = FakeExchange(market=market, **options)
+        exchange = self.exchange
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                method = self.path.strip('/')
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                try:
+                    if method not in HttpFakeExchange.METHODS:
+                        raise ccxt.NotSupported(f"fake exchange: unsupported method {method}")
+                    status, result = 200, getattr(exchange, method)(*body.get('args', []), **body.get('kwargs', {}))
+                except ccxt.RateLimitExceeded as e:
+                    status, result = 429, {'error': type(e).__name__, 'message': str(e)}
+                except ccxt.BaseError as e:
+                    status, result = 503 if isinstance(e, ccxt.NetworkError) else 400, \
+                        {'error': type(e).__name__, 'message': str(e)}
+                payload = json.dumps(result).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        self.httpd.serve_forever()
+
+    def start(self) -> None:
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-exchange', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop a server started with start()"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class HttpFakeExchange(FakeExchange):
+    """ccxt-compatible client of a FakeExchangeServer"""
+
+    METHODS = {'load_markets', 'fetch_ticker', 'fetch_tickers', 'fetch_ohlcv', 'fetch_balance',
+               'create_order', 'cancel_order', 'fetch_open_orders', 'fetch_closed_orders'}
+
+    def __init__(self, url: str, config: Optional[Dict] = None):
+        """
+        Initialize the HTTP client
+
+        Args:
+            url: Base URL of the FakeExchangeServer
+            config: ccxt-style options; only stored
+        """
+        super().__init__(config)
+        self.url = url.rstrip('/')
+
+    def _post(self, method: str, *args, **kwargs):
+        """Call a method on the server, raising the ccxt error it reports"""
+        self.requests += 1
+        request = urllib.request.Request(
+            f"{self.url}/{method}", data=json.dumps({'args': args, 'kwargs': kwargs}).encode(),
+            headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            self.errors += 1
+            error = json.loads(e.read() or b'{}')
+            raise getattr(ccxt, error.get('error', ''), ccxt.ExchangeError)(error.get('message', str(e)))
+        except urllib.error.URLError as e:
+            self.errors += 1
+            raise ccxt.NetworkError(str(e))
+
+    def load_markets(self, reload: bool = False, params: Optional[Dict] = None) -> Dict:
+        if self.markets is None or reload:
+            self.set_markets(self._post('load_markets'))
+        return self.markets
+
+    def fetch_ticker(self, symbol, params=None):
+        return self._post('fetch_ticker', symbol)
+
+    def fetch_tickers(self, symbols=None, params=None):
+        return self._post('fetch_tickers', symbols)
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        return self._post('fetch_ohlcv', symbol, timeframe, since, limit)
+
+    def fetch_balance(self, params=None):
+        return self._post('fetch_balance')
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        return self._post('create_order', symbol, type, side, amount, price)
+
+    def cancel_order(self, id, symbol=None, params=None):
+        return self._post('cancel_order', id, symbol)
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        return self._post('fetch_open_orders', symbol, since, limit)
+
+    def fetch_closed_orders(self, symbol=None, since=None, limit=None, params=None):
+        return self._post('fetch_closed_orders', symbol, since, limit)
+
+
+class AsyncHttpFakeExchange(HttpFakeExchange):
+    """Asyncio client of a FakeExchangeServer, running requests on worker threads"""
+
+    async def _post_async(self, method: str, *args):
+        return await asyncio.to_thread(self._post, method, *args)
+
+    async def load_markets(self, reload=False, params=None):
+        if self.markets is None or reload:
+            self.set_markets(await self._post_async('load_markets'))
+        return self.markets
+
+    async def fetch_ticker(self, symbol, params=None):
+        return await self._post_async('fetch_ticker', symbol)
+
+    async def fetch_tickers(self, symbols=None, params=None):
+        return await self._post_async('fetch_tickers', symbols)
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        return await self._post_async('fetch_ohlcv', symbol, timeframe, since, limit)
+
+    async def fetch_balance(self, params=None):
+        return await self._post_async('fetch_balance')
+
+    async def create_order(self, symbol, type, side, amount, price=None, params=None):
+        return await self._post_async('create_order', symbol, type, side, amount, price)
+
+    async def cancel_order(self, id, symbol=None, params=None):
+        return await self._post_async('cancel_order', id, symbol)
+
+    async def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        return await self._post_async('fetch_open_orders', symbol, since, limit)
+
+    async def fetch_closed_orders(self, symbol=None, since=None, limit=None, params=None):
+        return await self._post_async('fetch_closed_orders', symbol, since, limit)
+
+    async def close(self) -> None:
+        pass
+
+
+def install(market: Optional[FakeMarket] = None, url: Optional[str] = None, **options) -> FakeMarket:
+    """
+    Make ccxt.coinex (sync and async) create fake exchange clients
+
+    Args:
+        market: Market shared by all in-process clients (a new synthetic one if None)
+        url: Use HTTP clients of the FakeExchangeServer at this URL instead
+        **options: latency, jitter, error_rate and rate_limit for in-process clients
+
+    Returns:
+        The market served to in-process clients
+    """
+    market = market or FakeMarket()
+    if url:
+        ccxt.coinex = lambda config=None: HttpFakeExchange(url, config)
+        ccxt.async_support.coinex = lambda config=None: AsyncHttpFakeExchange(url, config)
+    else:
+        ccxt.coinex = lambda config=None: FakeExchange(config, market, **options)
+        ccxt.async_support.coinex = lambda config=None: AsyncFakeExchange(config, market, **options)
+    return market
+
+
+def run_benchmark(pair_counts: List[int], url: Optional[str] = None, strategies_per_pair: int = 1,
+                  **options) -> List[Dict]:
+    """
+    Time full bot cycles against the fake exchange
+
+    Uses a throwaway database, candle store and market snapshot, and
+    disables the WebSocket stream. Each size is measured twice: a cold
+    cycle with an empty candle store and a warm cycle right after it.
+
+    Args:
+        pair_counts: Numbers of pairs to benchmark
+        url: Benchmark against a FakeExchangeServer at this URL instead of in-process
+        strategies_per_pair: Active strategies on each pair, cycling through the strategy types
+        **options: latency, jitter, error_rate and rate_limit for in-process clients
+
+    Returns:
+        One result dictionary per pair count
+    """
+    import tempfile
+    work_dir = tempfile.mkdtemp(prefix='fake_exchange_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(work_dir, 'benchmark.db')}"
+    os.environ['CANDLE_STORE_DIR'] = os.path.join(work_dir, 'candles')
+    os.environ['MARKETS_SNAPSHOT_PATH'] = os.path.join(work_dir, 'markets.json')
+    os.environ['COINEX_WS_URL'] = ''
+    os.environ.setdefault('COINEX_RATE_LIMIT', '1000')
+    os.environ.setdefault('COINEX_RATE_BURST', '1000')
+
+    market = install(FakeMarket(pairs=max(pair_counts)), url=url, **options)
+
+    from app import app, db
+    from models import BotSettings, Trade, TradingPair, TradingStrategy
+    from bot_engine import TradingBot
+    from scheduler import CandleCloseScheduler
+    from config_snapshot import bump_config_version
+
+    strategy_types = ['MA_CROSSOVER', 'RSI', 'MACD', 'BOLLINGER_BANDS']
+    results = []
+    for count in pair_counts:
+        with app.app_context():
+            for model in (Trade, TradingStrategy, TradingPair, BotSettings):
+                db.session.query(model).delete()
+            db.session.add(BotSettings(api_key='fake', api_secret='fake', is_active=True, max_daily_trades=1000))
+            for i, symbol in enumerate(market.symbols[:count]):
+                base, quote = symbol.split('/')
+                pair = TradingPair(symbol=symbol, base_currency=base, quote_currency=quote, is_active=True)
+                db.session.add(pair)
+                db.session.flush()
+                for j in range(strategies_per_pair):
+                    strategy_type = strategy_types[(i + j) % len(strategy_types)]
+                    db.session.add(TradingStrategy(name=f"{strategy_type} {symbol}", strategy_type=strategy_type,
+                                                   parameters={}, trading_pair_id=pair.id, is_active=True))
+            bump_config_version()
+            db.session.commit()
+
+        bot = TradingBot()
+        bot.initialize()
+        bot.loop = asyncio.new_event_loop()
+        timings = []
+        requests, errors = market.requests, market.errors
+        for _ in range(2):
+            # Every (symbol, timeframe) is due when first scheduled
+            bot.scheduler = CandleCloseScheduler()
+            start = time.perf_counter()
+            with app.app_context():
+                bot._process_strategies()
+            timings.append(time.perf_counter() - start)
+        if bot.async_api:
+            bot.loop.run_until_complete(bot.async_api.close())
+        bot.loop.close()
+        if bot.executor:
+            bot.executor.shutdown()
+
+        with app.app_context():
+            trades = db.session.query(Trade).count()
+        result = {'pairs': count, 'cold_seconds': timings[0], 'warm_seconds': timings[1], 'trades': trades,
+                  'requests': market.requests - requests, 'errors': market.errors - errors}
+        results.append(result)
+        print(f"{count:>6} pairs  cold {timings[0]:8.3f}s  warm {timings[1]:8.3f}s  trades {trades}"
+              f"  requests {result['requests']}  errors {result['errors']}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Offline fake CoinEx exchange')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name in ('serve', 'benchmark'):
+        sub = subparsers.add_parser(name)
+        sub.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request')
+        sub.add_argument('--jitter', type=float, default=0.0, help='Maximum random extra latency')
+        sub.add_argument('--error-rate', type=float, default=0.0, help='Fraction of failing requests')
+        sub.add_argument('--rate-limit', type=float, default=None, help='Requests per second allowed')
+        sub.add_argument('--recording', help='JSON candle recording to serve instead of synthetic data')
+    subparsers.choices['serve'].add_argument('--host', default='127.0.0.1')
+    subparsers.choices['serve'].add_argument('--port', type=int, default=8780)
+    subparsers.choices['serve'].add_argument('--pairs', type=int, default=100)
+    subparsers.choices['benchmark'].add_argument('--pairs', type=int, nargs='+', default=[10, 100, 1000])
+    subparsers.choices['benchmark'].add_argument('--url', help='Use a running fake exchange server')
+    subparsers.choices['benchmark'].add_argument('--strategies-per-pair', type=int, default=1)
+    args = parser.parse_args()
+
+    options = {'latency': args.latency, 'jitter': args.jitter, 'error_rate': args.error_rate,
+               'rate_limit': args.rate_limit}
+    if args.command == 'serve':
+        market = FakeMarket.from_recording(args.recording) if args.recording else FakeMarket(pairs=args.pairs)
+        server = FakeExchangeServer(args.host, args.port, market, **options)
+        print(f"Fake CoinEx exchange serving {len(market.symbols)} pairs on {server.url}")
+        server.serve_forever()
+    else:
+        if args.recording:
+            print("--recording is only supported by serve")
+        run_benchmark(args.pairs, url=args.url, strategies_per_pair=args.strategies_per_pair, **options)
@@ -1,6 +1,466 @@
+import threading
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Union
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from candles import Candles, as_candles
+
+# The *_array functions below accept either a 1-D series or a 2-D
+# (symbols x bars) matrix and always work along the last axis. Rows of a
+# matrix must be complete series of the same length without NaN gaps.
+
+
+def _as_array(data: Union[List[float], np.ndarray]) -> np.ndarray:
+    """Convert price data to a float64 NumPy array without copying when possible"""
+    return np.asarray(data, dtype=np.float64)
+
+
+def _rolling_sum(data: np.ndarray, period: int) -> np.ndarray:
+    """
+    Rolling window sum along the last axis using a cumulative sum
+
+    Args:
+        data: Input array
+        period: Window length
+
+    Returns:
+        Array with data.shape[-1] - period + 1 columns holding the sum of each full window
+    """
+    csum = np.cumsum(data, axis=-1, dtype=np.float64)
+    csum = np.concatenate((np.zeros(data.shape[:-1] + (1,)), csum), axis=-1)
+    return csum[..., period:] - csum[..., :-period]
+
+
+def _rolling_max(data: np.ndarray, period: int) -> np.ndarray:
+    """Maximum of each full window of length period along the last axis"""
+    return np.lib.stride_tricks.sliding_window_view(data, period, axis=-1).max(axis=-1)
+
+
+def _rolling_min(data: np.ndarray, period: int) -> np.ndarray:
+    """Minimum of each full window of length period along the last axis"""
+    return np.lib.stride_tricks.sliding_window_view(data, period, axis=-1).min(axis=-1)
+
+
+def _to_frame(data: np.ndarray) -> Union[pd.Series, pd.DataFrame]:
+    """Wrap a series or matrix so pandas works along the bars axis"""
+    return pd.Series(data) if data.ndim == 1 else pd.DataFrame(data.T)
+
+
+def _from_frame(frame: Union[pd.Series, pd.DataFrame]) -> np.ndarray:
+    """Convert the result of _to_frame back to the original orientation"""
+    values = frame.to_numpy(copy=True)
+    return values if values.ndim == 1 else values.T
+
+
+def _rolling_std(data: np.ndarray, period: int) -> np.ndarray:
+    """
+    Rolling population standard deviation (ddof=0, same as np.std)
+
+    Uses pandas' online rolling variance, which avoids the catastrophic
+    cancellation of a sum-of-squares formula. Windows where every price is
+    identical are forced to exactly zero, as np.std would return.
+    """
+    std = _from_frame(_to_frame(data).rolling(period).std(ddof=0))
+    if data.shape[-1] >= period:
+        flat = _rolling_max(data, period) == _rolling_min(data, period)
+        std[..., period - 1:][flat] = 0.0
+    return std
+
+
+def _recursive_smooth(data: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Apply y[t] = y[t-1] + alpha * (x[t] - y[t-1]) with y[0] = x[0] along the last axis
+
+    The recursion runs inside pandas' compiled ewm kernel instead of a
+    Python loop.
+    """
+    return _from_frame(_to_frame(data).ewm(alpha=alpha, adjust=False).mean())
+
+
+def moving_average_array(data: Union[List[float], np.ndarray], period: int = 20) -> np.ndarray:
+    """
+    Calculate Simple Moving Average (SMA) on a NumPy array
+
+    Args:
+        data: Array of price data (typically closing prices)
+        period: MA period
+
+    Returns:
+        Array of SMA values, NaN until the first full window
+    """
+    data = _as_array(data)
+    result = np.full(data.shape, np.nan)
+    if data.shape[-1] < period:
+        return result
+
+    if not np.isfinite(data).all():
+        # A cumulative sum would carry a NaN or infinity into every later window
+        windows = np.lib.stride_tricks.sliding_window_view(data, period, axis=-1)
+        result[..., period - 1:] = windows.sum(axis=-1) / period
+        return result
+
+    # Shift by a reference price so the cumulative sum stays small
+    reference = data[..., :1]
+    result[..., period - 1:] = _rolling_sum(data - reference, period) / period + reference
+    return result
+
+
+def exponential_moving_average_array(data: Union[List[float], np.ndarray], period: int = 20) -> np.ndarray:
+    """
+    Calculate Exponential Moving Average (EMA) on a NumPy array
+
+    Args:
+        data: Array of price data (typically closing prices)
+        period: EMA period
+
+    Returns:
+        Array of EMA values seeded with the SMA of the first period values,
+        NaN from the first NaN price on
+    """
+    data = _as_array(data)
+    result = np.full(data.shape, np.nan)
+    if data.shape[-1] < period:
+        return result
+
+    series = data[..., period - 1:].copy()
+    series[..., 0] = data[..., :period].mean(axis=-1)
+    smoothed = _recursive_smooth(series, 2 / (period + 1))
+    # pandas carries the average over missing prices; the recursion does not
+    smoothed[np.logical_or.accumulate(np.isnan(series), axis=-1)] = np.nan
+    result[..., period - 1:] = smoothed
+    return result
+
+
+def relative_strength_index_array(data: Union[List[float], np.ndarray], period: int = 14) -> np.ndarray:
+    """
+    Calculate Relative Strength Index (RSI) on a NumPy array
+
+    Args:
+        data: Array of price data (typically closing prices)
+        period: RSI period
+
+    Returns:
+        Array of RSI values aligned exactly like relative_strength_index
+    """
+    data = _as_array(data)
+    result = np.full(data.shape, np.nan)
+    n = data.shape[-1]
+    if n < period + 1:
+        return result
+
+    changes = np.diff(data, axis=-1)
+    # A missing change counts as no change
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes < 0, -changes, 0.0)
+
+    # Wilder smoothing seeded with the simple average of the first period changes
+    gain_series = gains[..., period - 1:].copy()
+    loss_series = losses[..., period - 1:].copy()
+    gain_series[..., 0] = gains[..., :period].mean(axis=-1)
+    loss_series[..., 0] = losses[..., :period].mean(axis=-1)
+    avg_gain = _recursive_smooth(gain_series, 1 / period)[..., 1:]
+    avg_loss = _recursive_smooth(loss_series, 1 / period)[..., 1:]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    rsi[avg_loss == 0] = 100.0
+
+    # RSI for change i lands on index i; the last bar stays NaN
+    result[..., period:n - 1] = rsi
+    return result
+
+
+def macd_array(data: Union[List[float], np.ndarray], fast_period: int = 12, slow_period: int = 26,
+               signal_period: int = 9) -> Dict[str, np.ndarray]:
+    """
+    Calculate Moving Average Convergence Divergence (MACD) on a NumPy array
+
+    Args:
+        data: Array of price data (typically closing prices)
+        fast_period: Fast EMA period
+        slow_period: Slow EMA period
+        signal_period: MACD signal line period
+
+    Returns:
+        Dictionary with MACD, MACD Signal, and MACD Histogram arrays
+    """
+    data = _as_array(data)
+    if data.shape[-1] < slow_period + signal_period:
+        return {
+            "macd": np.full(data.shape, np.nan),
+            "signal": np.full(data.shape, np.nan),
+            "histogram": np.full(data.shape, np.nan)
+        }
+
+    macd_line = exponential_moving_average_array(data, fast_period) - exponential_moving_average_array(data, slow_period)
+
+    # Signal line is an EMA over the valid MACD values, placed one bar later
+    start = max(fast_period, slow_period) - 1
+    valid_signal = exponential_moving_average_array(macd_line[..., start:], signal_period)
+    signal_line = np.full(data.shape, np.nan)
+    signal_line[..., start + 1:] = valid_signal[..., :-1]
+    signal_line[np.isnan(macd_line)] = np.nan
+
+    return {
+        "macd": macd_line,
+        "signal": signal_line,
+        "histogram": macd_line - signal_line
+    }
+
+
+def bollinger_bands_array(data: Union[List[float], np.ndarray], period: int = 20,
+                          std_dev: float = 2.0) -> Dict[str, np.ndarray]:
+    """
+    Calculate Bollinger Bands on a NumPy array
+
+    Args:
+        data: Array of price data (typically closing prices)
+        period: Bollinger Bands period
+        std_dev: Standard deviation multiplier
+
+    Returns:
+        Dictionary with upper, middle, and lower band arrays
+    """
+    data = _as_array(data)
+    if data.shape[-1] < period:
+        return {
+            "upper": np.full(data.shape, np.nan),
+            "middle": np.full(data.shape, np.nan),
+            "lower": np.full(data.shape, np.nan)
+        }
+
+    middle_band = moving_average_array(data, period)
+    std = _rolling_std(data, period)
+
+    return {
+        "upper": middle_band + std_dev * std,
+        "middle": middle_band,
+        "lower": middle_band - std_dev * std
+    }
+
+
+def stochastic_oscillator_array(high_data: Union[List[float], np.ndarray],
+                                low_data: Union[List[float], np.ndarray],
+                                close_data: Union[List[float], np.ndarray],
+                                k_period: int = 14, d_period: int = 3) -> Dict[str, np.ndarray]:
+    """
+    Calculate Stochastic Oscillator on NumPy arrays
+
+    Args:
+        high_data: Array of high prices
+        low_data: Array of low prices
+        close_data: Array of closing prices
+        k_period: %K period
+        d_period: %D period
+
+    Returns:
+        Dictionary with %K and %D arrays
+    """
+    high_data = _as_array(high_data)
+    low_data = _as_array(low_data)
+    close_data = _as_array(close_data)
+    if close_data.shape[-1] < k_period + d_period - 1:
+        return {
+            "k": np.full(close_data.shape, np.nan),
+            "d": np.full(close_data.shape, np.nan)
+        }
+
+    highest_high = _rolling_max(high_data, k_period)
+    lowest_low = _rolling_min(low_data, k_period)
+    price_range = highest_high - lowest_low
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = 100 * (close_data[..., k_period - 1:] - lowest_low) / price_range
+    k[price_range == 0] = 50.0  # Middle value if range is zero
+
+    k_values = np.full(close_data.shape, np.nan)
+    k_values[..., k_period - 1:] = k
+    d_values = np.full(close_data.shape, np.nan)
+    d_values[..., k_period - 1:] = moving_average_array(k, d_period)
+
+    return {
+        "k": k_values,
+        "d": d_values
+    }
+
+
+
+def _seeded_smooth_sweep(data: np.ndarray, seeds: np.ndarray, starts: np.ndarray,
+                         alphas: np.ndarray) -> np.ndarray:
+    """
+    Run one smoothing recursion per parameter over a shared series
+
+    Row i is NaN before starts[i], equals seeds[i, starts[i]] at starts[i] and
+    then follows y[t] = y[t-1] + alphas[i] * (data[t] - y[t-1]). All rows
+    advance together, so the loop runs once over the bars rather than once
+    per parameter.
+    """
+    result = np.full((len(starts), len(data)), np.nan)
+    current = np.full(len(starts), np.nan)
+    for t in range(len(data)):
+        current = np.where(starts == t, seeds[:, t], current + alphas * (data[t] - current))
+        result[:, t] = current
+    return result
+
+
+def moving_average_sweep(data: Union[List[float], np.ndarray], periods: Iterable[int]) -> np.ndarray:
+    """
+    Calculate SMA for many periods from one cumulative sum
+
+    Args:
+        data: Array of price data (typically closing prices)
+        periods: MA periods
+
+    Returns:
+        (len(periods) x bars) array, row i holding the SMA for periods[i]
+    """
+    data = _as_array(data)
+    periods = np.asarray(list(periods), dtype=np.int64)
+    if not np.isfinite(data).all():
+        # A cumulative sum would carry a NaN or infinity into every later window
+        return np.array([moving_average_array(data, period) for period in periods]).reshape(len(periods), len(data))
+    reference = data[0] if len(data) else 0.0
+    csum = np.concatenate(([0.0], np.cumsum(data - reference)))
+
+    ends = np.arange(1, len(data) + 1)
+    starts = ends[np.newaxis, :] - periods[:, np.newaxis]
+    with np.errstate(invalid='ignore'):
+        result = (csum[ends] - csum[np.maximum(starts, 0)]) / periods[:, np.newaxis] + reference
+    result[starts < 0] = np.nan
+    return result
+
+
+def exponential_moving_average_sweep(data: Union[List[float], np.ndarray], periods: Iterable[int]) -> np.ndarray:
+    """
+    Calculate EMA for many periods in one pass over the bars
+
+    Args:
+        data: Array of price data (typically closing prices)
+        periods: EMA periods
+
+    Returns:
+        (len(periods) x bars) array, row i holding the EMA for periods[i]
+    """
+    data = _as_array(data)
+    periods = np.asarray(list(periods), dtype=np.int64)
+    seeds = moving_average_sweep(data, periods)
+    return _seeded_smooth_sweep(data, seeds, periods - 1, 2 / (periods + 1))
+
+
+def relative_strength_index_sweep(data: Union[List[float], np.ndarray], periods: Iterable[int]) -> np.ndarray:
+    """
+    Calculate RSI for many periods from one set of price changes
+
+    Args:
+        data: Array of price data (typically closing prices)
+        periods: RSI periods
+
+    Returns:
+        (len(periods) x bars) array aligned like relative_strength_index
+    """
+    data = _as_array(data)
+    periods = np.asarray(list(periods), dtype=np.int64)
+    result = np.full((len(periods), len(data)), np.nan)
+    if len(data) < 2:
+        return result
+
+    changes = np.diff(data)
+    # A missing change counts as no change
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes < 0, -changes, 0.0)
+    avg_gain = _seeded_smooth_sweep(gains, moving_average_sweep(gains, periods), periods - 1, 1 / periods)
+    avg_loss = _seeded_smooth_sweep(losses, moving_average_sweep(losses, periods), periods - 1, 1 / periods)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    rsi[avg_loss == 0] = 100.0
+
+    # The seed average itself is never reported and the last bar stays NaN
+    rsi[np.arange(len(changes))[np.newaxis, :] < periods[:, np.newaxis]] = np.nan
+    result[:, :-1] = rsi
+    return result
+
+
+def macd_sweep(data: Union[List[float], np.ndarray],
+               settings: Iterable[Tuple[int, int, int]]) -> Dict[str, np.ndarray]:
+    """
+    Calculate MACD for many (fast, slow, signal) settings
+
+    Every distinct EMA period is computed once and shared by all settings
+    that use it; signal lines are smoothed together for settings with the
+    same warm-up and signal period.
+
+    Args:
+        data: Array of price data (typically closing prices)
+        settings: (fast_period, slow_period, signal_period) tuples
+
+    Returns:
+        Dictionary with MACD, signal and histogram arrays of shape
+        (len(settings) x bars)
+    """
+    data = _as_array(data)
+    settings = [tuple(setting) for setting in settings]
+    n = len(data)
+
+    ema_periods = sorted({period for fast, slow, _ in settings for period in (fast, slow)})
+    ema_rows = dict(zip(ema_periods, exponential_moving_average_sweep(data, ema_periods)))
+
+    macd_line = np.full((len(settings), n), np.nan)
+    signal_line = np.full((len(settings), n), np.nan)
+    groups = {}
+    for row, (fast, slow, signal) in enumerate(settings):
+        if n < slow + signal:
+            continue
+        macd_line[row] = ema_rows[fast] - ema_rows[slow]
+        groups.setdefault((max(fast, slow) - 1, signal), []).append(row)
+
+    # Signal line is an EMA over the valid MACD values, placed one bar later
+    for (start, signal), rows in groups.items():
+        valid_signal = exponential_moving_average_array(macd_line[rows, start:], signal)
+        signal_line[rows, start + 1:] = valid_signal[:, :-1]
+    signal_line[np.isnan(macd_line)] = np.nan
+
+    return {
+        "macd": macd_line,
+        "signal": signal_line,
+        "histogram": macd_line - signal_line
+    }
+
+
+def bollinger_bands_sweep(data: Union[List[float], np.ndarray], periods: Iterable[int],
+                          std_devs: Iterable[float]) -> Dict[str, np.ndarray]:
+    """
+    Calculate Bollinger Bands for every combination of period and multiplier
+
+    The rolling standard deviation is computed once per period and reused
+    for every multiplier.
+
+    Args:
+        data: Array of price data (typically closing prices)
+        periods: Bollinger Bands periods
+        std_devs: Standard deviation multipliers
+
+    Returns:
+        Dictionary with 'middle' of shape (len(periods) x bars) and 'upper'
+        and 'lower' of shape (len(periods) x len(std_devs) x bars)
+    """
+    data = _as_array(data)
+    periods = list(periods)
+    multipliers = np.asarray(list(std_devs), dtype=np.float64)[np.newaxis, :, np.newaxis]
+
+    middle = moving_average_sweep(data, periods)
+    std = np.stack([
+        _rolling_std(data, period) if len(data) >= period else np.full(len(data), np.nan)
+        for period in periods
+    ])[:, np.newaxis, :]
+
+    return {
+        "upper": middle[:, np.newaxis, :] + multipliers * std,
+        "middle": middle,
+        "lower": middle[:, np.newaxis, :] - multipliers * std
+    }
 
 
 def moving_average(data: List[float], period: int = 20) -> List[float]:
@@ -14,18 +474,7 @@ def moving_average(data: List[float], period: int = 20) -> List[float]:
     Returns:
         List of SMA values
     """
-    if len(data) < period:
-        # Return list of NaNs of the same length as data
-        return [np.nan] * len(data)
-    
-    ma_values = []
-    for i in range(len(data)):
-        if i < period - 1:
-            ma_values.append(np.nan)
-        else:
-            ma_values.append(sum(data[i-(period-1):i+1]) / period)
-    
-    return ma_values
+    return moving_average_array(data, period).tolist()
 
 
 def exponential_moving_average(data: List[float], period: int = 20) -> List[float]:
@@ -39,27 +488,7 @@ def exponential_moving_average(data: List[float], period: int = 20) -> List[floa
     Returns:
         List of EMA values
     """
-    if len(data) < period:
-        return [np.nan] * len(data)
-    
-    # Calculate multiplier
-    multiplier = 2 / (period + 1)
-    
-    # Calculate initial SMA
-    sma = sum(data[:period]) / period
-    
-    # Initialize EMA values with NaNs
-    ema_values = [np.nan] * (period - 1)
-    
-    # Add initial SMA value
-    ema_values.append(sma)
-    
-    # Calculate EMA for remaining data points
-    for i in range(period, len(data)):
-        ema = (data[i] - ema_values[-1]) * multiplier + ema_values[-1]
-        ema_values.append(ema)
-    
-    return ema_values
+    return exponential_moving_average_array(data, period).tolist()
 
 
 def relative_strength_index(data: List[float], period: int = 14) -> List[float]:
@@ -73,45 +502,7 @@ def relative_strength_index(data: List[float], period: int = 14) -> List[float]:
     Returns:
         List of RSI values
     """
-    if len(data) < period + 1:
-        return [np.nan] * len(data)
-    
-    # Calculate price changes
-    changes = [data[i] - data[i-1] for i in range(1, len(data))]
-    
-    # Initialize RSI values with NaNs
-    rsi_values = [np.nan] * period
-    
-    # Calculate initial average gains and losses
-    gains = [max(0, change) for change in changes[:period]]
-    losses = [max(0, -change) for change in changes[:period]]
-    
-    avg_gain = sum(gains) / period
-    avg_loss = sum(losses) / period
-    
-    # Calculate RSI for remaining data points
-    for i in range(period, len(data) - 1):
-        change = changes[i]
-        gain = max(0, change)
-        loss = max(0, -change)
-        
-        # Use smoothed averages (Wilder's method)
-        avg_gain = (avg_gain * (period - 1) + gain) / period
-        avg_loss = (avg_loss * (period - 1) + loss) / period
-        
-        if avg_loss == 0:
-            rsi = 100
-        else:
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
-        
-        rsi_values.append(rsi)
-    
-    # Add extra NaN to match the length of input data
-    if len(rsi_values) < len(data):
-        rsi_values.append(np.nan)
-    
-    return rsi_values
+    return relative_strength_index_array(data, period).tolist()
 
 
 def macd(data: List[float], fast_period: int = 12, slow_period: int = 26, 
@@ -128,72 +519,8 @@ def macd(data: List[float], fast_period: int = 12, slow_period: int = 26,
     Returns:
         Dictionary with MACD, MACD Signal, and MACD Histogram values
     """
-    if len(data) < slow_period + signal_period:
-        return {
-            "macd": [np.nan] * len(data),
-            "signal": [np.nan] * len(data),
-            "histogram": [np.nan] * len(data)
-        }
-    
-    # Calculate fast and slow EMAs
-    fast_ema = exponential_moving_average(data, fast_period)
-    slow_ema = exponential_moving_average(data, slow_period)
-    
-    # Calculate MACD line
-    macd_line = [np.nan] * len(data)
-    for i in range(len(data)):
-        if np.isnan(fast_ema[i]) or np.isnan(slow_ema[i]):
-            continue
-        macd_line[i] = fast_ema[i] - slow_ema[i]
-    
-    # Calculate signal line (EMA of MACD line)
-    # Remove NaN values for calculation
-    valid_macd = []
-    for val in macd_line:
-        if not np.isnan(val):
-            valid_macd.append(val)
-    
-    # Ensure we have enough data for the signal line EMA
-    if len(valid_macd) < signal_period:
-        return {
-            "macd": macd_line,
-            "signal": [np.nan] * len(data),
-            "histogram": [np.nan] * len(data)
-        }
-    
-    # Calculate EMA of valid MACD values
-    valid_signal = []
-    
-    # Initialize with SMA
-    valid_signal.append(sum(valid_macd[:signal_period]) / signal_period)
-    
-    # Calculate EMA for remaining points
-    multiplier = 2 / (signal_period + 1)
-    for i in range(signal_period, len(valid_macd)):
-        signal_val = (valid_macd[i] - valid_signal[-1]) * multiplier + valid_signal[-1]
-        valid_signal.append(signal_val)
-    
-    # Map signal line back to original data length
-    signal_line = [np.nan] * len(data)
-    valid_idx = 0
-    
-    for i in range(len(data)):
-        if not np.isnan(macd_line[i]):
-            valid_idx += 1
-            if valid_idx > signal_period:
-                signal_line[i] = valid_signal[valid_idx - signal_period - 1]
-    
-    # Calculate histogram
-    histogram = [np.nan] * len(data)
-    for i in range(len(data)):
-        if not np.isnan(macd_line[i]) and not np.isnan(signal_line[i]):
-            histogram[i] = macd_line[i] - signal_line[i]
-    
-    return {
-        "macd": macd_line,
-        "signal": signal_line,
-        "histogram": histogram
-    }
+    result = macd_array(data, fast_period, slow_period, signal_period)
+    return {key: values.tolist() for key, values in result.items()}
 
 
 def bollinger_bands(data: List[float], period: int = 20, 
@@ -209,31 +536,8 @@ def bollinger_bands(data: List[float], period: int = 20,
     Returns:
         Dictionary with upper, middle, and lower band values
     """
-    if len(data) < period:
-        return {
-            "upper": [np.nan] * len(data),
-            "middle": [np.nan] * len(data),
-            "lower": [np.nan] * len(data)
-        }
-    
-    # Calculate SMA (middle band)
-    middle_band = moving_average(data, period)
-    
-    # Calculate standard deviation
-    upper_band = [np.nan] * len(data)
-    lower_band = [np.nan] * len(data)
-    
-    for i in range(period - 1, len(data)):
-        window = data[i-(period-1):i+1]
-        std = np.std(window)
-        upper_band[i] = middle_band[i] + (std_dev * std)
-        lower_band[i] = middle_band[i] - (std_dev * std)
-    
-    return {
-        "upper": upper_band,
-        "middle": middle_band,
-        "lower": lower_band
-    }
+    result = bollinger_bands_array(data, period, std_dev)
+    return {key: values.tolist() for key, values in result.items()}
 
 
 def stochastic_oscillator(high_data: List[float], low_data: List[float], 
@@ -252,71 +556,321 @@ def stochastic_oscillator(high_data: List[float], low_data: List[float],
     Returns:
         Dictionary with %K and %D values
     """
-    if len(close_data) < k_period + d_period - 1:
-        return {
-            "k": [np.nan] * len(close_data),
-            "d": [np.nan] * len(close_data)
-        }
-    
-    # Calculate %K
-    k_values = [np.nan] * len(close_data)
-    
-    for i in range(k_period - 1, len(close_data)):
-        # Get highest high and lowest low in the period
-        highest_high = max(high_data[i-(k_period-1):i+1])
-        lowest_low = min(low_data[i-(k_period-1):i+1])
-        
-        # Calculate %K
-        if highest_high == lowest_low:
-            k = 50  # Middle value if range is zero
-        else:
-            k = 100 * ((close_data[i] - lowest_low) / (highest_high - lowest_low))
-        
-        k_values[i] = k
-    
-    # Calculate %D (SMA of %K)
-    d_values = [np.nan] * len(close_data)
-    
-    for i in range(k_period + d_period - 2, len(close_data)):
-        # Calculate SMA of the last d_period %K values
-        d = sum(k_values[i-(d_period-1):i+1]) / d_period
-        d_values[i] = d
-    
-    return {
-        "k": k_values,
-        "d": d_values
-    }
+    result = stochastic_oscillator_array(high_data, low_data, close_data, k_period, d_period)
+    return {key: values.tolist() for key, values in result.items()}
+
+
+# Indicator name -> (array function, OHLCV columns it reads, default parameters)
+INDICATORS = {
+    "sma": (moving_average_array, ("close",), {"period": 20}),
+    "ema": (exponential_moving_average_array, ("close",), {"period": 20}),
+    "rsi": (relative_strength_index_array, ("close",), {"period": 14}),
+    "macd": (macd_array, ("close",), {"fast_period": 12, "slow_period": 26, "signal_period": 9}),
+    "bollinger": (bollinger_bands_array, ("close",), {"period": 20, "std_dev": 2.0}),
+    "stochastic": (stochastic_oscillator_array, ("high", "low", "close"), {"k_period": 14, "d_period": 3}),
+}
+
+# Keys produced by the original eager calculate_indicators
+DEFAULT_INDICATOR_KEYS = (
+    "sma_20", "sma_50", "sma_200", "ema_12", "ema_26", "rsi_14", "macd", "bollinger", "stochastic"
+)
+
+
+def _parse_indicator_key(key: str) -> Tuple[str, Dict]:
+    """
+    Translate a legacy key such as 'sma_20' into an indicator name and parameters
+
+    Args:
+        key: Indicator key ('sma_<period>', 'ema_<period>', 'rsi_<period>',
+            'macd', 'bollinger' or 'stochastic')
+
+    Returns:
+        Tuple of (indicator name, parameters)
+    """
+    if key in INDICATORS:
+        return key, {}
+    name, _, period = key.rpartition("_")
+    if name in ("sma", "ema", "rsi") and period.isdigit():
+        return name, {"period": int(period)}
+    raise KeyError(key)
+
 
+class IndicatorCache:
+    """
+    Process-wide LRU cache of computed indicators
+
+    Entries are keyed by the candle series they were computed from
+    (symbol, timeframe, series length and the last candle's timestamp and
+    prices) plus the indicator name and parameters. The last candle's
+    prices are part of the key because the still-forming candle keeps its
+    timestamp while its prices move. Cached arrays are read-only since
+    they are shared between the bot thread and web requests.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        """
+        Initialize the cache
+
+        Args:
+            max_size: Maximum number of indicator results to keep
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple):
+        """
+        Look up a cached indicator result
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached result or None if not present
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: Tuple, result: Union[np.ndarray, Dict[str, np.ndarray]]) -> None:
+        """
+        Store an indicator result, evicting the least recently used entries
+
+        Args:
+            key: Cache key
+            result: Indicator array or dictionary of arrays
+        """
+        for values in (result.values() if isinstance(result, dict) else (result,)):
+            values.flags.writeable = False
 
-def calculate_indicators(ohlcv_data: List[Dict]) -> Dict:
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with size, max_size, hits, misses, evictions and hit_rate
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / requests if requests else 0.0
+            }
+
+
+# Shared by the bot engine and the web routes
+indicator_cache = IndicatorCache()
+
+
+class IndicatorSet(Mapping):
+    """
+    Lazily computed indicators for one OHLCV series
+
+    Indicators are requested by name and parameters with compute() and are
+    only calculated on first use; repeated requests reuse the result. The
+    set also behaves as a read-only mapping over the legacy keys returned
+    by the original calculate_indicators ('sma_20', 'macd', ...), and any
+    'sma_<n>', 'ema_<n>' or 'rsi_<n>' key can be looked up on demand.
+    """
+
+    def __init__(self, ohlcv_data: Union[Candles, List[Dict]], symbol: Optional[str] = None,
+                 timeframe: Optional[str] = None, cache: Optional[IndicatorCache] = None):
+        """
+        Initialize the indicator set
+
+        Args:
+            ohlcv_data: OHLCV candles (Candles or a list of OHLCV dictionaries)
+            symbol: Trading pair symbol the candles belong to
+            timeframe: Candle timeframe
+            cache: Indicator cache to share results through; defaults to the
+                process-wide indicator_cache when symbol and timeframe are given
+        """
+        self.candles = as_candles(ohlcv_data)
+        self._results = {}
+        self._cache = None
+        self._series_key = None
+
+        if symbol and timeframe and self.candles:
+            candles = self.candles
+            self._cache = cache or indicator_cache
+            self._series_key = (symbol, timeframe, len(candles), int(candles.timestamp[-1]),
+                                float(candles.close[-1]), float(candles.high[-1]), float(candles.low[-1]))
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get an OHLCV column as a NumPy array
+
+        Args:
+            name: Column name ('open', 'high', 'low', 'close' or 'volume')
+
+        Returns:
+            Array of column values
+        """
+        return self.candles.column(name)
+
+    def compute(self, name: str, **params) -> Union[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Get an indicator, computing it on first request
+
+        Args:
+            name: Indicator name (see INDICATORS)
+            **params: Indicator parameters; missing ones use the defaults
+
+        Returns:
+            Indicator array, or dictionary of arrays for multi-line indicators
+        """
+        function, columns, defaults = INDICATORS[name]
+        params = {**defaults, **params}
+        key = (name, tuple(sorted(params.items())))
+        result = self._lookup(key)
+        if result is None:
+            result = function(*(self.column(column) for column in columns), **params)
+            self._store(key, result)
+        return result
+
+    def _lookup(self, key: Tuple):
+        """Find a result computed by this set or, failing that, in the shared cache"""
+        result = self._results.get(key)
+        if result is None and self._cache is not None:
+            result = self._cache.get(self._series_key + key)
+            if result is not None:
+                self._results[key] = result
+        return result
+
+    def _store(self, key: Tuple, result: Union[np.ndarray, Dict[str, np.ndarray]]) -> None:
+        """Keep a computed result and share it through the cache"""
+        self._results[key] = result
+        if self._cache is not None:
+            self._cache.put(self._series_key + key, result)
+
+    def __getitem__(self, key: str) -> Union[List[float], Dict[str, List[float]]]:
+        if not self.candles:
+            raise KeyError(key)
+        name, params = _parse_indicator_key(key)
+        result = self.compute(name, **params)
+        if isinstance(result, dict):
+            return {line: values.tolist() for line, values in result.items()}
+        return result.tolist()
+
+    def __contains__(self, key) -> bool:
+        if not self.candles:
+            return False
+        try:
+            _parse_indicator_key(key)
+        except (KeyError, AttributeError):
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(DEFAULT_INDICATOR_KEYS if self.candles else ())
+
+    def __len__(self) -> int:
+        return len(DEFAULT_INDICATOR_KEYS) if self.candles else 0
+
+
+def calculate_indicators(ohlcv_data: Union[Candles, List[Dict]], symbol: Optional[str] = None,
+                         timeframe: Optional[str] = None) -> IndicatorSet:
     """
     Calculate multiple indicators based on OHLCV data
     
+    Indicators are computed on demand, so only the ones that are actually
+    read cost any CPU time. When symbol and timeframe are given, results
+    are shared through the process-wide indicator_cache.
+    
     Args:
-        ohlcv_data: List of OHLCV dictionaries from the exchange
+        ohlcv_data: OHLCV candles (Candles or a list of OHLCV dictionaries)
+        symbol: Trading pair symbol the candles belong to
+        timeframe: Candle timeframe
         
     Returns:
-        Dictionary of calculated indicators
+        Lazy IndicatorSet of calculated indicators
     """
-    if not ohlcv_data:
-        return {}
-    
-    # Extract individual data series
-    close_prices = [candle['close'] for candle in ohlcv_data]
-    high_prices = [candle['high'] for candle in ohlcv_data]
-    low_prices = [candle['low'] for candle in ohlcv_data]
-    
-    # Calculate indicators
-    results = {
-        "sma_20": moving_average(close_prices, 20),
-        "sma_50": moving_average(close_prices, 50),
-        "sma_200": moving_average(close_prices, 200),
-        "ema_12": exponential_moving_average(close_prices, 12),
-        "ema_26": exponential_moving_average(close_prices, 26),
-        "rsi_14": relative_strength_index(close_prices, 14),
-        "macd": macd(close_prices),
-        "bollinger": bollinger_bands(close_prices),
-        "stochastic": stochastic_oscillator(high_prices, low_prices, close_prices)
+    return IndicatorSet(ohlcv_data, symbol=symbol, timeframe=timeframe)
+
+
+def calculate_indicators_batch(close_matrix: np.ndarray, high_matrix: np.ndarray, low_matrix: np.ndarray,
+                               keys: Optional[Iterable[str]] = None) -> Dict:
+    """
+    Calculate indicators for many symbols in one vectorized pass
+
+    Args:
+        close_matrix: (symbols x bars) matrix of closing prices
+        high_matrix: (symbols x bars) matrix of high prices
+        low_matrix: (symbols x bars) matrix of low prices
+        keys: Indicator keys to calculate (defaults to DEFAULT_INDICATOR_KEYS)
+
+    Returns:
+        Dictionary of indicator matrices (or dictionaries of matrices for
+        multi-line indicators), one row per symbol
+    """
+    columns = {
+        "close": _as_array(close_matrix),
+        "high": _as_array(high_matrix),
+        "low": _as_array(low_matrix)
     }
-    
+
+    results = {}
+    for key in keys or DEFAULT_INDICATOR_KEYS:
+        name, params = _parse_indicator_key(key)
+        function, inputs, defaults = INDICATORS[name]
+        results[key] = function(*(columns[column] for column in inputs), **{**defaults, **params})
     return results
+
+
+def compute_batch(indicator_sets: List[IndicatorSet], name: str, **params) -> None:
+    """
+    Compute one indicator for many indicator sets at once
+
+    Sets are grouped by series length and each group is stacked into a
+    (symbols x bars) matrix, so the indicator is computed with one array
+    pass per group. Each set then finds its row through compute().
+
+    Args:
+        indicator_sets: Indicator sets to fill, typically one per trading pair
+        name: Indicator name (see INDICATORS)
+        **params: Indicator parameters; missing ones use the defaults
+    """
+    function, columns, defaults = INDICATORS[name]
+    params = {**defaults, **params}
+    key = (name, tuple(sorted(params.items())))
+
+    groups = {}
+    for indicator_set in indicator_sets:
+        if indicator_set.candles and indicator_set._lookup(key) is None:
+            groups.setdefault(len(indicator_set.candles), []).append(indicator_set)
+
+    for group in groups.values():
+        matrices = [np.stack([indicator_set.column(column) for indicator_set in group]) for column in columns]
+        result = function(*matrices, **params)
+        for row, indicator_set in enumerate(group):
+            if isinstance(result, dict):
+                indicator_set._store(key, {line: values[row] for line, values in result.items()})
+            else:
+                indicator_set._store(key, result[row])
@@ -0,0 +1,157 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import random
+import logging
+import datetime
+import threading
+import logging.handlers
+from typing import Dict, Optional, Tuple
+
+# Levels applied to noisy third-party loggers unless overridden by LOG_LEVELS
+DEFAULT_MODULE_LEVELS = {
+    'ccxt': 'WARNING',
+    'urllib3': 'WARNING',
+    'aiohttp': 'WARNING',
+    'werkzeug': 'INFO',
+}
+
+# Attributes of a bare LogRecord; anything else was passed via extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including extra= fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key not in ('every', 'sample'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Throttle per-call log messages
+
+    A record logged with extra={'every': seconds} is passed at most once per
+    interval per call site; the next one that passes carries the number of
+    messages dropped in between as 'suppressed'. A record logged with
+    extra={'sample': fraction} is passed with that probability. Records
+    without either key are always passed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # Per call site: (time of the last passed record, records dropped since)
+        self._sites: Dict[Tuple[str, int], Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sample = getattr(record, 'sample', None)
+        if sample is not None and random.random() >= sample:
+            return False
+
+        every = getattr(record, 'every', None)
+        if every is None:
+            return True
+
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed = self._sites.get(site, (None, 0))
+            if last is not None and now - last < every:
+                self._sites[site] = (last, suppressed + 1)
+                return False
+            self._sites[site] = (now, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that keeps exception text separate from the message"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only the cheap parts run on the calling thread; formatting happens on the listener
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    """Parse 'module=LEVEL,other=LEVEL' into a dictionary"""
+    levels = {}
+    for item in spec.split(','):
+        name, _, level = item.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level: Optional[str] = None, module_levels: Optional[Dict[str, str]] = None,
+                      json_format: Optional[bool] = None) -> None:
+    """
+    Send all logging through a background queue listener
+
+    Records are filtered and queued on the calling thread and formatted and
+    written to stderr by a single listener thread, so logging never blocks
+    request or bot paths on I/O. Only the first call has an effect.
+
+    Args:
+        level: Root level (defaults to LOG_LEVEL or INFO)
+        module_levels: Levels per logger name, on top of DEFAULT_MODULE_LEVELS
+            and LOG_LEVELS ('coinex_api=DEBUG,bot_engine=WARNING')
+        json_format: Write JSON lines instead of text (defaults to LOG_FORMAT != 'text')
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        level = level or os.environ.get('LOG_LEVEL', 'INFO')
+        levels = dict(DEFAULT_MODULE_LEVELS)
+        levels.update(_parse_levels(os.environ.get('LOG_LEVELS', '')))
+        levels.update(module_levels or {})
+        if json_format is None:
+            json_format = os.environ.get('LOG_FORMAT', 'json').lower() != 'text'
+
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(JsonFormatter() if json_format else
+                                    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = _QueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter())
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(queue_handler)
+        root.setLevel(level.upper())
+        for name, module_level in levels.items():
+            logging.getLogger(name).setLevel(module_level)
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
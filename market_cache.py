@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import logging
+import threading
+import weakref
+from typing import Dict, Optional
+
+import ccxt
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'markets.json')
+
+
+class MarketCache:
+    """
+    Market metadata shared by all exchange clients
+
+    Markets are loaded once, saved to a snapshot file so restarts can start
+    from it without waiting for the exchange, and refreshed in the
+    background on a schedule. Downloads go through the shared rate_limiter
+    at background priority, behind every other request. Attached CCXT
+    exchanges receive the metadata via set_markets(), so they never
+    download it themselves.
+    """
+
+    def __init__(self, snapshot_path: str = DEFAULT_SNAPSHOT_PATH, refresh_interval: float = 3600.0):
+        """
+        Initialize the market cache
+
+        Args:
+            snapshot_path: JSON file the markets are persisted to
+            refresh_interval: Seconds between background refreshes
+        """
+        self.snapshot_path = snapshot_path
+        self.refresh_interval = refresh_interval
+        self.markets: Optional[Dict] = None
+        self.currencies: Optional[Dict] = None
+        self.loaded_at = 0.0
+
+        self._exchanges = weakref.WeakSet()
+        self._lock = threading.RLock()
+        # Held while downloading, so concurrent cold starts and the refresher share one download
+        self._refresh_lock = threading.Lock()
+        self._snapshot_checked = False
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def attach(self, exchange: ccxt.Exchange) -> None:
+        """
+        Share the cached markets with an exchange instance and keep it updated
+
+        Args:
+            exchange: CCXT exchange (sync or async) to receive the markets
+        """
+        with self._lock:
+            self._load_snapshot()
+            self._exchanges.add(exchange)
+            if self.markets is not None:
+                exchange.set_markets(self.markets, self.currencies)
+        self.start()
+
+    def get_markets(self) -> Dict:
+        """
+        Get the cached markets, loading them from the exchange only on a cold start
+
+        Returns:
+            Markets keyed by symbol
+        """
+        with self._lock:
+            self._load_snapshot()
+            markets = self.markets
+        if markets is None:
+            # Download without holding the cache lock, so attach() is not blocked meanwhile
+            with self._refresh_lock:
+                if self.markets is None:
+                    self.refresh()
+        self.start()
+        return self.markets or {}
+
+    def refresh(self) -> None:
+        """Download the markets, save the snapshot and update attached exchanges"""
+        # Imported here since coinex_api imports this module
+        from coinex_api import ENDPOINT_WEIGHTS, PRIORITY_BACKGROUND, RATE_LIMIT_TIMEOUT, rate_limiter
+
+        rate_limiter.acquire(ENDPOINT_WEIGHTS['load_markets'], PRIORITY_BACKGROUND, RATE_LIMIT_TIMEOUT)
+        exchange = ccxt.coinex({'enableRateLimit': False})
+        markets = exchange.load_markets(reload=True)
+        currencies = exchange.currencies
+
+        with self._lock:
+            self.markets = markets
+            self.currencies = currencies
+            self.loaded_at = time.time()
+            for attached in list(self._exchanges):
+                attached.set_markets(markets, currencies)
+        self._save_snapshot()
+        logger.info(f"Loaded {len(markets)} markets from CoinEx")
+
+    def start(self) -> None:
+        """Start the background refresher if it is not running"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='market-cache', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresher"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        """Refresh the markets whenever they are older than the refresh interval"""
+        while not self._stop_event.is_set():
+            wait = self.loaded_at + self.refresh_interval - time.time()
+            if wait > 0:
+                self._stop_event.wait(wait)
+                continue
+            try:
+                with self._refresh_lock:
+                    # Skip if a cold start refreshed the markets while this thread waited
+                    if self.loaded_at + self.refresh_interval <= time.time():
+                        self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing markets: {str(e)}")
+                self._stop_event.wait(min(60.0, self.refresh_interval))
+
+    def _load_snapshot(self) -> None:
+        """Load the snapshot file once, if present"""
+        if self._snapshot_checked:
+            return
+        self._snapshot_checked = True
+        if not os.path.exists(self.snapshot_path):
+            return
+
+        try:
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+            self.markets = snapshot['markets']
+            self.currencies = snapshot.get('currencies') or None
+            self.loaded_at = snapshot.get('loaded_at', 0.0)
+            logger.info(f"Loaded {len(self.markets)} markets from snapshot {self.snapshot_path}")
+        except Exception as e:
+            logger.error(f"Error loading market snapshot: {str(e)}")
+
+    def _save_snapshot(self) -> None:
+        """Write the markets to the snapshot file"""
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            temp_path = f"{self.snapshot_path}.tmp"
+            with self._lock:
+                snapshot = {'loaded_at': self.loaded_at, 'markets': self.markets, 'currencies': self.currencies}
+                with open(temp_path, 'w') as f:
+                    json.dump(snapshot, f, default=str)
+            os.replace(temp_path, self.snapshot_path)
+        except Exception as e:
+            logger.error(f"Error saving market snapshot: {str(e)}")
+
+
+# Shared by all CoinExAPI instances in this process
+market_cache = MarketCache(
+    os.environ.get('MARKETS_SNAPSHOT_PATH', DEFAULT_SNAPSHOT_PATH),
+    float(os.environ.get('MARKETS_REFRESH_INTERVAL', 3600))
+)
@@ -72,3 +72,13 @@ class BotSettings(db.Model):
     
     def __repr__(self):
         return f"<BotSettings id={self.id}>"
+
+
+class ConfigVersion(db.Model):
+    """Single-row counter bumped whenever settings, strategies or trading pairs change"""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.now, onupdate=datetime.datetime.now)
+    
+    def __repr__(self):
+        return f"<ConfigVersion {self.version}>"
@@ -0,0 +1,214 @@
+import threading
+from typing import Optional
+
+import ccxt
+import numpy as np
+
+from candles import Candles
+
+DAY_MS = 86400000
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """
+    Convert a CCXT timeframe string to milliseconds
+
+    Args:
+        timeframe: Timeframe such as '5m', '1h' or '1d'
+
+    Returns:
+        Timeframe duration in milliseconds
+    """
+    return int(ccxt.Exchange.parse_timeframe(timeframe) * 1000)
+
+
+def can_resample(base_timeframe: str, timeframe: str) -> bool:
+    """
+    Check whether a timeframe can be derived from base timeframe candles
+
+    The target must be a whole multiple of the base timeframe and divide a
+    day evenly, so its buckets line up with the exchange's UTC candles
+    (weekly and monthly candles do not).
+
+    Args:
+        base_timeframe: Timeframe of the source candles
+        timeframe: Requested timeframe
+
+    Returns:
+        True if the timeframe can be resampled locally
+    """
+    try:
+        base_ms = timeframe_to_ms(base_timeframe)
+        target_ms = timeframe_to_ms(timeframe)
+    except Exception:
+        return False
+    return target_ms > base_ms and target_ms % base_ms == 0 and DAY_MS % target_ms == 0
+
+
+def _aggregate(candles: Candles, timeframe_ms: int) -> Candles:
+    """Aggregate candles into buckets of timeframe_ms starting at multiples of it"""
+    timestamp = candles.timestamp
+    buckets = timestamp - timestamp % timeframe_ms
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(timestamp)] - 1
+    return Candles(
+        buckets[starts],
+        candles.open[starts],
+        np.maximum.reduceat(candles.high, starts),
+        np.minimum.reduceat(candles.low, starts),
+        candles.close[ends],
+        np.add.reduceat(candles.volume, starts)
+    )
+
+
+def _drop_leading_partial(candles: Candles, timeframe_ms: int) -> Candles:
+    """Drop base candles before the first bucket boundary"""
+    aligned = np.flatnonzero(candles.timestamp % timeframe_ms == 0)
+    if not len(aligned):
+        return Candles()
+    return candles[int(aligned[0]):]
+
+
+def resample_candles(candles: Candles, base_timeframe: str, timeframe: str,
+                     include_partial: bool = True) -> Candles:
+    """
+    Derive higher timeframe candles from base timeframe candles
+
+    Open is the first open, high the highest high, low the lowest low, close
+    the last close and volume the summed volume of each bucket. Base candles
+    before the first bucket boundary are dropped, since that bucket would be
+    missing its start.
+
+    Args:
+        candles: Base timeframe candles sorted by timestamp
+        base_timeframe: Timeframe of the base candles
+        timeframe: Target timeframe
+        include_partial: Keep the last bucket even if it is not complete yet
+
+    Returns:
+        Resampled candles
+    """
+    base_ms = timeframe_to_ms(base_timeframe)
+    timeframe_ms = timeframe_to_ms(timeframe)
+    candles = _drop_leading_partial(candles, timeframe_ms)
+    if not len(candles):
+        return Candles()
+
+    resampled = _aggregate(candles, timeframe_ms)
+    last_bucket_end = resampled.timestamp[-1] + timeframe_ms
+    if not include_partial and candles.timestamp[-1] + base_ms < last_bucket_end:
+        resampled = resampled[:-1]
+    return resampled
+
+
+class TimeframeResampler:
+    """
+    Incrementally maintained higher timeframe candles
+
+    Each update only re-aggregates the base candles belonging to the last
+    (possibly still forming) bucket and the buckets after it. The last bucket
+    is replaced in place unless a view of the candles has been handed out
+    since, in which case the kept candles move to new buffers. At most twice
+    the largest requested number of candles is retained, so neither that copy
+    nor memory grows with the history seen.
+    """
+
+    def __init__(self, base_timeframe: str, timeframe: str):
+        """
+        Initialize the resampler
+
+        Args:
+            base_timeframe: Timeframe of the source candles
+            timeframe: Target timeframe
+        """
+        if not can_resample(base_timeframe, timeframe):
+            raise ValueError(f"Cannot resample {base_timeframe} candles to {timeframe}")
+        self.base_timeframe = base_timeframe
+        self.timeframe = timeframe
+        self.base_ms = timeframe_to_ms(base_timeframe)
+        self.timeframe_ms = timeframe_to_ms(timeframe)
+        self.candles = Candles()
+        self.last_base_timestamp = None
+        self.max_candles = 0
+        self._views_held = False
+        self._lock = threading.Lock()
+
+    @property
+    def partial(self) -> bool:
+        """Whether the last resampled candle is missing base candles"""
+        if self.last_base_timestamp is None:
+            return False
+        return self.last_base_timestamp + self.base_ms < self.candles.timestamp[-1] + self.timeframe_ms
+
+    def reset(self) -> None:
+        """Discard all resampled candles"""
+        with self._lock:
+            self.candles = Candles()
+            self.last_base_timestamp = None
+            self._views_held = False
+
+    def update(self, base: Candles, limit: Optional[int] = None) -> int:
+        """
+        Fold new base candles into the resampled candles
+
+        The base candles may overlap ones already seen; everything from the
+        start of the last resampled bucket is re-aggregated, so a revised
+        forming base candle is picked up as well. If the base candles do not
+        reach back to that bucket, the resampler starts over from them.
+
+        Args:
+            base: Base timeframe candles sorted by timestamp
+            limit: Number of candles the caller reads; the largest limit seen
+                bounds the retained candles (all are kept if none is given)
+
+        Returns:
+            Number of resampled candles
+        """
+        with self._lock:
+            if limit:
+                self.max_candles = max(self.max_candles, limit)
+
+            if len(self.candles):
+                bucket_start = self.candles.timestamp[-1]
+                first = int(np.searchsorted(base.timestamp, bucket_start))
+                if first < len(base) and base.timestamp[first] == bucket_start:
+                    base = base[first:]
+                    self.candles.truncate(len(self.candles) - 1, keep_views=self._views_held)
+                    self._views_held = False
+                else:
+                    self.candles = Candles()
+
+            if not len(self.candles):
+                base = _drop_leading_partial(base, self.timeframe_ms)
+            if not len(base):
+                return len(self.candles)
+
+            self.candles.extend(_aggregate(base, self.timeframe_ms))
+            self.last_base_timestamp = int(base.timestamp[-1])
+            self._trim()
+            return len(self.candles)
+
+    def _trim(self) -> None:
+        """Keep the last max_candles candles once twice that many are held; the caller holds the lock"""
+        if self.max_candles and len(self.candles) > 2 * self.max_candles:
+            kept = self.candles[-self.max_candles:]
+            self.candles = Candles()
+            self.candles.extend(kept)
+            self._views_held = False
+
+    def read(self, limit: int) -> Candles:
+        """
+        Get the most recent resampled candles
+
+        Args:
+            limit: Maximum number of candles
+
+        Returns:
+            Candles view that later updates will not modify (see Candles.truncate)
+        """
+        with self._lock:
+            self._views_held = True
+            return self.candles[-limit:]
+
+    def __len__(self) -> int:
+        return len(self.candles)
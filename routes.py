@@ -7,8 +7,11 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from app import app, db
 from models import TradingPair, TradingStrategy, Trade, BotSettings
-from coinex_api import CoinExAPI
-from trading_strategies import get_strategy_by_name, get_available_strategies
+from coinex_api import CoinExAPI, market_stream, rate_limiter, single_flight
+from trading_strategies import get_available_strategies, strategy_registry
+from indicators import calculate_indicators
+from ticker_snapshot import TickerSnapshot
+from config_snapshot import bump_config_version
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -16,6 +19,18 @@ logger = logging.getLogger(__name__)
 # Initialize CoinEx API
 coinex_api = CoinExAPI()
 
+# Tickers for the dashboard endpoints, refreshed in the background through the current API client
+ticker_snapshot = TickerSnapshot(lambda symbols: coinex_api.get_tickers(symbols))
+
+
+def _on_stream_update(channel, symbol, data):
+    """Push streamed tickers into the snapshot; REST polling covers anything the stream does not"""
+    if channel == 'ticker':
+        ticker_snapshot.update({symbol: data})
+
+
+market_stream.subscribe(_on_stream_update)
+
 @app.route('/')
 def index():
     """Render the dashboard page"""
@@ -63,6 +78,7 @@ def market_status():
             db.session.add(new_pair)
         
         try:
+            bump_config_version()
             db.session.commit()
             trading_pairs = db.session.query(TradingPair).filter_by(is_active=True).all()
         except SQLAlchemyError as e:
@@ -78,10 +94,13 @@ def market_status():
         'SOL/USDT': {'price': None, 'change': None}
     }
     
+    symbols = [pair.symbol for pair in trading_pairs]
+    market_stream.watch(symbols)
+    tickers = ticker_snapshot.get(symbols)
     for pair in trading_pairs:
-        ticker = coinex_api.get_ticker(pair.symbol)
+        ticker = tickers.get(pair.symbol)
         if ticker:
-            logger.debug(f"Ticker data for {pair.symbol}: {ticker}")
+            logger.debug(f"Ticker data for {pair.symbol}: last={ticker.get('last')}", extra={'sample': 0.01})
             
             # Calculate 24h change percentage
             change_pct = 'N/A'
@@ -159,6 +178,7 @@ def strategy():
             )
             
             db.session.add(new_strategy)
+            bump_config_version()
             db.session.commit()
             
             flash('Strategy has been created successfully!', 'success')
@@ -182,6 +202,7 @@ def toggle_strategy(strategy_id):
         strategy = db.session.query(TradingStrategy).get(strategy_id)
         if strategy:
             strategy.is_active = not strategy.is_active
+            bump_config_version()
             db.session.commit()
             return jsonify({'success': True, 'is_active': strategy.is_active})
         else:
@@ -198,6 +219,7 @@ def delete_strategy(strategy_id):
         strategy = db.session.query(TradingStrategy).get(strategy_id)
         if strategy:
             db.session.delete(strategy)
+            bump_config_version()
             db.session.commit()
             flash('Strategy has been deleted successfully!', 'success')
         else:
@@ -227,6 +249,7 @@ def settings():
     if not settings:
         settings = BotSettings()
         db.session.add(settings)
+        bump_config_version()
         db.session.commit()
     
     if request.method == 'POST':
@@ -238,6 +261,7 @@ def settings():
             settings.max_trade_size = float(request.form.get('max_trade_size', 0.01))
             settings.risk_level = request.form.get('risk_level', 'MEDIUM')
             
+            bump_config_version()
             db.session.commit()
             
             # Update API client with new credentials
@@ -263,6 +287,7 @@ def toggle_bot():
         settings = db.session.query(BotSettings).first()
         if settings:
             settings.is_active = not settings.is_active
+            bump_config_version()
             db.session.commit()
             return jsonify({'success': True, 'is_active': settings.is_active})
         else:
@@ -299,6 +324,7 @@ def trading_pairs():
                     is_active=True
                 )
                 db.session.add(new_pair)
+                bump_config_version()
                 db.session.commit()
                 flash('جفت ارز با موفقیت اضافه شد!', 'success')
             
@@ -343,6 +369,7 @@ def toggle_trading_pair(pair_id):
         pair = db.session.query(TradingPair).get(pair_id)
         if pair:
             pair.is_active = not pair.is_active
+            bump_config_version()
             db.session.commit()
             return jsonify({'success': True, 'is_active': pair.is_active})
         else:
@@ -362,9 +389,10 @@ def get_market_data(symbol):
         
         ohlcv_data = coinex_api.get_ohlcv(symbol, timeframe, limit)
         
+        # Candles are columnar internally; convert to dictionaries only for the response
         return jsonify({
             'success': True,
-            'data': ohlcv_data
+            'data': ohlcv_data.to_dicts()
         })
     except Exception as e:
         logger.error(f"Error getting market data: {str(e)}")
@@ -379,8 +407,11 @@ def get_live_prices():
         
         # Get latest price data for each pair
         price_data = {}
+        symbols = [pair.symbol for pair in trading_pairs]
+        market_stream.watch(symbols)
+        tickers = ticker_snapshot.get(symbols)
         for pair in trading_pairs:
-            ticker = coinex_api.get_ticker(pair.symbol)
+            ticker = tickers.get(pair.symbol)
             if ticker:
                 # Calculate 24h change percentage
                 change_pct = 'N/A'
@@ -398,15 +429,28 @@ def get_live_prices():
                     'volume': ticker.get('volume', 'N/A')
                 }
         
+        # Time of the oldest ticker in the response
+        updated_at = ticker_snapshot.updated_at(symbols)
         return jsonify({
             'success': True,
             'data': price_data,
-            'timestamp': datetime.datetime.now().isoformat()
+            'timestamp': datetime.datetime.now().isoformat(),
+            'updated_at': datetime.datetime.fromtimestamp(updated_at).isoformat() if updated_at else None
         })
     except Exception as e:
         logger.error(f"Error getting live prices: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/exchange_stats')
+def get_exchange_stats():
+    """API endpoint to get exchange request scheduling metrics"""
+    return jsonify({
+        'success': True,
+        'rate_limiter': rate_limiter.stats(),
+        'coalescing': single_flight.stats(),
+        'stream': market_stream.stats()
+    })
+
 @app.route('/api/analyze_strategy/<int:strategy_id>')
 def analyze_strategy(strategy_id):
     """API endpoint to analyze a strategy with current market data"""
@@ -428,12 +472,17 @@ def analyze_strategy(strategy_id):
         ohlcv_data = coinex_api.get_ohlcv(trading_pair.symbol, timeframe, limit)
         
         # Create strategy instance
-        strategy_instance = get_strategy_by_name(strategy_obj.strategy_type, strategy_obj.parameters)
+        strategy_instance = strategy_registry.get(strategy_obj.id, strategy_obj.strategy_type,
+                                                  strategy_obj.parameters, strategy_obj.updated_at)
         if not strategy_instance:
             return jsonify({'success': False, 'error': 'Failed to create strategy instance'}), 500
         
-        # Analyze
-        result = strategy_instance.analyze(ohlcv_data)
+        # Analyze, reusing indicators the bot already computed for these candles
+        indicators = calculate_indicators(ohlcv_data, symbol=trading_pair.symbol, timeframe=timeframe)
+        result = strategy_instance.analyze(ohlcv_data, indicators)
+        
+        # Signal of every past bar, for chart overlays
+        result['signals'] = strategy_instance.signal_series(ohlcv_data, indicators).tolist()
         
         # Add some additional info
         result['strategy_name'] = strategy_obj.name
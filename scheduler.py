@@ -0,0 +1,172 @@
+import heapq
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from resampling import DAY_MS, timeframe_to_ms
+
+# A (symbol, timeframe) pair whose strategies run when its candle closes
+ScheduleKey = Tuple[str, str]
+
+
+def can_schedule(timeframe: str) -> bool:
+    """
+    Check whether candle closes of a timeframe can be computed
+
+    Like can_resample, this needs the timeframe to divide a day evenly:
+    such candles open on multiples of the timeframe since the Unix epoch,
+    while weekly and monthly candles open on Mondays and calendar months.
+
+    Args:
+        timeframe: Candle timeframe
+
+    Returns:
+        True if the scheduler supports the timeframe
+    """
+    try:
+        return DAY_MS % timeframe_to_ms(timeframe) == 0
+    except Exception:
+        return False
+
+
+class CandleCloseScheduler:
+    """
+    Timing heap that fires when each (symbol, timeframe) candle closes
+
+    Candles are assumed to open on multiples of the timeframe since the Unix
+    epoch, as exchange candles of up to a day do; other timeframes are
+    rejected (see can_schedule). Each key is due a grace
+    delay after its candle close, giving the exchange time to publish the
+    closed candle. Heap entries are invalidated lazily: an entry whose time
+    no longer matches its key's due time is dropped when it reaches the top.
+    """
+
+    def __init__(self, grace: float = 2.0, retry_delay: float = 10.0):
+        """
+        Initialize the scheduler
+
+        Args:
+            grace: Seconds to wait after a candle closes before the key is due
+            retry_delay: Seconds before a key passed to retry() is due again
+        """
+        self.grace = grace
+        self.retry_delay = retry_delay
+        self._heap: List[Tuple[float, str, str]] = []
+        self._due_at: Dict[ScheduleKey, float] = {}
+        self._lock = threading.Lock()
+
+    def next_close(self, timeframe: str, now: float) -> float:
+        """
+        Get the close time of the candle forming at the given time
+
+        Args:
+            timeframe: Candle timeframe; ValueError is raised if it does not
+                divide a day (see can_schedule)
+            now: Unix time in seconds
+
+        Returns:
+            Unix time in seconds when the candle closes
+        """
+        if not can_schedule(timeframe):
+            raise ValueError(f"Cannot schedule candle closes for timeframe {timeframe}")
+        timeframe_ms = timeframe_to_ms(timeframe)
+        return (int(now * 1000) // timeframe_ms + 1) * timeframe_ms / 1000
+
+    def sync(self, keys: Iterable[ScheduleKey], now: float) -> List[ScheduleKey]:
+        """
+        Make the scheduled keys match the given ones
+
+        Args:
+            keys: (symbol, timeframe) pairs that have active strategies;
+                ValueError is raised, and nothing changed, if any timeframe
+                cannot be scheduled
+            now: Current Unix time in seconds
+
+        Returns:
+            Newly added keys; they are due immediately
+        """
+        keys = set(keys)
+        unsupported = sorted(key for key in keys if not can_schedule(key[1]))
+        if unsupported:
+            raise ValueError(f"Cannot schedule candle closes for {unsupported}")
+        with self._lock:
+            added = keys - set(self._due_at)
+            for key in set(self._due_at) - keys:
+                del self._due_at[key]
+            for key in added:
+                self._push(key, now)
+        return sorted(added)
+
+    def pop_due(self, now: float) -> List[ScheduleKey]:
+        """
+        Remove the keys that are due and schedule their next candle close
+
+        Args:
+            now: Current Unix time in seconds
+
+        Returns:
+            Due (symbol, timeframe) pairs
+        """
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due_at, symbol, timeframe = heapq.heappop(self._heap)
+                key = (symbol, timeframe)
+                if self._due_at.get(key) != due_at:
+                    continue
+                due.append(key)
+                self._push(key, self.next_close(timeframe, now) + self.grace)
+        return sorted(due)
+
+    def retry(self, keys: Iterable[ScheduleKey], now: float) -> None:
+        """
+        Make keys due again after the retry delay
+
+        Used for keys whose evaluation failed after pop_due (e.g. the candle
+        fetch failed or returned nothing), so the closed candle is not
+        skipped until the next close. Keys that are no longer scheduled are
+        ignored, and a key is never moved past its next candle close.
+
+        Args:
+            keys: (symbol, timeframe) pairs to retry
+            now: Current Unix time in seconds
+        """
+        with self._lock:
+            for key in keys:
+                due_at = self._due_at.get(key)
+                if due_at is not None:
+                    self._push(key, min(due_at, now + self.retry_delay))
+
+    def last_close(self, timeframe: str, now: float) -> float:
+        """
+        Get the close time of the most recent closed candle
+
+        Args:
+            timeframe: Candle timeframe; ValueError is raised if it does not
+                divide a day (see can_schedule)
+            now: Unix time in seconds
+
+        Returns:
+            Unix time in seconds when the candle closed; candles opening at
+            or after it are still forming
+        """
+        return self.next_close(timeframe, now) - timeframe_to_ms(timeframe) / 1000
+
+    def _push(self, key: ScheduleKey, due_at: float) -> None:
+        """Set the due time of a key; the caller holds the lock"""
+        self._due_at[key] = due_at
+        heapq.heappush(self._heap, (due_at, *key))
+
+    def next_due(self) -> Optional[float]:
+        """
+        Get the time the next key is due
+
+        Returns:
+            Unix time in seconds, or None if nothing is scheduled
+        """
+        with self._lock:
+            while self._heap and self._due_at.get(self._heap[0][1:]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def __len__(self) -> int:
+        return len(self._due_at)
@@ -0,0 +1,379 @@
+import math
+from collections import deque
+from typing import Dict
+
+import numpy as np
+
+
+class StreamingIndicator:
+    """
+    Base class for indicators that are updated one candle at a time
+
+    Subclasses keep only the state needed for the next update, so each
+    update is O(1) instead of recomputing the whole history. The state can
+    be captured with snapshot() and loaded back with restore().
+    """
+
+    # Attribute names that make up the indicator state
+    _state_fields = ()
+
+    def snapshot(self) -> Dict:
+        """
+        Capture the current indicator state
+
+        Returns:
+            Dictionary of plain Python values that can be stored as JSON
+        """
+        state = {}
+        for field in self._state_fields:
+            value = getattr(self, field)
+            if isinstance(value, StreamingIndicator):
+                state[field] = value.snapshot()
+            elif isinstance(value, deque):
+                state[field] = [list(item) if isinstance(item, tuple) else item for item in value]
+            elif isinstance(value, dict):
+                state[field] = dict(value)
+            else:
+                state[field] = value
+        return state
+
+    def restore(self, state: Dict) -> None:
+        """
+        Restore indicator state from a snapshot
+
+        Args:
+            state: Dictionary previously returned by snapshot()
+        """
+        for field in self._state_fields:
+            current = getattr(self, field)
+            value = state[field]
+            if isinstance(current, StreamingIndicator):
+                current.restore(value)
+            elif isinstance(current, deque):
+                setattr(self, field, deque(
+                    (tuple(item) if isinstance(item, list) else item for item in value),
+                    maxlen=current.maxlen
+                ))
+            else:
+                setattr(self, field, value)
+
+
+class StreamingSMA(StreamingIndicator):
+    """Simple Moving Average updated with a running window sum"""
+
+    _state_fields = ("window", "total", "count", "value")
+
+    def __init__(self, period: int = 20):
+        """
+        Initialize streaming SMA
+
+        Args:
+            period: MA period
+        """
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.count = 0
+        self.value = np.nan
+
+    def update(self, price: float) -> float:
+        """
+        Add a new price
+
+        Args:
+            price: Latest price (typically the closing price)
+
+        Returns:
+            Current SMA value, NaN until the window is full
+        """
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(price)
+        self.total += price
+        self.count += 1
+
+        # Re-sum once per window so rounding errors cannot accumulate
+        if self.count % self.period == 0:
+            self.total = math.fsum(self.window)
+
+        if len(self.window) == self.period:
+            self.value = self.total / self.period
+        return self.value
+
+
+class StreamingEMA(StreamingIndicator):
+    """Exponential Moving Average seeded with the SMA of the first period prices"""
+
+    _state_fields = ("seed", "value")
+
+    def __init__(self, period: int = 20):
+        """
+        Initialize streaming EMA
+
+        Args:
+            period: EMA period
+        """
+        self.period = period
+        self.multiplier = 2 / (period + 1)
+        self.seed = StreamingSMA(period)
+        self.value = np.nan
+
+    def update(self, price: float) -> float:
+        """
+        Add a new price
+
+        Args:
+            price: Latest price (typically the closing price)
+
+        Returns:
+            Current EMA value, NaN until period prices have been seen
+        """
+        if np.isnan(self.value):
+            self.value = self.seed.update(price)
+        else:
+            self.value = (price - self.value) * self.multiplier + self.value
+        return self.value
+
+
+class StreamingRSI(StreamingIndicator):
+    """
+    Relative Strength Index with Wilder smoothing
+
+    update() returns the RSI including the newest price. The batch
+    relative_strength_index() stores that same value one index earlier,
+    so the latest streaming value equals the last valid batch value.
+    """
+
+    _state_fields = ("prev_price", "count", "gain_sum", "loss_sum", "avg_gain", "avg_loss", "value")
+
+    def __init__(self, period: int = 14):
+        """
+        Initialize streaming RSI
+
+        Args:
+            period: RSI period
+        """
+        self.period = period
+        self.prev_price = None
+        self.count = 0
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.avg_gain = np.nan
+        self.avg_loss = np.nan
+        self.value = np.nan
+
+    def update(self, price: float) -> float:
+        """
+        Add a new price
+
+        Args:
+            price: Latest price (typically the closing price)
+
+        Returns:
+            Current RSI value, NaN until period price changes have been seen
+        """
+        if self.prev_price is None:
+            self.prev_price = price
+            return self.value
+
+        change = price - self.prev_price
+        self.prev_price = price
+        gain = max(0.0, change)
+        loss = max(0.0, -change)
+        self.count += 1
+
+        if self.count < self.period:
+            self.gain_sum += gain
+            self.loss_sum += loss
+            return self.value
+
+        if self.count == self.period:
+            self.avg_gain = (self.gain_sum + gain) / self.period
+            self.avg_loss = (self.loss_sum + loss) / self.period
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+
+        if self.avg_loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - (100 / (1 + self.avg_gain / self.avg_loss))
+        return self.value
+
+
+class StreamingMACD(StreamingIndicator):
+    """
+    Moving Average Convergence Divergence
+
+    Matches macd(): the signal line reported for a bar is the EMA of the
+    MACD line up to the previous bar. Unlike the batch function, the MACD
+    line itself is reported as soon as both EMAs are warmed up.
+    """
+
+    _state_fields = ("fast_ema", "slow_ema", "signal_ema", "value")
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        """
+        Initialize streaming MACD
+
+        Args:
+            fast_period: Fast EMA period
+            slow_period: Slow EMA period
+            signal_period: MACD signal line period
+        """
+        self.fast_ema = StreamingEMA(fast_period)
+        self.slow_ema = StreamingEMA(slow_period)
+        self.signal_ema = StreamingEMA(signal_period)
+        self.value = {"macd": np.nan, "signal": np.nan, "histogram": np.nan}
+
+    def update(self, price: float) -> Dict[str, float]:
+        """
+        Add a new price
+
+        Args:
+            price: Latest price (typically the closing price)
+
+        Returns:
+            Dictionary with current MACD, signal and histogram values
+        """
+        fast = self.fast_ema.update(price)
+        slow = self.slow_ema.update(price)
+        macd_value = fast - slow
+        if np.isnan(macd_value):
+            return self.value
+
+        signal_value = self.signal_ema.value
+        self.signal_ema.update(macd_value)
+        self.value = {
+            "macd": macd_value,
+            "signal": signal_value,
+            "histogram": macd_value - signal_value
+        }
+        return self.value
+
+
+class StreamingBollingerBands(StreamingIndicator):
+    """Bollinger Bands using a sliding-window Welford variance"""
+
+    _state_fields = ("window", "mean", "m2", "count", "flat_run", "value")
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        """
+        Initialize streaming Bollinger Bands
+
+        Args:
+            period: Bollinger Bands period
+            std_dev: Standard deviation multiplier
+        """
+        self.period = period
+        self.std_dev = std_dev
+        self.window = deque(maxlen=period)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.count = 0
+        self.flat_run = 0
+        self.value = {"upper": np.nan, "middle": np.nan, "lower": np.nan}
+
+    def update(self, price: float) -> Dict[str, float]:
+        """
+        Add a new price
+
+        Args:
+            price: Latest price (typically the closing price)
+
+        Returns:
+            Dictionary with current upper, middle and lower band values
+        """
+        if len(self.window) < self.period:
+            # Standard Welford step while the window is filling
+            n = len(self.window) + 1
+            delta = price - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (price - self.mean)
+        else:
+            # Replace the oldest price with the newest one
+            old = self.window[0]
+            old_mean = self.mean
+            self.mean += (price - old) / self.period
+            self.m2 += (price - old) * (price - self.mean + old - old_mean)
+        self.flat_run = self.flat_run + 1 if self.window and self.window[-1] == price else 1
+        self.window.append(price)
+        self.count += 1
+
+        # Recompute exactly once per window so rounding errors cannot accumulate
+        if self.count % self.period == 0:
+            self.mean = math.fsum(self.window) / len(self.window)
+            self.m2 = math.fsum((x - self.mean) ** 2 for x in self.window)
+
+        if len(self.window) == self.period:
+            # A window of identical prices has exactly zero deviation
+            std = 0.0 if self.flat_run >= self.period else math.sqrt(max(self.m2, 0.0) / self.period)
+            self.value = {
+                "upper": self.mean + self.std_dev * std,
+                "middle": self.mean,
+                "lower": self.mean - self.std_dev * std
+            }
+        return self.value
+
+
+class StreamingStochastic(StreamingIndicator):
+    """Stochastic Oscillator using monotonic deques for the window high and low"""
+
+    _state_fields = ("index", "highs", "lows", "k_sma", "value")
+
+    def __init__(self, k_period: int = 14, d_period: int = 3):
+        """
+        Initialize streaming Stochastic Oscillator
+
+        Args:
+            k_period: %K period
+            d_period: %D period
+        """
+        self.k_period = k_period
+        self.index = 0
+        # (index, price) pairs; highs are decreasing and lows increasing
+        self.highs = deque()
+        self.lows = deque()
+        self.k_sma = StreamingSMA(d_period)
+        self.value = {"k": np.nan, "d": np.nan}
+
+    def update(self, high: float, low: float, close: float) -> Dict[str, float]:
+        """
+        Add a new candle
+
+        Args:
+            high: Candle high price
+            low: Candle low price
+            close: Candle closing price
+
+        Returns:
+            Dictionary with current %K and %D values
+        """
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((self.index, high))
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((self.index, low))
+
+        # Drop extremes that fell out of the window
+        window_start = self.index - self.k_period + 1
+        while self.highs[0][0] < window_start:
+            self.highs.popleft()
+        while self.lows[0][0] < window_start:
+            self.lows.popleft()
+        self.index += 1
+
+        if self.index < self.k_period:
+            return self.value
+
+        highest_high = self.highs[0][1]
+        lowest_low = self.lows[0][1]
+        if highest_high == lowest_low:
+            k = 50.0  # Middle value if range is zero
+        else:
+            k = 100 * ((close - lowest_low) / (highest_high - lowest_low))
+
+        self.value = {"k": k, "d": self.k_sma.update(k)}
+        return self.value
+
@@ -0,0 +1,19 @@
+"""
+Shared test setup
+
+Tests run offline against a throwaway database and candle store, with
+ccxt.coinex replaced by the fake exchange (see fake_exchange.install).
+"""
+import os
+import tempfile
+
+_data_dir = tempfile.mkdtemp(prefix='trading_bot_tests_')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_data_dir, 'trading_bot.db')}")
+os.environ.setdefault('CANDLE_STORE_DIR', os.path.join(_data_dir, 'candles'))
+os.environ.setdefault('MARKETS_SNAPSHOT_PATH', os.path.join(_data_dir, 'markets.json'))
+os.environ.setdefault('COINEX_WS_URL', '')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+import fake_exchange  # noqa: E402
+
+fake_exchange.install(fake_exchange.FakeMarket(pairs=5))
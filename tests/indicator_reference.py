@@ -0,0 +1,276 @@
+"""
+Reference implementations and test data shared by the indicator tests
+
+The ref_* functions are the list-based indicators the NumPy array kernels
+replaced, kept verbatim (apart from their names) as the reference.
+"""
+import numpy as np
+
+from candles import Candles
+
+RTOL = 1e-9
+ATOL = 1e-9
+
+
+def ref_moving_average(data, period=20):
+    if len(data) < period:
+        # Return list of NaNs of the same length as data
+        return [np.nan] * len(data)
+
+    ma_values = []
+    for i in range(len(data)):
+        if i < period - 1:
+            ma_values.append(np.nan)
+        else:
+            ma_values.append(sum(data[i-(period-1):i+1]) / period)
+
+    return ma_values
+
+
+def ref_exponential_moving_average(data, period=20):
+    if len(data) < period:
+        return [np.nan] * len(data)
+
+    # Calculate multiplier
+    multiplier = 2 / (period + 1)
+
+    # Calculate initial SMA
+    sma = sum(data[:period]) / period
+
+    # Initialize EMA values with NaNs
+    ema_values = [np.nan] * (period - 1)
+
+    # Add initial SMA value
+    ema_values.append(sma)
+
+    # Calculate EMA for remaining data points
+    for i in range(period, len(data)):
+        ema = (data[i] - ema_values[-1]) * multiplier + ema_values[-1]
+        ema_values.append(ema)
+
+    return ema_values
+
+
+def ref_relative_strength_index(data, period=14):
+    if len(data) < period + 1:
+        return [np.nan] * len(data)
+
+    # Calculate price changes
+    changes = [data[i] - data[i-1] for i in range(1, len(data))]
+
+    # Initialize RSI values with NaNs
+    rsi_values = [np.nan] * period
+
+    # Calculate initial average gains and losses
+    gains = [max(0, change) for change in changes[:period]]
+    losses = [max(0, -change) for change in changes[:period]]
+
+    avg_gain = sum(gains) / period
+    avg_loss = sum(losses) / period
+
+    # Calculate RSI for remaining data points
+    for i in range(period, len(data) - 1):
+        change = changes[i]
+        gain = max(0, change)
+        loss = max(0, -change)
+
+        # Use smoothed averages (Wilder's method)
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+
+        if avg_loss == 0:
+            rsi = 100
+        else:
+            rs = avg_gain / avg_loss
+            rsi = 100 - (100 / (1 + rs))
+
+        rsi_values.append(rsi)
+
+    # Add extra NaN to match the length of input data
+    if len(rsi_values) < len(data):
+        rsi_values.append(np.nan)
+
+    return rsi_values
+
+
+def ref_macd(data, fast_period=12, slow_period=26, signal_period=9):
+    if len(data) < slow_period + signal_period:
+        return {
+            "macd": [np.nan] * len(data),
+            "signal": [np.nan] * len(data),
+            "histogram": [np.nan] * len(data)
+        }
+
+    # Calculate fast and slow EMAs
+    fast_ema = ref_exponential_moving_average(data, fast_period)
+    slow_ema = ref_exponential_moving_average(data, slow_period)
+
+    # Calculate MACD line
+    macd_line = [np.nan] * len(data)
+    for i in range(len(data)):
+        if np.isnan(fast_ema[i]) or np.isnan(slow_ema[i]):
+            continue
+        macd_line[i] = fast_ema[i] - slow_ema[i]
+
+    # Calculate signal line (EMA of MACD line)
+    # Remove NaN values for calculation
+    valid_macd = []
+    for val in macd_line:
+        if not np.isnan(val):
+            valid_macd.append(val)
+
+    # Ensure we have enough data for the signal line EMA
+    if len(valid_macd) < signal_period:
+        return {
+            "macd": macd_line,
+            "signal": [np.nan] * len(data),
+            "histogram": [np.nan] * len(data)
+        }
+
+    # Calculate EMA of valid MACD values
+    valid_signal = []
+
+    # Initialize with SMA
+    valid_signal.append(sum(valid_macd[:signal_period]) / signal_period)
+
+    # Calculate EMA for remaining points
+    multiplier = 2 / (signal_period + 1)
+    for i in range(signal_period, len(valid_macd)):
+        signal_val = (valid_macd[i] - valid_signal[-1]) * multiplier + valid_signal[-1]
+        valid_signal.append(signal_val)
+
+    # Map signal line back to original data length
+    signal_line = [np.nan] * len(data)
+    valid_idx = 0
+
+    for i in range(len(data)):
+        if not np.isnan(macd_line[i]):
+            valid_idx += 1
+            if valid_idx > signal_period:
+                signal_line[i] = valid_signal[valid_idx - signal_period - 1]
+
+    # Calculate histogram
+    histogram = [np.nan] * len(data)
+    for i in range(len(data)):
+        if not np.isnan(macd_line[i]) and not np.isnan(signal_line[i]):
+            histogram[i] = macd_line[i] - signal_line[i]
+
+    return {
+        "macd": macd_line,
+        "signal": signal_line,
+        "histogram": histogram
+    }
+
+
+def ref_bollinger_bands(data, period=20, std_dev=2.0):
+    if len(data) < period:
+        return {
+            "upper": [np.nan] * len(data),
+            "middle": [np.nan] * len(data),
+            "lower": [np.nan] * len(data)
+        }
+
+    # Calculate SMA (middle band)
+    middle_band = ref_moving_average(data, period)
+
+    # Calculate standard deviation
+    upper_band = [np.nan] * len(data)
+    lower_band = [np.nan] * len(data)
+
+    for i in range(period - 1, len(data)):
+        window = data[i-(period-1):i+1]
+        std = np.std(window)
+        upper_band[i] = middle_band[i] + (std_dev * std)
+        lower_band[i] = middle_band[i] - (std_dev * std)
+
+    return {
+        "upper": upper_band,
+        "middle": middle_band,
+        "lower": lower_band
+    }
+
+
+def ref_stochastic_oscillator(high_data, low_data, close_data, k_period=14, d_period=3):
+    if len(close_data) < k_period + d_period - 1:
+        return {
+            "k": [np.nan] * len(close_data),
+            "d": [np.nan] * len(close_data)
+        }
+
+    # Calculate %K
+    k_values = [np.nan] * len(close_data)
+
+    for i in range(k_period - 1, len(close_data)):
+        # Get highest high and lowest low in the period
+        highest_high = max(high_data[i-(k_period-1):i+1])
+        lowest_low = min(low_data[i-(k_period-1):i+1])
+
+        # Calculate %K
+        if highest_high == lowest_low:
+            k = 50  # Middle value if range is zero
+        else:
+            k = 100 * ((close_data[i] - lowest_low) / (highest_high - lowest_low))
+
+        k_values[i] = k
+
+    # Calculate %D (SMA of %K)
+    d_values = [np.nan] * len(close_data)
+
+    for i in range(k_period + d_period - 2, len(close_data)):
+        # Calculate SMA of the last d_period %K values
+        d = sum(k_values[i-(d_period-1):i+1]) / d_period
+        d_values[i] = d
+
+    return {
+        "k": k_values,
+        "d": d_values
+    }
+
+
+def random_walk(size, seed, start=100.0):
+    """Positive random-walk closing prices"""
+    rng = np.random.default_rng(seed)
+    return start * np.exp(np.cumsum(rng.normal(0, 0.01, size)))
+
+
+def random_candles(size, seed):
+    """High, low and close prices around a random walk"""
+    rng = np.random.default_rng(seed + 1000)
+    close = random_walk(size, seed)
+    high = close * (1 + rng.uniform(0, 0.01, size))
+    low = close * (1 - rng.uniform(0, 0.01, size))
+    return high, low, close
+
+
+def make_candles(size, seed):
+    high, low, close = random_candles(size, seed)
+    timestamp = np.arange(size, dtype=np.int64) * 60_000
+    return Candles(timestamp, close, high, low, close, np.ones(size))
+
+
+# Random series of several lengths plus edge cases: shorter than every
+# period, exactly one period long, flat prices and a single price jump
+SERIES = {
+    "empty": np.array([]),
+    "single": np.array([100.0]),
+    "short": random_walk(5, seed=1),
+    "one_period": random_walk(20, seed=2),
+    "flat": np.full(60, 42.5),
+    "step": np.concatenate([np.full(30, 10.0), np.full(30, 11.0)]),
+    "random_60": random_walk(60, seed=3),
+    "random_300": random_walk(300, seed=4),
+    "large_prices": random_walk(200, seed=5, start=60000.0),
+}
+
+PERIODS = [1, 2, 5, 14, 20, 50]
+
+
+def assert_close(actual, expected):
+    np.testing.assert_allclose(np.asarray(actual, dtype=np.float64), np.asarray(expected, dtype=np.float64),
+                               rtol=RTOL, atol=ATOL, equal_nan=True)
+
+
+def assert_lines_close(actual, expected):
+    assert set(actual) == set(expected)
+    for line in expected:
+        assert_close(actual[line], expected[line])
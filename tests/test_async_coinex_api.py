@@ -0,0 +1,182 @@
+"""Asyncio CoinEx client against the fake exchange"""
+import asyncio
+import time
+
+import ccxt
+import numpy as np
+import pytest
+
+import async_coinex_api
+from async_coinex_api import AsyncCoinExAPI, gather_bounded
+from candle_store import CandleStore
+from coinex_api import CoinExAPI, RateLimiter
+from fake_exchange import AsyncFakeExchange, FakeExchange, FakeMarket
+
+SYMBOLS = [f"C{i}/USDT" for i in range(8)]
+NOW = 1_700_000_000_000 + 1_234_567
+
+
+class FrozenExchange(FakeExchange):
+    def milliseconds(self):
+        return NOW
+
+
+class AsyncFrozenExchange(AsyncFakeExchange):
+    def milliseconds(self):
+        return NOW
+
+
+class FailingExchange(AsyncFrozenExchange):
+    """Fails every candle request for the symbols in failing"""
+
+    def __init__(self, market, failing):
+        super().__init__(market=market)
+        self.failing = set(failing)
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        if symbol in self.failing:
+            raise ccxt.NetworkError("fake exchange: down")
+        return await super().fetch_ohlcv(symbol, timeframe, since, limit, params)
+
+
+@pytest.fixture
+def market():
+    return FakeMarket(symbols=SYMBOLS)
+
+
+def make_async_api(exchange, candle_store=None):
+    """Async client on the given fake exchange; must be created inside the event loop"""
+    api = AsyncCoinExAPI(candle_store=candle_store)
+    api.exchange = exchange
+    return api
+
+
+def make_sync_api(market, candle_store=None):
+    api = CoinExAPI(candle_store=candle_store)
+    api.exchange = FrozenExchange(market=market)
+    return api
+
+
+def test_gather_bounded_keeps_order_and_limits_concurrency():
+    running = []
+    peak = []
+
+    async def work(i):
+        running.append(i)
+        peak.append(len(running))
+        await asyncio.sleep(0.01 * (5 - i % 5))
+        running.remove(i)
+        return i * 2
+
+    results = asyncio.run(gather_bounded((work(i) for i in range(20)), limit=3))
+    assert results == [i * 2 for i in range(20)]
+    assert max(peak) == 3
+
+
+def test_gather_bounded_can_return_exceptions():
+    async def work(i):
+        if i == 1:
+            raise ValueError(i)
+        return i
+
+    results = asyncio.run(gather_bounded([work(i) for i in range(3)], return_exceptions=True))
+    assert results[0] == 0 and results[2] == 2
+    assert isinstance(results[1], ValueError)
+    with pytest.raises(ValueError):
+        asyncio.run(gather_bounded([work(i) for i in range(3)]))
+
+
+def test_get_ohlcv_many_matches_the_sync_client(market):
+    async def fetch():
+        async with make_async_api(AsyncFrozenExchange(market=market)) as api:
+            return await api.get_ohlcv_many(SYMBOLS, '1h', 50)
+
+    result = asyncio.run(fetch())
+    sync_api = make_sync_api(market)
+    assert list(result) == SYMBOLS
+    for symbol in SYMBOLS:
+        expected = sync_api.get_ohlcv(symbol, '1h', 50)
+        assert len(result[symbol]) == 50
+        np.testing.assert_array_equal(result[symbol].timestamp, expected.timestamp)
+        np.testing.assert_array_equal(result[symbol].close, expected.close)
+
+
+def test_get_ohlcv_many_overlaps_requests(market, monkeypatch):
+    # Time only the exchange latency, not tokens drained by earlier tests
+    monkeypatch.setattr(async_coinex_api, 'rate_limiter', RateLimiter(rate=1000, capacity=1000))
+
+    async def fetch():
+        api = make_async_api(AsyncFrozenExchange(market=market, latency=0.2))
+        started = time.monotonic()
+        result = await api.get_ohlcv_many(SYMBOLS, '1h', 20, concurrency=len(SYMBOLS))
+        await api.close()
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(fetch())
+    assert all(len(candles) == 20 for candles in result.values())
+    # Sequential requests would take 8 * 0.2s
+    assert elapsed < 1.0
+
+
+def test_failed_symbols_get_empty_candles(market):
+    async def fetch():
+        api = make_async_api(FailingExchange(market, failing={'C1/USDT'}))
+        result = await api.get_ohlcv_many(['C0/USDT', 'C1/USDT'], '1h', 10)
+        await api.close()
+        return result
+
+    result = asyncio.run(fetch())
+    assert len(result['C0/USDT']) == 10
+    assert result['C1/USDT'] is not None and len(result['C1/USDT']) == 0
+
+
+def test_store_backed_fetches_match_the_sync_client(market, tmp_path):
+    async_store = CandleStore(str(tmp_path / 'async'))
+    sync_store = CandleStore(str(tmp_path / 'sync'))
+    exchange = AsyncFrozenExchange(market=market)
+
+    async def fetch():
+        api = make_async_api(exchange, async_store)
+        first = await api.get_ohlcv('C1/USDT', '1h', 60)
+        requests = exchange.requests
+        # Served from the store, with one request to refresh the newest candles
+        second = await api.get_ohlcv('C1/USDT', '4h', 10)
+        await api.close()
+        return first, second, exchange.requests - requests
+
+    first, second, requests = asyncio.run(fetch())
+    sync_api = make_sync_api(market, sync_store)
+    for candles, timeframe, limit in ((first, '1h', 60), (second, '4h', 10)):
+        expected = sync_api.get_ohlcv('C1/USDT', timeframe, limit)
+        np.testing.assert_array_equal(candles.timestamp, expected.timestamp)
+        np.testing.assert_array_equal(candles.high, expected.high)
+    assert requests <= 2
+
+
+def test_get_tickers_keys_results_by_the_symbols_as_given(market):
+    async def fetch():
+        api = make_async_api(AsyncFrozenExchange(market=market))
+        tickers = await api.get_tickers(['C0USDT', 'C1/USDT', 'NOPE/USDT'])
+        empty = await api.get_tickers([])
+        await api.close()
+        return tickers, empty
+
+    tickers, empty = asyncio.run(fetch())
+    assert set(tickers) == {'C0USDT', 'C1/USDT'}
+    assert tickers['C0USDT']['symbol'] == 'C0/USDT'
+    assert empty == {}
+
+
+def test_account_endpoints_need_credentials(market):
+    async def call():
+        api = make_async_api(AsyncFrozenExchange(market=market))
+        results = [await api.get_balance(), await api.create_order('C0/USDT', 'market', 'buy', 1.0),
+                   await api.cancel_order('1', 'C0/USDT'), await api.get_open_orders(),
+                   await api.get_order_history()]
+        await api.close()
+        return api, results
+
+    api, results = asyncio.run(call())
+    assert not api.authenticated
+    assert results == [{}, {}, {}, [], []]
+    assert api.exchange.requests == 0
@@ -0,0 +1,227 @@
+"""Bot cycle: candle fetching, grouping and retries, against the fake exchange"""
+import asyncio
+import time
+from types import MappingProxyType
+
+import pytest
+
+import bot_engine
+import trading_strategies
+from async_coinex_api import AsyncCoinExAPI
+from coinex_api import CoinExAPI
+from config_snapshot import ConfigSnapshot, PairConfig, SettingsConfig, StrategyConfig
+from execution import ExecutionPool
+from fake_exchange import AsyncFakeExchange, FakeExchange, FakeMarket
+
+SYMBOLS = ['BTC/USDT', 'ETH/USDT', 'XRP/USDT']
+
+
+class HangingAsyncExchange(AsyncFakeExchange):
+    """Async fake exchange whose candle requests for some symbols never return"""
+
+    def __init__(self, market, hanging):
+        super().__init__(market=market)
+        self.hanging = set(hanging)
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        if symbol in self.hanging:
+            await asyncio.sleep(3600)
+        return await super().fetch_ohlcv(symbol, timeframe, since, limit, params)
+
+
+class RecordingAPI(CoinExAPI):
+    """Synchronous client that records the candle requests it serves"""
+
+    def __init__(self, market):
+        super().__init__(candle_store=None)
+        self.exchange = FakeExchange(market=market)
+        self.ohlcv_calls = []
+        self.ticker_calls = []
+
+    def get_ohlcv(self, symbol, timeframe='1h', limit=100):
+        self.ohlcv_calls.append((symbol, timeframe))
+        return super().get_ohlcv(symbol, timeframe, limit)
+
+    def get_tickers(self, symbols):
+        self.ticker_calls.append(list(symbols))
+        return super().get_tickers(symbols)
+
+
+def make_config(strategies):
+    """Configuration snapshot with one strategy per (id, symbol, timeframe, type)"""
+    pairs = {symbol: PairConfig(i + 1, symbol, symbol.split('/')[0], 'USDT', True)
+             for i, symbol in enumerate(SYMBOLS)}
+    return ConfigSnapshot(
+        version=1,
+        settings=SettingsConfig('key', 'secret', 10, 0.01, 'MEDIUM', True),
+        strategies=tuple(
+            StrategyConfig(strategy_id, f"strategy {strategy_id}", strategy_type,
+                           MappingProxyType({'timeframe': timeframe}), None, pairs[symbol].id, pairs[symbol])
+            for strategy_id, symbol, timeframe, strategy_type in strategies
+        )
+    )
+
+
+@pytest.fixture
+def market():
+    return FakeMarket(symbols=SYMBOLS)
+
+
+@pytest.fixture
+def bot(market, monkeypatch):
+    bot = bot_engine.TradingBot()
+    bot.api = RecordingAPI(market)
+    bot.loop = asyncio.new_event_loop()
+    bot.executor = ExecutionPool(io_workers=2, cpu_workers=0, task_timeout=0.5)
+    bot.trades = []
+    monkeypatch.setattr(bot, '_execute_trade', lambda strategy, pair, signal, price: bot.trades.append(strategy.id))
+    yield bot
+    if bot.async_api is not None:
+        bot.loop.run_until_complete(bot.async_api.close())
+    bot.executor.shutdown()
+    bot.loop.close()
+
+
+def use_async_exchange(bot, exchange):
+    bot.async_api = AsyncCoinExAPI(candle_store=None)
+    bot.loop.run_until_complete(bot.async_api.close())
+    bot.async_api.exchange = exchange
+
+
+def run_cycle(bot, config):
+    bot.settings = config.settings
+    bot._process_strategies(config)
+
+
+def test_hung_fetch_times_out_and_is_retried(bot, market):
+    use_async_exchange(bot, HangingAsyncExchange(market, hanging={'ETH/USDT'}))
+    config = make_config([(1, 'BTC/USDT', '1h', 'RSI'), (2, 'ETH/USDT', '1h', 'RSI')])
+
+    started = time.monotonic()
+    run_cycle(bot, config)
+    assert time.monotonic() - started < 5
+
+    # The hung pair is not fetched again synchronously within the cycle
+    assert ('ETH/USDT', '1h') not in bot.api.ohlcv_calls
+    # It is due again after the retry delay; the other pair waits for its next close
+    now = time.time()
+    due_at = bot.scheduler._due_at
+    assert due_at[('ETH/USDT', '1h')] <= now + bot.scheduler.retry_delay
+    assert due_at[('BTC/USDT', '1h')] >= bot.scheduler.next_close('1h', now)
+
+
+def test_get_ohlcv_many_reports_timed_out_symbols(market):
+    async def fetch():
+        api = AsyncCoinExAPI(candle_store=None)
+        await api.close()
+        api.exchange = HangingAsyncExchange(market, hanging={'XRP/USDT'})
+        return await api.get_ohlcv_many(SYMBOLS, '1h', 50, timeout=0.2)
+
+    result = asyncio.run(fetch())
+    assert result['XRP/USDT'] is None
+    assert len(result['BTC/USDT']) == 50
+    assert len(result['ETH/USDT']) == 50
+
+
+def test_trades_use_one_ticker_request_per_cycle(bot, monkeypatch):
+    monkeypatch.setattr(trading_strategies.RSIStrategy, 'get_signal', lambda self, *args: 'BUY')
+    prices = {}
+    monkeypatch.setattr(bot, '_execute_trade',
+                        lambda strategy, pair, signal, price: prices.setdefault(pair.symbol, price))
+    # Live prices far from any candle close, with no ticker for XRP
+    live = {'BTC/USDT': 12345.0, 'ETH/USDT': 2345.0}
+    get_tickers = bot.api.get_tickers
+    monkeypatch.setattr(bot.api, 'get_tickers', lambda symbols: {
+        symbol: dict(ticker, last=live[symbol])
+        for symbol, ticker in get_tickers(symbols).items() if symbol in live
+    })
+    config = make_config([(31, 'BTC/USDT', '1h', 'RSI'), (32, 'ETH/USDT', '1h', 'RSI'),
+                          (33, 'XRP/USDT', '1h', 'RSI')])
+
+    run_cycle(bot, config)
+
+    assert bot.api.ticker_calls == [SYMBOLS]
+    assert prices['BTC/USDT'] == 12345.0
+    assert prices['ETH/USDT'] == 2345.0
+    # Without a ticker the latest closed candle's close is used
+    closes = bot.api.get_ohlcv('XRP/USDT', '1h', 100).close
+    assert prices['XRP/USDT'] in (closes[-1], closes[-2])
+
+
+def test_strategies_on_unschedulable_timeframes_are_skipped(bot, monkeypatch):
+    monkeypatch.setattr(trading_strategies.RSIStrategy, 'get_signal', lambda self, *args: 'BUY')
+    config = make_config([(41, 'BTC/USDT', '1w', 'RSI'), (42, 'ETH/USDT', '1h', 'RSI')])
+    run_cycle(bot, config)
+
+    # The weekly strategy does not stop the rest of the cycle
+    assert bot.trades == [42]
+    assert set(bot.scheduler._due_at) == {('ETH/USDT', '1h')}
+    assert ('BTC/USDT', '1w') not in bot.api.ohlcv_calls
+
+
+@pytest.fixture
+def signal_calls(monkeypatch):
+    """Record the candles and indicators each strategy evaluates, answering BUY"""
+    calls = []
+    for cls in (trading_strategies.RSIStrategy, trading_strategies.MACrossoverStrategy):
+        def get_signal(self, ohlcv_data, indicators=None):
+            calls.append((type(self).__name__, ohlcv_data, indicators))
+            return 'BUY'
+        monkeypatch.setattr(cls, 'get_signal', get_signal)
+    return calls
+
+
+@pytest.fixture
+def evaluated(bot, monkeypatch):
+    """Record the evaluation tasks of each cycle and the candle series prefetched for them"""
+    evaluated = {'tasks': [], 'prefetched': []}
+    evaluate, prefetch = bot.executor.evaluate, bot._prefetch_ohlcv
+    monkeypatch.setattr(bot.executor, 'evaluate', lambda tasks: evaluated['tasks'].append(tasks) or evaluate(tasks))
+    monkeypatch.setattr(bot, '_prefetch_ohlcv', lambda keys: evaluated['prefetched'].append(keys) or prefetch(keys))
+    return evaluated
+
+
+def test_strategies_on_one_candle_series_share_the_fetch_and_indicators(bot, signal_calls, evaluated):
+    config = make_config([(51, 'BTC/USDT', '1h', 'RSI'), (52, 'BTC/USDT', '1h', 'MA_CROSSOVER'),
+                          (53, 'BTC/USDT', '1h', 'RSI'), (54, 'ETH/USDT', '1h', 'RSI')])
+    run_cycle(bot, config)
+
+    assert evaluated['prefetched'] == [[('BTC/USDT', '1h'), ('ETH/USDT', '1h')]]
+    [tasks] = evaluated['tasks']
+    assert set(tasks) == {(1, '1h'), (2, '1h')}
+    assert [spec[0] for spec in tasks[(1, '1h')][3]] == [51, 52, 53]
+    assert [spec[0] for spec in tasks[(2, '1h')][3]] == [54]
+
+    # The three BTC strategies read the same candles and indicator set
+    btc = [call for call in signal_calls if call[1] is tasks[(1, '1h')][0]]
+    assert len(btc) == 3 and len(signal_calls) == 4
+    assert btc[0][2] is btc[1][2] is btc[2][2]
+    assert sorted(bot.trades) == [51, 52, 53, 54]
+
+
+def test_timeframes_of_one_pair_are_fetched_and_evaluated_separately(bot, signal_calls, evaluated):
+    config = make_config([(61, 'BTC/USDT', '1h', 'RSI'), (62, 'BTC/USDT', '5m', 'RSI')])
+    run_cycle(bot, config)
+
+    assert evaluated['prefetched'] == [[('BTC/USDT', '1h'), ('BTC/USDT', '5m')]]
+    [tasks] = evaluated['tasks']
+    assert set(tasks) == {(1, '1h'), (1, '5m')}
+    assert tasks[(1, '1h')][0].timestamp[-1] != tasks[(1, '5m')][0].timestamp[-1]
+    assert len({id(call[2]) for call in signal_calls}) == 2
+    assert sorted(bot.trades) == [61, 62]
+
+
+def test_groups_on_inactive_pairs_are_skipped(bot, signal_calls, evaluated):
+    config = make_config([(71, 'BTC/USDT', '1h', 'RSI'), (72, 'ETH/USDT', '1h', 'RSI'),
+                          (73, 'ETH/USDT', '1h', 'MA_CROSSOVER')])
+    inactive = config.strategies[1].trading_pair._replace(is_active=False)
+    config = config._replace(strategies=(config.strategies[0],) + tuple(
+        strategy._replace(trading_pair=inactive) for strategy in config.strategies[1:]))
+    run_cycle(bot, config)
+
+    assert evaluated['prefetched'] == [[('BTC/USDT', '1h')]]
+    [tasks] = evaluated['tasks']
+    assert set(tasks) == {(1, '1h')}
+    assert bot.trades == [71]
+    # Skipped groups are not retried before their next candle close
+    assert bot.scheduler._due_at[('ETH/USDT', '1h')] >= bot.scheduler.next_close('1h', time.time())
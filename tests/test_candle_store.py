@@ -0,0 +1,191 @@
+"""Local candle store and its synchronization with the exchange"""
+import numpy as np
+import pytest
+
+from candle_store import CandleStore
+from candles import Candles
+from coinex_api import CoinExAPI
+from fake_exchange import FakeExchange, FakeMarket
+
+HOUR = 3600_000
+START = 1_700_000_000_000 - 1_700_000_000_000 % HOUR
+
+
+def hourly(first, count, price=1.0):
+    timestamp = np.arange(first, first + count * HOUR, HOUR, dtype=np.int64)
+    prices = np.full(count, price)
+    return Candles(timestamp, prices, prices, prices, prices, prices)
+
+
+class ClockExchange(FakeExchange):
+    """Fake exchange with a settable clock that records its candle requests"""
+
+    def __init__(self, market):
+        super().__init__(market=market)
+        self.now = START + HOUR // 2
+        self.ohlcv_requests = []
+
+    def milliseconds(self):
+        return self.now
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        self.ohlcv_requests.append({'since': since, 'limit': limit})
+        return self.market.ohlcv(symbol, timeframe, self.since(since), limit, self.now)
+
+    def since(self, since):
+        return since
+
+
+class IgnoringSinceExchange(ClockExchange):
+    """Returns the most recent candles whatever since says"""
+
+    def since(self, since):
+        return None
+
+
+class FilteringSinceExchange(ClockExchange):
+    """Returns the most recent candles, keeping only those from since (as ccxt does for such endpoints)"""
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        rows = super().fetch_ohlcv(symbol, timeframe, since, limit, params)
+        return [row for row in rows if since is None or row[0] >= since]
+
+    def since(self, since):
+        return None
+
+
+EXCHANGES = [ClockExchange, IgnoringSinceExchange, FilteringSinceExchange]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(str(tmp_path))
+
+
+@pytest.fixture(params=EXCHANGES, ids=lambda cls: cls.__name__)
+def api(request, store):
+    api = CoinExAPI(candle_store=store, base_timeframe='1h')
+    api.exchange = request.param(FakeMarket(symbols=['BTC/USDT']))
+    return api
+
+
+def expected(api, limit):
+    """Latest candles straight from the fake market"""
+    return Candles.from_ccxt(api.exchange.market.ohlcv('BTC/USDT', '1h', None, limit, api.exchange.now))
+
+
+def assert_same(actual, wanted):
+    assert np.array_equal(actual.timestamp, wanted.timestamp)
+    assert np.allclose(actual.close, wanted.close)
+
+
+def assert_contiguous(store):
+    timestamp = store.read('BTC/USDT', '1h').timestamp
+    assert np.all(np.diff(timestamp) == HOUR)
+
+
+def test_write_appends_and_replaces_forming_candle(store):
+    store.write('BTC/USDT', '1h', hourly(START, 3, price=1.0))
+    store.write('BTC/USDT', '1h', hourly(START + 2 * HOUR, 2, price=2.0))
+
+    candles = store.read('BTC/USDT', '1h')
+    assert list(candles.timestamp) == [START + i * HOUR for i in range(4)]
+    assert list(candles.close) == [1.0, 1.0, 2.0, 2.0]
+    assert store.first_timestamp('BTC/USDT', '1h') == START
+    assert store.last_timestamp('BTC/USDT', '1h') == START + 3 * HOUR
+
+
+def test_write_ignores_older_candles(store):
+    store.write('BTC/USDT', '1h', hourly(START + 5 * HOUR, 2))
+    store.write('BTC/USDT', '1h', hourly(START, 3))
+    assert store.count('BTC/USDT', '1h') == 2
+
+
+def test_read_returns_the_tail(store):
+    store.write('BTC/USDT', '1h', hourly(START, 10))
+    assert list(store.read('BTC/USDT', '1h', limit=3).timestamp) == [START + i * HOUR for i in range(7, 10)]
+    assert len(store.read('BTC/USDT', '4h')) == 0
+
+
+def test_backfill_prepends_only_older_candles(store):
+    store.write('BTC/USDT', '1h', hourly(START + 5 * HOUR, 5))
+    assert store.backfill('BTC/USDT', '1h', hourly(START, 7)) == 5
+    assert store.backfill('BTC/USDT', '1h', hourly(START + HOUR, 3)) == 0
+    assert list(store.read('BTC/USDT', '1h').timestamp) == [START + i * HOUR for i in range(10)]
+
+
+def test_partial_record_is_dropped_on_write(store):
+    store.write('BTC/USDT', '1h', hourly(START, 2))
+    with open(store._path('BTC/USDT', '1h'), 'ab') as f:
+        f.write(b'\0' * 10)
+    store.write('BTC/USDT', '1h', hourly(START + 2 * HOUR, 1))
+    assert list(store.read('BTC/USDT', '1h').timestamp) == [START, START + HOUR, START + 2 * HOUR]
+
+
+def test_history_start_mark_follows_the_first_candle(store):
+    store.write('BTC/USDT', '1h', hourly(START + 5 * HOUR, 2))
+    assert not store.at_history_start('BTC/USDT', '1h')
+    store.mark_history_start('BTC/USDT', '1h')
+    assert store.at_history_start('BTC/USDT', '1h')
+
+    store.write('BTC/USDT', '1h', hourly(START + 10 * HOUR, 2), replace=True)
+    assert not store.at_history_start('BTC/USDT', '1h')
+
+
+def test_first_fetch_fills_the_store(api):
+    assert_same(api.get_ohlcv('BTC/USDT', '1h', 100), expected(api, 100))
+    assert api.exchange.ohlcv_requests == [{'since': None, 'limit': 100}]
+
+
+def test_incremental_sync_requests_only_missing_candles(api):
+    api.get_ohlcv('BTC/USDT', '1h', 100)
+    api.exchange.now += 3 * HOUR
+    api.exchange.ohlcv_requests.clear()
+
+    assert_same(api.get_ohlcv('BTC/USDT', '1h', 100), expected(api, 100))
+    assert len(api.exchange.ohlcv_requests) == 1
+    assert api.exchange.ohlcv_requests[0]['limit'] <= 5
+    assert_contiguous(api.candle_store)
+
+
+def test_unchanged_candle_is_refreshed_in_place(api):
+    api.get_ohlcv('BTC/USDT', '1h', 100)
+    api.exchange.now += HOUR // 4
+    api.exchange.ohlcv_requests.clear()
+
+    assert_same(api.get_ohlcv('BTC/USDT', '1h', 100), expected(api, 100))
+    assert len(api.exchange.ohlcv_requests) == 1
+    assert api.candle_store.count('BTC/USDT', '1h') == 100
+
+
+def test_gap_longer_than_a_page_leaves_no_hole(api):
+    api.get_ohlcv('BTC/USDT', '1h', 100)
+    api.exchange.now += 2500 * HOUR
+
+    assert_same(api.get_ohlcv('BTC/USDT', '1h', 100), expected(api, 100))
+    assert_contiguous(api.candle_store)
+
+
+def test_backfill_extends_history(api):
+    api.get_ohlcv('BTC/USDT', '1h', 50)
+    api.exchange.ohlcv_requests.clear()
+
+    assert_same(api.get_ohlcv('BTC/USDT', '1h', 200), expected(api, 200))
+    assert len(api.exchange.ohlcv_requests) == 2
+    assert_contiguous(api.candle_store)
+
+
+@pytest.mark.parametrize('exchange_class', EXCHANGES, ids=lambda cls: cls.__name__)
+def test_short_history_is_not_backfilled_again(store, exchange_class):
+    # A pair listed 30 candles ago
+    rows = [[START + i * HOUR, 1.0, 1.0, 1.0, 1.0, 1.0] for i in range(30)]
+    api = CoinExAPI(candle_store=store, base_timeframe='1h')
+    api.exchange = exchange_class(FakeMarket(symbols=['NEW/USDT'], recording={'NEW/USDT': {'1h': rows}}))
+    api.exchange.now = START + 29 * HOUR + HOUR // 2
+
+    assert len(api.get_ohlcv('NEW/USDT', '1h', 100)) == 30
+    api.exchange.ohlcv_requests.clear()
+
+    assert len(api.get_ohlcv('NEW/USDT', '1h', 100)) == 30
+    # Only the sync request; no backfill for history that does not exist
+    assert len(api.exchange.ohlcv_requests) == 1
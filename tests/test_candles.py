@@ -0,0 +1,121 @@
+"""Columnar Candles container"""
+import copy
+
+import numpy as np
+import pytest
+
+from candles import PRICE_COLUMNS, Candles, as_candles
+
+
+def rows(count, start=0):
+    """CCXT OHLCV rows with distinct values per candle"""
+    return [[i * 60_000, 10.0 + i, 11.0 + i, 9.0 + i, 10.5 + i, 100.0 + i]
+            for i in range(start, start + count)]
+
+
+def snapshot(candles):
+    return [candles.timestamp.tolist()] + [candles.column(name).tolist() for name in PRICE_COLUMNS]
+
+
+def test_from_ccxt_columns():
+    candles = Candles.from_ccxt(rows(3))
+    assert len(candles) == 3
+    assert candles.timestamp.dtype == np.int64
+    assert candles.timestamp.tolist() == [0, 60_000, 120_000]
+    assert candles.close.tolist() == [10.5, 11.5, 12.5]
+    assert candles.column("volume").tolist() == [100.0, 101.0, 102.0]
+    assert len(Candles.from_ccxt([])) == 0
+
+
+def test_dict_round_trip():
+    candles = Candles.from_ccxt(rows(4))
+    dicts = candles.to_dicts()
+    assert dicts[1]["timestamp"] == 60_000
+    assert dicts[1]["close"] == 11.5
+    assert "datetime" in dicts[1]
+    assert candles[1] == dicts[1]
+    assert candles[-1] == dicts[-1]
+    assert list(candles) == dicts
+    assert snapshot(Candles.from_dicts(dicts)) == snapshot(candles)
+
+
+def test_as_candles_normalizes_every_input_format():
+    candles = Candles.from_ccxt(rows(3))
+    assert as_candles(candles) is candles
+    assert snapshot(as_candles(rows(3))) == snapshot(candles)
+    assert snapshot(as_candles(candles.to_dicts())) == snapshot(candles)
+    assert len(as_candles([])) == 0
+
+
+def test_append_and_extend_grow_the_buffers():
+    candles = Candles()
+    for row in rows(40):
+        candles.append(*row)
+    candles.extend(Candles.from_ccxt(rows(30, start=40)))
+    assert snapshot(candles) == snapshot(Candles.from_ccxt(rows(70)))
+
+
+def test_slice_is_a_view_over_the_same_arrays():
+    candles = Candles.from_ccxt(rows(10))
+    tail = candles[-4:]
+    assert len(tail) == 4
+    assert tail.timestamp.tolist() == candles.timestamp[-4:].tolist()
+    assert np.shares_memory(tail.close, candles.close)
+
+
+def test_views_are_stable_across_append():
+    candles = Candles.from_ccxt(rows(5))
+    view = candles[:]
+    before = snapshot(view)
+    for row in rows(50, start=5):
+        candles.append(*row)
+    assert snapshot(view) == before
+
+
+@pytest.mark.parametrize("keep", [0, 3, 5])
+def test_views_are_stable_across_truncate(keep):
+    candles = Candles()
+    for row in rows(8):
+        candles.append(*row)
+    view = candles[:]
+    prefix = candles[:keep]
+    before, before_prefix = snapshot(view), snapshot(prefix)
+
+    candles.truncate(keep)
+    assert len(candles) == keep
+    # Appending after truncate writes where the dropped candles were
+    for row in rows(6, start=100):
+        candles.append(*row)
+
+    assert snapshot(view) == before
+    assert snapshot(prefix) == before_prefix
+    assert candles.timestamp[keep:].tolist() == [row[0] for row in rows(6, start=100)]
+
+
+def test_truncate_beyond_the_size_keeps_everything():
+    candles = Candles.from_ccxt(rows(4))
+    candles.truncate(10)
+    assert len(candles) == 4
+    candles.truncate(-1)
+    assert len(candles) == 0
+
+
+def test_appending_to_a_view_leaves_the_source_alone():
+    candles = Candles.from_ccxt(rows(6))
+    before = snapshot(candles)
+    view = candles[:3]
+    view.append(*rows(1, start=50)[0])
+    assert len(view) == 4
+    assert snapshot(candles) == before
+
+
+def test_copy_is_independent():
+    candles = Candles.from_ccxt(rows(6))
+    copied = copy.copy(candles)
+    before = snapshot(copied)
+    candles.truncate(2)
+    candles.append(*rows(1, start=50)[0])
+    copied.append(*rows(1, start=60)[0])
+
+    assert snapshot(copied)[0] == before[0] + [3_600_000]
+    assert candles.timestamp.tolist() == [0, 60_000, 3_000_000]
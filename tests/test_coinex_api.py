@@ -0,0 +1,70 @@
+"""Synchronous CoinEx client against the fake exchange"""
+import ccxt
+import pytest
+
+from coinex_api import CoinExAPI
+from fake_exchange import FakeExchange, FakeMarket
+
+SYMBOLS = ['BTC/USDT', 'ETH/USDT', 'XRP/USDT']
+
+
+class RecordingExchange(FakeExchange):
+    """Fake exchange that records its ticker requests"""
+
+    def __init__(self, market):
+        super().__init__(market=market)
+        self.ticker_requests = []
+        self.fail = False
+
+    def fetch_ticker(self, symbol, params=None):
+        self.ticker_requests.append(('fetch_ticker', symbol))
+        return super().fetch_ticker(symbol, params)
+
+    def fetch_tickers(self, symbols=None, params=None):
+        self.ticker_requests.append(('fetch_tickers', tuple(symbols)))
+        if self.fail:
+            raise ccxt.NetworkError("fake exchange: down")
+        return super().fetch_tickers(symbols, params)
+
+
+@pytest.fixture
+def api():
+    api = CoinExAPI(candle_store=None)
+    api.exchange = RecordingExchange(FakeMarket(symbols=SYMBOLS))
+    return api
+
+
+def test_get_tickers_uses_one_request(api):
+    tickers = api.get_tickers(SYMBOLS)
+    assert set(tickers) == set(SYMBOLS)
+    assert api.exchange.ticker_requests == [('fetch_tickers', tuple(SYMBOLS))]
+    assert all(tickers[symbol]['symbol'] == symbol for symbol in SYMBOLS)
+
+
+def test_get_tickers_keys_results_by_the_symbols_as_given(api):
+    tickers = api.get_tickers(['BTCUSDT', 'BTC/USDT', 'ETH/USDT'])
+    assert set(tickers) == {'BTCUSDT', 'BTC/USDT', 'ETH/USDT'}
+    assert tickers['BTCUSDT'] == tickers['BTC/USDT']
+    # Both spellings of BTC are requested once
+    assert api.exchange.ticker_requests == [('fetch_tickers', ('BTC/USDT', 'ETH/USDT'))]
+
+
+def test_get_tickers_leaves_out_unknown_symbols(api):
+    assert set(api.get_tickers(['BTC/USDT', 'NOPE/USDT'])) == {'BTC/USDT'}
+
+
+def test_get_tickers_without_symbols_makes_no_request(api):
+    assert api.get_tickers([]) == {}
+    assert api.exchange.ticker_requests == []
+
+
+def test_get_tickers_returns_nothing_on_error(api):
+    api.exchange.fail = True
+    assert api.get_tickers(SYMBOLS) == {}
+
+
+def test_get_tickers_matches_get_ticker(api):
+    tickers = api.get_tickers(SYMBOLS)
+    for symbol in SYMBOLS:
+        ticker = api.get_ticker(symbol.replace('/', ''))
+        assert ticker['symbol'] == tickers[symbol]['symbol']
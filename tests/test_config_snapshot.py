@@ -0,0 +1,164 @@
+"""Configuration snapshot reloads and the database queries behind them"""
+import threading
+
+import pytest
+from sqlalchemy import event
+
+from app import app, db
+from config_snapshot import ConfigStore, bump_config_version
+from models import ConfigVersion
+
+
+@pytest.fixture
+def context():
+    with app.app_context():
+        yield
+        db.session.rollback()
+        db.session.remove()
+
+
+@pytest.fixture
+def queries():
+    """Statements executed by the engine while the fixture is active"""
+    with app.app_context():
+        engine = db.engine
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+def bump_and_commit():
+    bump_config_version()
+    db.session.commit()
+
+
+def bump_elsewhere():
+    """Bump the version without going through the session events, as another process would"""
+    with db.engine.begin() as conn:
+        conn.execute(db.update(ConfigVersion).where(ConfigVersion.id == 1)
+                     .values(version=ConfigVersion.version + 1))
+
+
+def test_unchanged_version_is_served_without_queries(context, queries):
+    store = ConfigStore(check_interval=3600)
+    first = store.current()
+    queries.clear()
+
+    for _ in range(100):
+        assert store.current() is first
+    assert queries == []
+    assert store.loads == 1
+
+
+def test_interval_check_without_bump_does_not_reload(context, queries):
+    store = ConfigStore(check_interval=0)
+    first = store.current()
+    queries.clear()
+
+    assert store.current() is first
+    assert len(queries) == 1
+    assert store.loads == 1
+
+
+def test_local_bump_reloads_on_next_call(context, monkeypatch, queries):
+    store = ConfigStore(check_interval=3600)
+    monkeypatch.setattr('config_snapshot.config_store', store)
+    first = store.current()
+
+    bump_and_commit()
+    second = store.current()
+    assert second.version == first.version + 1
+    assert store.loads == 2
+
+    queries.clear()
+    assert store.current() is second
+    assert queries == []
+
+
+def test_rolled_back_bump_is_forgotten(context, monkeypatch, queries):
+    store = ConfigStore(check_interval=3600)
+    monkeypatch.setattr('config_snapshot.config_store', store)
+    first = store.current()
+
+    bump_config_version()
+    db.session.rollback()
+    db.session.commit()
+
+    queries.clear()
+    assert store.current() is first
+    assert queries == []
+
+
+def test_bump_from_another_process_is_seen_at_the_next_check(context):
+    store = ConfigStore(check_interval=0)
+    first = store.current()
+
+    bump_elsewhere()
+    assert store.current().version == first.version + 1
+    assert store.loads == 2
+
+
+def test_commit_notification_after_another_caller_loaded_the_version(context, queries):
+    # Another caller's interval check loads the new version before the
+    # committing session's after_commit hook marks the store changed
+    store = ConfigStore(check_interval=0)
+    store.current()
+    bump_elsewhere()
+    loaded = store.current()
+    store.check_interval = 3600
+    store.mark_changed()
+
+    queries.clear()
+    assert store.current() is loaded
+    assert len(queries) == 1
+    assert store.loads == 2
+
+    # The flag was cleared by that read: the hot path is query-free again
+    queries.clear()
+    assert store.current() is loaded
+    assert queries == []
+
+
+def test_concurrent_commits_and_reads_settle(monkeypatch, queries):
+    store = ConfigStore(check_interval=3600)
+    monkeypatch.setattr('config_snapshot.config_store', store)
+    with app.app_context():
+        store.current()
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        with app.app_context():
+            try:
+                while not stop.is_set():
+                    store.current()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.session.remove()
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    with app.app_context():
+        for _ in range(20):
+            bump_and_commit()
+        db.session.remove()
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    with app.app_context():
+        expected = db.session.query(ConfigVersion.version).filter_by(id=1).scalar()
+        assert store.current().version == expected
+        queries.clear()
+        assert store.current().version == expected
+        assert queries == []
+        db.session.remove()
+
@@ -0,0 +1,98 @@
+"""Indicators computed for many symbols at once over (symbols x bars) matrices"""
+import numpy as np
+import pytest
+
+import execution
+import indicators
+from execution import batch_indicators, evaluate_signals
+from indicators import IndicatorSet, calculate_indicators_batch, compute_batch
+from indicator_reference import (
+    assert_close, assert_lines_close, make_candles, random_candles, ref_bollinger_bands,
+    ref_exponential_moving_average, ref_macd, ref_moving_average, ref_relative_strength_index,
+    ref_stochastic_oscillator
+)
+
+
+def test_batch_matches_per_symbol_kernels():
+    rows = [random_candles(150, seed) for seed in range(6)]
+    high = np.stack([row[0] for row in rows])
+    low = np.stack([row[1] for row in rows])
+    close = np.stack([row[2] for row in rows])
+
+    keys = ("sma_20", "sma_50", "ema_12", "rsi_14", "macd", "bollinger", "stochastic")
+    results = calculate_indicators_batch(close, high, low, keys)
+
+    for i, (row_high, row_low, row_close) in enumerate(rows):
+        prices = list(row_close)
+        assert_close(results["sma_20"][i], ref_moving_average(prices, 20))
+        assert_close(results["sma_50"][i], ref_moving_average(prices, 50))
+        assert_close(results["ema_12"][i], ref_exponential_moving_average(prices, 12))
+        assert_close(results["rsi_14"][i], ref_relative_strength_index(prices, 14))
+        assert_lines_close({line: values[i] for line, values in results["macd"].items()}, ref_macd(prices))
+        assert_lines_close({line: values[i] for line, values in results["bollinger"].items()},
+                           ref_bollinger_bands(prices))
+        assert_lines_close({line: values[i] for line, values in results["stochastic"].items()},
+                           ref_stochastic_oscillator(list(row_high), list(row_low), prices))
+
+
+@pytest.mark.parametrize("name,params", [
+    ("sma", {"period": 10}), ("ema", {}), ("rsi", {"period": 7}), ("macd", {}),
+    ("bollinger", {"period": 15}), ("stochastic", {})
+])
+def test_compute_batch_matches_compute(name, params):
+    # Mixed lengths exercise the grouping by series length
+    sizes = [80, 80, 120, 5]
+    batched = [IndicatorSet(make_candles(size, seed)) for seed, size in enumerate(sizes)]
+    single = [IndicatorSet(make_candles(size, seed)) for seed, size in enumerate(sizes)]
+
+    compute_batch(batched, name, **params)
+    for batch_set, single_set in zip(batched, single):
+        expected = single_set.compute(name, **params)
+        actual = batch_set.compute(name, **params)
+        if isinstance(expected, dict):
+            assert_lines_close(actual, expected)
+        else:
+            assert_close(actual, expected)
+
+
+def test_compute_batch_skips_sets_that_already_have_the_result(monkeypatch):
+    sets = [IndicatorSet(make_candles(80, seed)) for seed in range(3)]
+    sets[0].compute("rsi", period=5)
+    function, columns, defaults = indicators.INDICATORS["rsi"]
+    shapes = []
+    monkeypatch.setitem(indicators.INDICATORS, "rsi",
+                        (lambda data, **params: shapes.append(data.shape) or function(data, **params), columns, defaults))
+
+    compute_batch(sets, "rsi", period=5)
+    assert shapes == [(2, 80)]
+
+
+def batch_tasks():
+    """Bot evaluation tasks: several groups sharing strategy parameters"""
+    strategies = [
+        ("batch-rsi", 1, "RSI", {"period": 7}),
+        ("batch-macd", 1, "MACD", {"fast_period": 5, "slow_period": 10, "signal_period": 3}),
+        ("batch-ma", 1, "MA_CROSSOVER", {"fast_period": 5, "slow_period": 12}),
+    ]
+    return {
+        (pair, "1h"): (make_candles(size, pair), f"PAIR{pair}/USDT", "1h", strategies)
+        for pair, size in enumerate([120, 120, 120, 90])
+    }
+
+
+def test_batch_indicators_computes_each_request_once_across_groups(monkeypatch):
+    calls = []
+    monkeypatch.setattr(execution, "compute_batch",
+                        lambda sets, name, **params: calls.append((name, len(sets))) or compute_batch(sets, name, **params))
+
+    batch_indicators(batch_tasks())
+    assert sorted(calls) == [("macd", 4), ("rsi", 4)]
+
+
+def test_batched_signals_match_per_group_evaluation():
+    tasks = batch_tasks()
+    indicator_sets = batch_indicators(tasks)
+    for key, (candles, symbol, timeframe, strategies) in tasks.items():
+        batched = evaluate_signals(candles, symbol, timeframe, strategies, indicator_sets[key])
+        single = evaluate_signals(candles, None, None, strategies)
+        assert batched == single
@@ -0,0 +1,74 @@
+"""Process-wide LRU cache of computed indicators"""
+import numpy as np
+import pytest
+
+from candles import Candles
+from indicators import IndicatorCache, IndicatorSet
+from indicator_reference import make_candles
+
+
+@pytest.fixture
+def cache():
+    return IndicatorCache(max_size=3)
+
+
+def test_sets_on_the_same_series_share_results(cache):
+    candles = make_candles(100, seed=0)
+    first = IndicatorSet(candles, symbol="BTC/USDT", timeframe="1h", cache=cache).compute("sma", period=10)
+    second = IndicatorSet(candles[:], symbol="BTC/USDT", timeframe="1h", cache=cache).compute("sma", period=10)
+
+    assert second is first
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.parametrize("symbol,timeframe,period", [("ETH/USDT", "1h", 10), ("BTC/USDT", "4h", 10),
+                                                     ("BTC/USDT", "1h", 11)])
+def test_different_series_or_parameters_miss(cache, symbol, timeframe, period):
+    candles = make_candles(100, seed=0)
+    IndicatorSet(candles, symbol="BTC/USDT", timeframe="1h", cache=cache).compute("sma", period=10)
+    IndicatorSet(candles, symbol=symbol, timeframe=timeframe, cache=cache).compute("sma", period=period)
+    assert cache.stats()["hits"] == 0
+
+
+def test_forming_candle_price_change_misses(cache):
+    candles = make_candles(100, seed=0)
+    moved = Candles(candles.timestamp, candles.open, candles.high, candles.low,
+                    np.concatenate((candles.close[:-1], [candles.close[-1] * 1.01])), candles.volume)
+
+    first = IndicatorSet(candles, symbol="BTC/USDT", timeframe="1h", cache=cache).compute("sma", period=10)
+    second = IndicatorSet(moved, symbol="BTC/USDT", timeframe="1h", cache=cache).compute("sma", period=10)
+    assert second is not first
+    assert second[-1] != first[-1]
+
+
+def test_sets_without_symbol_do_not_use_the_cache(cache):
+    IndicatorSet(make_candles(100, seed=0), cache=cache).compute("sma", period=10)
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    for key in ("a", "b", "c"):
+        cache.put((key,), np.zeros(3))
+    cache.get(("a",))
+    cache.put(("d",), np.zeros(3))
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 3
+
+
+def test_cached_results_are_read_only(cache):
+    result = {"upper": np.zeros(3), "lower": np.zeros(3)}
+    cache.put(("bands",), result)
+    with pytest.raises(ValueError):
+        cache.get(("bands",))["upper"][0] = 1.0
+
+
+def test_clear_resets_entries_and_counters(cache):
+    cache.put(("a",), np.zeros(3))
+    cache.get(("a",))
+    cache.get(("b",))
+    cache.clear()
+    assert cache.stats() == {"size": 0, "max_size": 3, "hits": 0, "misses": 0, "evictions": 0, "hit_rate": 0.0}
@@ -0,0 +1,97 @@
+"""On-demand indicator computation through IndicatorSet"""
+import pytest
+
+import indicators
+from indicators import DEFAULT_INDICATOR_KEYS, IndicatorSet, calculate_indicators
+from indicator_reference import (
+    assert_close, assert_lines_close, make_candles, ref_exponential_moving_average, ref_macd,
+    ref_moving_average, ref_relative_strength_index
+)
+from trading_strategies import get_strategy_by_name
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Count calls of each indicator function"""
+    counts = {}
+    for name, (function, columns, defaults) in list(indicators.INDICATORS.items()):
+        def counted(*args, _name=name, _function=function, **kwargs):
+            counts[_name] = counts.get(_name, 0) + 1
+            return _function(*args, **kwargs)
+        monkeypatch.setitem(indicators.INDICATORS, name, (counted, columns, defaults))
+    return counts
+
+
+def test_nothing_is_computed_until_requested(calls):
+    indicator_set = calculate_indicators(make_candles(120, seed=0))
+    assert calls == {}
+
+    indicator_set.compute("rsi", period=7)
+    assert calls == {"rsi": 1}
+
+
+def test_repeated_requests_reuse_the_result(calls):
+    indicator_set = IndicatorSet(make_candles(120, seed=0))
+    first = indicator_set.compute("ema", period=12)
+    assert indicator_set.compute("ema", period=12) is first
+    # Defaults are filled in, so spelling them out hits the same entry
+    indicator_set.compute("macd")
+    indicator_set.compute("macd", fast_period=12, slow_period=26, signal_period=9)
+    assert calls == {"ema": 1, "macd": 1}
+
+
+def test_compute_uses_the_requested_parameters():
+    candles = make_candles(150, seed=1)
+    prices = list(candles.close)
+    indicator_set = IndicatorSet(candles)
+
+    assert_close(indicator_set.compute("sma", period=7), ref_moving_average(prices, 7))
+    assert_close(indicator_set.compute("rsi", period=9), ref_relative_strength_index(prices, 9))
+    assert_lines_close(indicator_set.compute("macd", fast_period=5, slow_period=13, signal_period=4),
+                       ref_macd(prices, 5, 13, 4))
+
+
+def test_legacy_keys_behave_like_the_eager_dictionary():
+    candles = make_candles(250, seed=2)
+    prices = list(candles.close)
+    indicator_set = calculate_indicators(candles)
+
+    assert list(indicator_set) == list(DEFAULT_INDICATOR_KEYS)
+    assert len(indicator_set) == len(DEFAULT_INDICATOR_KEYS)
+    assert isinstance(indicator_set["sma_20"], list)
+    assert_close(indicator_set["sma_20"], ref_moving_average(prices, 20))
+    assert_lines_close(indicator_set["macd"], ref_macd(prices))
+    # Any period can be looked up, not only the precomputed ones
+    assert "ema_33" in indicator_set
+    assert_close(indicator_set["ema_33"], ref_exponential_moving_average(prices, 33))
+    assert "vwap" not in indicator_set
+    with pytest.raises(KeyError):
+        indicator_set["vwap"]
+
+
+def test_empty_series_has_no_indicators():
+    indicator_set = calculate_indicators([])
+    assert len(indicator_set) == 0
+    assert "sma_20" not in indicator_set
+    with pytest.raises(KeyError):
+        indicator_set["sma_20"]
+
+
+def test_list_of_dictionaries_is_accepted():
+    candles = make_candles(60, seed=3)
+    rows = [{"timestamp": int(t), "open": o, "high": h, "low": lo, "close": c, "volume": v}
+            for t, o, h, lo, c, v in zip(candles.timestamp, candles.open, candles.high, candles.low,
+                                         candles.close, candles.volume)]
+    assert_close(IndicatorSet(rows).compute("sma", period=10), IndicatorSet(candles).compute("sma", period=10))
+
+
+def test_strategy_reads_only_its_own_indicator(calls):
+    strategy = get_strategy_by_name("RSI", {"period": 7})
+    candles = make_candles(120, seed=4)
+    indicator_set = IndicatorSet(candles)
+    strategy.get_signal(candles, indicator_set)
+    assert calls == {"rsi": 1}
+
+    # The result is kept under the strategy's parameters
+    indicator_set.compute("rsi", period=7)
+    assert calls == {"rsi": 1}
@@ -0,0 +1,81 @@
+"""Multi-parameter indicator sweeps against the single-parameter list implementations"""
+import numpy as np
+import pytest
+
+from indicators import (
+    bollinger_bands_sweep, exponential_moving_average_sweep, macd_sweep, moving_average_sweep,
+    relative_strength_index_sweep
+)
+from indicator_reference import (
+    PERIODS, SERIES, assert_close, assert_lines_close, random_walk, ref_bollinger_bands,
+    ref_exponential_moving_average, ref_macd, ref_moving_average, ref_relative_strength_index
+)
+
+
+@pytest.fixture(params=list(SERIES), ids=list(SERIES))
+def series(request):
+    return SERIES[request.param]
+
+
+def test_moving_average_sweep(series):
+    result = moving_average_sweep(series, PERIODS)
+    assert result.shape == (len(PERIODS), len(series))
+    for row, period in zip(result, PERIODS):
+        assert_close(row, ref_moving_average(list(series), period))
+
+
+def test_exponential_moving_average_sweep(series):
+    result = exponential_moving_average_sweep(series, PERIODS)
+    for row, period in zip(result, PERIODS):
+        assert_close(row, ref_exponential_moving_average(list(series), period))
+
+
+def test_relative_strength_index_sweep(series):
+    periods = [2, 5, 14, 20]
+    result = relative_strength_index_sweep(series, periods)
+    for row, period in zip(result, periods):
+        assert_close(row, ref_relative_strength_index(list(series), period))
+
+
+def test_macd_sweep(series):
+    settings = [(12, 26, 9), (5, 10, 3), (12, 26, 4), (3, 3, 2)]
+    result = macd_sweep(series, settings)
+    for i, setting in enumerate(settings):
+        assert_lines_close({line: values[i] for line, values in result.items()}, ref_macd(list(series), *setting))
+
+
+def test_bollinger_bands_sweep(series):
+    periods = [5, 20]
+    std_devs = [1.0, 2.0, 2.5]
+    result = bollinger_bands_sweep(series, periods, std_devs)
+    for i, period in enumerate(periods):
+        for j, std_dev in enumerate(std_devs):
+            expected = ref_bollinger_bands(list(series), period, std_dev)
+            assert_close(result["middle"][i], expected["middle"])
+            assert_close(result["upper"][i, j], expected["upper"])
+            assert_close(result["lower"][i, j], expected["lower"])
+
+
+@pytest.mark.parametrize("position", [0, 10, 40, 79])
+def test_sweeps_match_on_series_with_a_missing_price(position):
+    prices = random_walk(80, seed=12)
+    prices[position] = np.nan
+    data = list(prices)
+
+    for row, period in zip(moving_average_sweep(prices, PERIODS), PERIODS):
+        assert_close(row, ref_moving_average(data, period))
+    for row, period in zip(exponential_moving_average_sweep(prices, PERIODS), PERIODS):
+        assert_close(row, ref_exponential_moving_average(data, period))
+    for row, period in zip(relative_strength_index_sweep(prices, [5, 14]), [5, 14]):
+        assert_close(row, ref_relative_strength_index(data, period))
+    settings = [(12, 26, 9), (5, 10, 3)]
+    result = macd_sweep(prices, settings)
+    for i, setting in enumerate(settings):
+        assert_lines_close({line: values[i] for line, values in result.items()}, ref_macd(data, *setting))
+
+
+def test_empty_parameter_lists():
+    prices = SERIES["random_60"]
+    assert moving_average_sweep(prices, []).shape == (0, 60)
+    assert exponential_moving_average_sweep(prices, []).shape == (0, 60)
+    assert relative_strength_index_sweep(prices, []).shape == (0, 60)
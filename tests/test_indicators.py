@@ -0,0 +1,114 @@
+"""
+Numerical equivalence of the NumPy indicator kernels with the original
+list implementations (see indicator_reference)
+"""
+import numpy as np
+import pytest
+
+from indicators import (
+    INDICATORS, bollinger_bands, bollinger_bands_array, exponential_moving_average,
+    exponential_moving_average_array, macd, macd_array, moving_average, moving_average_array,
+    relative_strength_index, relative_strength_index_array, stochastic_oscillator, stochastic_oscillator_array
+)
+from indicator_reference import (
+    PERIODS, SERIES, assert_close, assert_lines_close, random_candles, random_walk,
+    ref_bollinger_bands, ref_exponential_moving_average, ref_macd, ref_moving_average,
+    ref_relative_strength_index, ref_stochastic_oscillator
+)
+
+
+@pytest.fixture(params=list(SERIES), ids=list(SERIES))
+def series(request):
+    return SERIES[request.param]
+
+
+@pytest.mark.parametrize("period", PERIODS)
+def test_moving_average(series, period):
+    expected = ref_moving_average(list(series), period)
+    assert_close(moving_average_array(series, period), expected)
+    assert_close(moving_average(list(series), period), expected)
+
+
+@pytest.mark.parametrize("period", PERIODS)
+def test_exponential_moving_average(series, period):
+    expected = ref_exponential_moving_average(list(series), period)
+    assert_close(exponential_moving_average_array(series, period), expected)
+    assert_close(exponential_moving_average(list(series), period), expected)
+
+
+@pytest.mark.parametrize("period", [2, 5, 14, 20])
+def test_relative_strength_index(series, period):
+    expected = ref_relative_strength_index(list(series), period)
+    assert_close(relative_strength_index_array(series, period), expected)
+    assert_close(relative_strength_index(list(series), period), expected)
+
+
+@pytest.mark.parametrize("fast,slow,signal", [(12, 26, 9), (5, 10, 3), (3, 3, 2), (10, 5, 4)])
+def test_macd(series, fast, slow, signal):
+    expected = ref_macd(list(series), fast, slow, signal)
+    assert_lines_close(macd_array(series, fast, slow, signal), expected)
+    assert_lines_close(macd(list(series), fast, slow, signal), expected)
+
+
+@pytest.mark.parametrize("period,std_dev", [(20, 2.0), (5, 1.5), (2, 3.0), (50, 2.0)])
+def test_bollinger_bands(series, period, std_dev):
+    expected = ref_bollinger_bands(list(series), period, std_dev)
+    assert_lines_close(bollinger_bands_array(series, period, std_dev), expected)
+    assert_lines_close(bollinger_bands(list(series), period, std_dev), expected)
+
+
+def test_bollinger_bands_flat_prices_have_zero_width():
+    bands = bollinger_bands_array(SERIES["flat"], 20, 2.0)
+    valid = ~np.isnan(bands["middle"])
+    assert np.array_equal(bands["upper"][valid], bands["middle"][valid])
+    assert np.array_equal(bands["lower"][valid], bands["middle"][valid])
+
+
+@pytest.mark.parametrize("size", [0, 3, 16, 17, 100, 400])
+@pytest.mark.parametrize("k_period,d_period", [(14, 3), (5, 1), (3, 5)])
+def test_stochastic_oscillator(size, k_period, d_period):
+    high, low, close = random_candles(size, seed=size)
+    expected = ref_stochastic_oscillator(list(high), list(low), list(close), k_period, d_period)
+    assert_lines_close(stochastic_oscillator_array(high, low, close, k_period, d_period), expected)
+    assert_lines_close(stochastic_oscillator(list(high), list(low), list(close), k_period, d_period), expected)
+
+
+def test_stochastic_oscillator_flat_prices():
+    flat = SERIES["flat"]
+    expected = ref_stochastic_oscillator(list(flat), list(flat), list(flat))
+    assert_lines_close(stochastic_oscillator_array(flat, flat, flat), expected)
+
+
+# Series with a missing price at the start, inside the first window, in the
+# middle and at the end
+GAPS = [0, 10, 40, 79]
+
+
+def with_gap(position):
+    prices = random_walk(80, seed=12)
+    prices[position] = np.nan
+    return prices
+
+
+@pytest.mark.parametrize("position", GAPS)
+@pytest.mark.parametrize("period", [1, 5, 20])
+def test_moving_average_missing_price_only_affects_its_windows(position, period):
+    prices = with_gap(position)
+    result = moving_average_array(prices, period)
+    assert_close(result, ref_moving_average(list(prices), period))
+    assert np.isnan(result[position:position + period]).all()
+    assert not np.isnan(result[position + period:]).any()
+
+
+@pytest.mark.parametrize("position", GAPS)
+def test_missing_price_matches_list_implementations(position):
+    prices = with_gap(position)
+    assert_close(exponential_moving_average_array(prices, 20), ref_exponential_moving_average(list(prices), 20))
+    assert_close(relative_strength_index_array(prices, 14), ref_relative_strength_index(list(prices), 14))
+    assert_lines_close(macd_array(prices), ref_macd(list(prices)))
+    assert_lines_close(bollinger_bands_array(prices), ref_bollinger_bands(list(prices)))
+
+
+def test_indicators_table_covers_list_wrappers():
+    # Every registered indicator has a list wrapper tested above
+    assert set(INDICATORS) == {"sma", "ema", "rsi", "macd", "bollinger", "stochastic"}
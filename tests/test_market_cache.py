@@ -0,0 +1,167 @@
+"""Market metadata shared by the exchange clients"""
+import json
+import threading
+import time
+
+import ccxt
+import pytest
+
+import coinex_api
+from coinex_api import PRIORITY_BACKGROUND
+from fake_exchange import FakeExchange, FakeMarket
+from market_cache import MarketCache
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+class Downloads:
+    """Replaces ccxt.coinex for MarketCache.refresh and counts market downloads"""
+
+    def __init__(self, market):
+        self.market = market
+        self.count = 0
+        self.release = threading.Event()
+        self.release.set()
+        self.fail = False
+
+    def __call__(self, config=None):
+        downloads = self
+
+        class CountingExchange(FakeExchange):
+            def load_markets(self, reload=False, params=None):
+                downloads.count += 1
+                downloads.release.wait(5)
+                if downloads.fail:
+                    raise ccxt.NetworkError("fake exchange: down")
+                return super().load_markets(reload, params)
+
+        return CountingExchange(config, self.market)
+
+
+class RecordingLimiter:
+    def __init__(self):
+        self.acquired = []
+
+    def acquire(self, weight=1, priority=None, timeout=None):
+        self.acquired.append((weight, priority))
+        return 0.0
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    downloads = Downloads(FakeMarket(symbols=['BTC/USDT', 'ETH/USDT']))
+    monkeypatch.setattr(ccxt, 'coinex', downloads)
+    return downloads
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = RecordingLimiter()
+    monkeypatch.setattr(coinex_api, 'rate_limiter', limiter)
+    return limiter
+
+
+@pytest.fixture
+def make_cache(tmp_path, downloads, limiter):
+    caches = []
+
+    def make(refresh_interval=3600.0):
+        cache = MarketCache(str(tmp_path / 'markets.json'), refresh_interval)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.stop()
+
+
+def test_cold_start_downloads_once_and_saves_a_snapshot(make_cache, downloads, limiter, tmp_path):
+    cache = make_cache()
+    assert set(cache.get_markets()) == {'BTC/USDT', 'ETH/USDT'}
+    assert set(cache.get_markets()) == {'BTC/USDT', 'ETH/USDT'}
+    assert downloads.count == 1
+    assert limiter.acquired == [(5, PRIORITY_BACKGROUND)]
+
+    snapshot = json.loads((tmp_path / 'markets.json').read_text())
+    assert set(snapshot['markets']) == {'BTC/USDT', 'ETH/USDT'}
+    assert snapshot['loaded_at'] == cache.loaded_at
+
+
+def test_restart_starts_from_the_snapshot(make_cache, downloads):
+    make_cache().get_markets()
+    restarted = make_cache()
+    assert set(restarted.get_markets()) == {'BTC/USDT', 'ETH/USDT'}
+    assert downloads.count == 1
+
+
+def test_unreadable_snapshot_falls_back_to_a_download(make_cache, downloads, tmp_path):
+    (tmp_path / 'markets.json').write_text('{not json')
+    assert set(make_cache().get_markets()) == {'BTC/USDT', 'ETH/USDT'}
+    assert downloads.count == 1
+
+
+def test_concurrent_cold_starts_share_one_download(make_cache, downloads):
+    cache = make_cache()
+    downloads.release.clear()
+    results = []
+    readers = [threading.Thread(target=lambda: results.append(cache.get_markets())) for _ in range(10)]
+    for reader in readers:
+        reader.start()
+    wait_for(lambda: downloads.count == 1)
+    downloads.release.set()
+    for reader in readers:
+        reader.join(5)
+
+    assert downloads.count == 1
+    assert len(results) == 10 and all(set(markets) == {'BTC/USDT', 'ETH/USDT'} for markets in results)
+
+
+def test_attach_is_not_blocked_by_a_download(make_cache, downloads):
+    cache = make_cache()
+    downloads.release.clear()
+    reader = threading.Thread(target=cache.get_markets)
+    reader.start()
+    wait_for(lambda: downloads.count == 1)
+
+    exchange = FakeExchange()
+    started = time.monotonic()
+    cache.attach(exchange)
+    assert time.monotonic() - started < 1.0
+    assert exchange.markets is None
+
+    downloads.release.set()
+    reader.join(5)
+    # The download is pushed to exchanges attached meanwhile
+    assert set(exchange.markets) == {'BTC/USDT', 'ETH/USDT'}
+
+
+def test_attached_exchanges_receive_the_markets(make_cache):
+    cache = make_cache()
+    cache.get_markets()
+    exchange = FakeExchange()
+    cache.attach(exchange)
+    assert exchange.markets == cache.markets
+    assert exchange.requests == 0
+
+
+def test_background_refresh_updates_attached_exchanges(make_cache, downloads):
+    cache = make_cache(refresh_interval=0.1)
+    exchange = FakeExchange()
+    cache.attach(exchange)
+    wait_for(lambda: downloads.count >= 2)
+    assert set(exchange.markets) == {'BTC/USDT', 'ETH/USDT'}
+    assert exchange.requests == 0
+
+
+def test_failed_refresh_keeps_the_markets(make_cache, downloads):
+    cache = make_cache()
+    markets = cache.get_markets()
+    downloads.fail = True
+    with pytest.raises(ccxt.NetworkError):
+        cache.refresh()
+    assert cache.get_markets() == markets
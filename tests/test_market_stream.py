@@ -0,0 +1,175 @@
+"""WebSocket market data stream, against the fake CoinEx WebSocket server"""
+import threading
+import time
+
+import pytest
+
+from coinex_api import MarketDataStream
+from fake_coinex_ws import FakeCoinExWebSocketServer
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def state(market, last, open_price=100.0):
+    return {'market': market, 'last': str(last), 'open': str(open_price), 'close': str(last),
+            'high': str(max(last, open_price)), 'low': str(min(last, open_price)),
+            'volume': '10', 'value': '1000'}
+
+
+def deals(market, *deals):
+    return {'method': 'deals.update', 'data': {'market': market, 'deal_list': [
+        {'deal_id': i, 'created_at': created_at, 'price': str(price), 'amount': str(amount), 'side': 'buy'}
+        for i, (created_at, price, amount) in enumerate(deals)
+    ]}}
+
+
+@pytest.fixture
+def stream():
+    """Stream fed by calling _handle directly, as if it were connected"""
+    stream = MarketDataStream(url='', max_age=30.0)
+    stream.watch(['BTC/USDT', 'ETH/USDT'])
+    stream.connected = True
+    return stream
+
+
+@pytest.fixture
+def server():
+    server = FakeCoinExWebSocketServer(port=0, rate=20)
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_streaming_is_off_unless_configured(monkeypatch):
+    monkeypatch.delenv('COINEX_WS_URL', raising=False)
+    stream = MarketDataStream()
+    stream.watch(['BTC/USDT'])
+    assert stream._thread is None
+
+    fetched = []
+    tickers = stream.get_tickers(['BTC/USDT'], fallback=lambda symbols: fetched.append(symbols) or
+                                 {symbol: {'last': 1.0} for symbol in symbols})
+    assert tickers == {'BTC/USDT': {'last': 1.0}}
+    assert fetched == [['BTC/USDT']]
+
+
+def test_configured_url_enables_streaming(monkeypatch):
+    monkeypatch.setenv('COINEX_WS_URL', 'ws://127.0.0.1:1/v2/spot')
+    assert MarketDataStream().url == 'ws://127.0.0.1:1/v2/spot'
+
+
+def test_ticker_updates_are_served_while_fresh(stream):
+    stream._handle({'method': 'state.update', 'data': {'state_list': [state('BTCUSDT', 110.0)]}})
+    ticker = stream.get_ticker('BTC/USDT')
+    assert ticker['last'] == 110.0
+    assert ticker['percentage'] == pytest.approx(10.0)
+    assert stream.get_ticker('ETH/USDT') is None
+
+    tickers = stream.get_tickers(['BTC/USDT', 'ETH/USDT'], fallback=lambda symbols: {s: {'last': 1.0} for s in symbols})
+    assert tickers['BTC/USDT']['last'] == 110.0
+    assert tickers['ETH/USDT'] == {'last': 1.0}
+
+
+def test_stale_or_disconnected_data_is_not_served(stream):
+    stream.max_age = 0.05
+    stream._handle({'method': 'state.update', 'data': {'state_list': [state('BTCUSDT', 110.0)]}})
+    assert stream.is_fresh('BTC/USDT')
+    # Channels go stale on their own
+    assert not stream.is_fresh('BTC/USDT', 'depth')
+    time.sleep(0.1)
+    assert not stream.is_fresh('BTC/USDT')
+    assert stream.get_ticker('BTC/USDT') is None
+
+    stream.max_age = 30.0
+    stream.connected = False
+    assert stream.get_ticker('BTC/USDT') is None
+
+
+def test_is_fresh_reads_under_the_lock(stream):
+    results = []
+    with stream._lock:
+        reader = threading.Thread(target=lambda: results.append(stream.is_fresh('BTC/USDT')))
+        reader.start()
+        reader.join(0.1)
+        assert reader.is_alive()
+    reader.join(5)
+    assert results == [False]
+
+
+def test_order_book_applies_incremental_updates(stream):
+    stream._handle({'method': 'depth.update', 'data': {'market': 'BTCUSDT', 'is_full': True, 'depth': {
+        'bids': [['99', '1'], ['98', '2']], 'asks': [['101', '1'], ['102', '2']], 'updated_at': 1}}})
+    stream._handle({'method': 'depth.update', 'data': {'market': 'BTCUSDT', 'is_full': False, 'depth': {
+        'bids': [['99', '0'], ['97', '3']], 'asks': [['101', '5']], 'updated_at': 2}}})
+
+    book = stream.get_order_book('BTC/USDT')
+    assert book['bids'] == [(98.0, 2.0), (97.0, 3.0)]
+    assert book['asks'] == [(101.0, 5.0), (102.0, 2.0)]
+    assert book['timestamp'] == 2
+
+
+def test_deals_build_klines_and_notify_closed_ones(stream):
+    updates = []
+    stream.subscribe(lambda channel, symbol, data: updates.append((channel, symbol, data)))
+
+    # Pushed newest first
+    stream._handle(deals('BTCUSDT', (61_000, 12.0, 1.0), (60_500, 8.0, 2.0), (60_000, 10.0, 1.0)))
+    assert stream.get_kline('BTC/USDT') == [60_000, 10.0, 12.0, 8.0, 12.0, 4.0]
+
+    stream._handle(deals('BTCUSDT', (120_000, 11.0, 1.0)))
+    assert stream.get_kline('BTC/USDT') == [120_000, 11.0, 11.0, 11.0, 11.0, 1.0]
+    closed = [data for channel, _, data in updates if channel == 'kline' and data['closed']]
+    assert closed == [{'timeframe': '1m', 'kline': [60_000, 10.0, 12.0, 8.0, 12.0, 4.0], 'closed': True}]
+    assert {channel for channel, _, _ in updates} == {'trades', 'kline'}
+
+
+def test_failing_subscriber_does_not_stop_the_others(stream):
+    received = []
+
+    def failing(channel, symbol, data):
+        raise RuntimeError("subscriber bug")
+
+    stream.subscribe(failing)
+    stream.subscribe(lambda channel, symbol, data: received.append(symbol))
+    stream._handle({'method': 'state.update', 'data': {'state_list': [state('BTCUSDT', 110.0)]}})
+    assert received == ['BTC/USDT']
+
+    stream.unsubscribe(failing)
+    assert failing not in stream._subscribers
+
+
+def test_live_stream_from_the_fake_server(server):
+    stream = MarketDataStream(url=server.url)
+    channels = set()
+    stream.subscribe(lambda channel, symbol, data: channels.add(channel))
+    try:
+        stream.watch(['BTC/USDT'])
+        wait_for(lambda: stream.get_ticker('BTC/USDT') and stream.get_order_book('BTC/USDT'))
+        # Symbols watched later are subscribed on the open connection
+        stream.watch(['ETH/USDT'])
+        wait_for(lambda: stream.get_ticker('ETH/USDT'))
+        assert channels == {'ticker', 'depth', 'trades', 'kline'}
+        assert stream.stats()['connected']
+    finally:
+        stream.stop()
+    assert not stream._thread.is_alive()
+    assert not stream.connected
+
+
+def test_stop_interrupts_the_reconnect_backoff():
+    # Nothing listens on port 1, so every connection attempt fails
+    stream = MarketDataStream(url='ws://127.0.0.1:1/v2/spot')
+    stream.watch(['BTC/USDT'])
+    try:
+        # After the second failure the stream backs off for two seconds
+        wait_for(lambda: stream.reconnects >= 2)
+    finally:
+        started = time.monotonic()
+        stream.stop()
+    assert time.monotonic() - started < 1.0
+    assert not stream._thread.is_alive()
@@ -0,0 +1,147 @@
+"""Priority token-bucket rate limiter"""
+import threading
+import time
+
+import ccxt
+import pytest
+
+from coinex_api import PRIORITY_BACKGROUND, PRIORITY_BOT, PRIORITY_ORDER, PRIORITY_UI, RateLimiter
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+def queued(limiter):
+    return sum(limiter.stats()['queued'].values())
+
+
+def test_burst_is_granted_without_waiting():
+    limiter = RateLimiter(rate=10, capacity=5)
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    assert time.monotonic() - started < 0.05
+
+    # The bucket is empty, so the next request waits for one token
+    assert limiter.acquire() == pytest.approx(0.1, abs=0.05)
+
+
+def test_weight_is_capped_at_the_capacity():
+    limiter = RateLimiter(rate=100, capacity=2)
+    assert limiter.acquire(weight=10) < 0.05
+
+
+def test_orders_are_served_before_earlier_requests():
+    limiter = RateLimiter(rate=20, capacity=1)
+    limiter.acquire()
+    order = []
+
+    def request(name, priority):
+        limiter.acquire(priority=priority)
+        order.append(name)
+
+    threads = [threading.Thread(target=request, args=('ui', PRIORITY_UI)),
+               threading.Thread(target=request, args=('bot', PRIORITY_BOT)),
+               threading.Thread(target=request, args=('order', PRIORITY_ORDER))]
+    for count, thread in enumerate(threads, 1):
+        thread.start()
+        wait_for(lambda: queued(limiter) == count)
+    for thread in threads:
+        thread.join(5)
+    assert order == ['order', 'bot', 'ui']
+
+
+def test_timeout_raises_and_leaves_the_queue():
+    limiter = RateLimiter(rate=1, capacity=1)
+    limiter.acquire()
+
+    started = time.monotonic()
+    with pytest.raises(ccxt.RateLimitExceeded):
+        limiter.acquire(priority=PRIORITY_UI, timeout=0.1)
+    assert time.monotonic() - started == pytest.approx(0.1, abs=0.1)
+
+    stats = limiter.stats()
+    assert stats['queued']['ui'] == 0
+    assert stats['timed_out']['ui'] == 1
+    assert stats['granted']['ui'] == 1
+
+
+def test_timed_out_head_hands_over_to_the_next_request():
+    limiter = RateLimiter(rate=5, capacity=1)
+    limiter.acquire()
+    results = {}
+
+    def request(name, priority, timeout):
+        try:
+            results[name] = limiter.acquire(priority=priority, timeout=timeout)
+        except ccxt.RateLimitExceeded as e:
+            results[name] = e
+
+    # The order is at the head and gives up; the UI request behind it must
+    # still get the next token instead of waiting for a notification
+    order = threading.Thread(target=request, args=('order', PRIORITY_ORDER, 0.05))
+    order.start()
+    wait_for(lambda: queued(limiter) == 1)
+    ui = threading.Thread(target=request, args=('ui', PRIORITY_UI, 2))
+    ui.start()
+    order.join(5)
+    ui.join(5)
+    assert isinstance(results['order'], ccxt.RateLimitExceeded)
+    assert results['ui'] < 0.5
+
+
+def test_no_timeout_waits_as_long_as_needed():
+    limiter = RateLimiter(rate=10, capacity=1)
+    limiter.acquire()
+    assert limiter.acquire(timeout=None) > 0.05
+
+
+def hammer(limiter, priority, stop, threads=3):
+    """Keep several requests of the given priority queued until stop is set"""
+    def run():
+        while not stop.is_set():
+            limiter.acquire(priority=priority, timeout=5)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+@pytest.mark.parametrize("aging,admitted", [(0.1, True), (1e9, False)])
+def test_background_requests_age_past_sustained_bot_load(aging, admitted):
+    limiter = RateLimiter(rate=50, capacity=1, aging=aging)
+    stop = threading.Event()
+    workers = hammer(limiter, PRIORITY_BOT, stop)
+    try:
+        wait_for(lambda: limiter.stats()['granted']['bot'] >= 5)
+        if admitted:
+            assert limiter.acquire(priority=PRIORITY_BACKGROUND, timeout=2) < 2
+        else:
+            # Without aging the background request starves
+            with pytest.raises(ccxt.RateLimitExceeded):
+                limiter.acquire(priority=PRIORITY_BACKGROUND, timeout=0.5)
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join(5)
+
+
+def test_aged_requests_never_overtake_orders():
+    limiter = RateLimiter(aging=0.1)
+    now = time.monotonic()
+    background = (PRIORITY_BACKGROUND, 0, now - 100)
+    bot = (PRIORITY_BOT, 1, now)
+    order = (PRIORITY_ORDER, 2, now)
+
+    limiter._queue = [background, bot, order]
+    assert limiter._head(now) == order
+    # Aged to bot priority, the older background request goes first
+    limiter._queue = [background, bot]
+    assert limiter._head(now) == background
+    limiter._queue = [(PRIORITY_BACKGROUND, 0, now), bot]
+    assert limiter._head(now) == bot
@@ -0,0 +1,173 @@
+"""Higher timeframe candles derived from base timeframe candles"""
+import numpy as np
+import pytest
+
+from candles import PRICE_COLUMNS, Candles
+from resampling import DAY_MS, TimeframeResampler, can_resample, resample_candles, timeframe_to_ms
+
+HOUR_MS = 3_600_000
+
+
+def base_candles(count, start_hour=0, seed=0):
+    """Random 1h candles starting at the given hour since the epoch"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    open_ = np.r_[100.0, close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, count))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, count))
+    timestamp = (start_hour + np.arange(count, dtype=np.int64)) * HOUR_MS
+    return Candles(timestamp, open_, high, low, close, rng.uniform(1, 10, count))
+
+
+def reference(candles, timeframe_ms):
+    """Bucket candles one dictionary at a time"""
+    buckets = {}
+    for candle in candles:
+        start = candle["timestamp"] - candle["timestamp"] % timeframe_ms
+        bucket = buckets.get(start)
+        if bucket is None:
+            buckets[start] = dict(candle, timestamp=start)
+        else:
+            bucket["high"] = max(bucket["high"], candle["high"])
+            bucket["low"] = min(bucket["low"], candle["low"])
+            bucket["close"] = candle["close"]
+            bucket["volume"] += candle["volume"]
+    return [buckets[start] for start in sorted(buckets)]
+
+
+def rows(candles):
+    return [[candle["timestamp"]] + [candle[name] for name in PRICE_COLUMNS] for candle in candles]
+
+
+def assert_same(actual, expected):
+    assert len(actual) == len(expected)
+    np.testing.assert_allclose(np.array(rows(actual), dtype=float).reshape(len(actual), 6),
+                               np.array(rows(expected), dtype=float).reshape(len(expected), 6))
+
+
+@pytest.mark.parametrize("base,target,expected", [
+    ("1h", "4h", True),
+    ("1h", "1d", True),
+    ("15m", "1h", True),
+    ("1h", "1h", False),
+    ("4h", "1h", False),
+    ("1h", "90m", False),
+    ("1h", "5h", False),
+    ("1h", "1w", False),
+    ("1h", "1M", False),
+    ("1h", "nonsense", False),
+])
+def test_can_resample(base, target, expected):
+    assert can_resample(base, target) is expected
+
+
+def test_timeframe_to_ms():
+    assert timeframe_to_ms("1m") == 60_000
+    assert timeframe_to_ms("4h") == 4 * HOUR_MS
+    assert timeframe_to_ms("1d") == DAY_MS
+
+
+@pytest.mark.parametrize("timeframe", ["2h", "4h", "1d"])
+@pytest.mark.parametrize("start_hour", [0, 3])
+def test_resample_candles_matches_reference(timeframe, start_hour):
+    base = base_candles(100, start_hour)
+    timeframe_ms = timeframe_to_ms(timeframe)
+    # The leading bucket is dropped when the first base candle is not at its start
+    aligned = [candle for candle in base if candle["timestamp"] >= -(-base.timestamp[0] // timeframe_ms) * timeframe_ms]
+
+    assert_same(resample_candles(base, "1h", timeframe), reference(aligned, timeframe_ms))
+
+
+def test_resample_candles_can_drop_the_forming_bucket():
+    base = base_candles(10)
+    assert resample_candles(base, "1h", "4h").timestamp.tolist() == [0, 4 * HOUR_MS, 8 * HOUR_MS]
+    assert resample_candles(base, "1h", "4h", include_partial=False).timestamp.tolist() == [0, 4 * HOUR_MS]
+    assert len(resample_candles(base_candles(12), "1h", "4h", include_partial=False)) == 3
+    assert len(resample_candles(Candles(), "1h", "4h")) == 0
+
+
+def test_resampler_rejects_timeframes_it_cannot_derive():
+    with pytest.raises(ValueError):
+        TimeframeResampler("1h", "1w")
+
+
+def test_incremental_updates_match_full_resample():
+    history = base_candles(300, start_hour=1)
+    resampler = TimeframeResampler("1h", "4h")
+    for end in range(5, len(history) + 1):
+        # Each update overlaps the previous one, like a sync of the store
+        resampler.update(history[max(0, end - 24):end])
+        expected = resample_candles(history[:end], "1h", "4h")
+        assert_same(resampler.read(len(expected)), expected)
+
+
+def test_revised_forming_candle_is_picked_up():
+    history = base_candles(10)
+    resampler = TimeframeResampler("1h", "4h")
+    resampler.update(history)
+    assert resampler.partial
+
+    revised = history[:]
+    revised.truncate(9)
+    revised.append(9 * HOUR_MS, 1.0, 500.0, 0.5, 2.0, 1.0)
+    resampler.update(revised[-3:])
+
+    last = resampler.read(1)[0]
+    assert last["high"] == 500.0
+    assert last["close"] == 2.0
+    assert_same(resampler.read(3), resample_candles(revised, "1h", "4h"))
+
+
+def test_update_without_overlap_starts_over():
+    resampler = TimeframeResampler("1h", "4h")
+    resampler.update(base_candles(20))
+    resampler.update(base_candles(20, start_hour=100))
+    assert resampler.read(10).timestamp[0] == 100 * HOUR_MS
+    assert len(resampler) == 5
+
+
+def test_views_from_read_survive_updates():
+    history = base_candles(40)
+    resampler = TimeframeResampler("1h", "4h")
+    resampler.update(history[:30])
+    view = resampler.read(8)
+    before = rows(view)
+
+    for end in range(31, 41):
+        resampler.update(history[end - 5:end])
+    assert rows(view) == before
+
+
+def test_last_bucket_is_replaced_in_place_without_views():
+    history = base_candles(40)
+    resampler = TimeframeResampler("1h", "4h")
+    resampler.update(history[:30])
+    buffer = resampler.candles.close
+
+    # Revise the forming 1h candle of the same bucket: no view was read, so
+    # the buffers are reused instead of being copied
+    resampler.update(history[26:31])
+    assert np.shares_memory(resampler.candles.close, buffer)
+
+    resampler.read(3)
+    resampler.update(history[26:31])
+    assert not np.shares_memory(resampler.candles.close, buffer)
+
+
+def test_retained_candles_are_capped_by_the_largest_limit():
+    history = base_candles(2400)
+    resampler = TimeframeResampler("1h", "4h")
+    for end in range(4, 2001, 3):
+        resampler.update(history[max(0, end - 12):end], limit=10)
+        assert len(resampler) <= 20
+        expected = resample_candles(history[:end], "1h", "4h")[-10:]
+        assert_same(resampler.read(10), expected)
+
+    # A larger limit raises the cap; the caller rebuilds from enough base
+    # candles, and smaller limits afterwards do not lower it again
+    resampler.reset()
+    resampler.update(history[:2000], limit=100)
+    for end in range(2001, len(history) + 1, 4):
+        resampler.update(history[end - 12:end], limit=10)
+        assert 100 <= len(resampler) <= 200
+    assert_same(resampler.read(100), resample_candles(history[:end], "1h", "4h")[-100:])
@@ -0,0 +1,105 @@
+"""Candle close scheduling"""
+import pytest
+
+from scheduler import CandleCloseScheduler, can_schedule
+
+# An hour boundary, in seconds
+HOUR = 1_699_999_200.0
+
+
+@pytest.fixture
+def scheduler():
+    return CandleCloseScheduler(grace=2.0, retry_delay=10.0)
+
+
+@pytest.mark.parametrize("timeframe,expected", [
+    ('1m', True), ('5m', True), ('1h', True), ('4h', True), ('1d', True),
+    ('7m', False), ('5h', False), ('3d', False), ('1w', False), ('1M', False), ('nope', False),
+])
+def test_can_schedule_timeframes_that_divide_a_day(timeframe, expected):
+    assert can_schedule(timeframe) == expected
+
+
+def test_next_and_last_close(scheduler):
+    assert scheduler.next_close('1h', HOUR) == HOUR + 3600
+    assert scheduler.next_close('1h', HOUR + 1800) == HOUR + 3600
+    assert scheduler.next_close('5m', HOUR + 299.5) == HOUR + 300
+    assert scheduler.last_close('1h', HOUR + 1800) == HOUR
+    assert scheduler.last_close('1h', HOUR) == HOUR
+
+
+@pytest.mark.parametrize("timeframe", ['1w', '1M', '3d'])
+def test_longer_timeframes_are_rejected(scheduler, timeframe):
+    with pytest.raises(ValueError):
+        scheduler.next_close(timeframe, HOUR)
+    with pytest.raises(ValueError):
+        scheduler.last_close(timeframe, HOUR)
+    with pytest.raises(ValueError):
+        scheduler.sync([('BTC/USDT', '1h'), ('BTC/USDT', timeframe)], HOUR)
+    # A rejected sync leaves the schedule as it was
+    assert len(scheduler) == 0
+
+
+def test_new_keys_are_due_immediately(scheduler):
+    added = scheduler.sync([('ETH/USDT', '1h'), ('BTC/USDT', '1h')], HOUR + 10)
+    assert added == [('BTC/USDT', '1h'), ('ETH/USDT', '1h')]
+    assert scheduler.next_due() == HOUR + 10
+    assert scheduler.pop_due(HOUR + 10) == [('BTC/USDT', '1h'), ('ETH/USDT', '1h')]
+
+    # Then they are due a grace delay after the next close
+    assert scheduler.pop_due(HOUR + 3601) == []
+    assert scheduler.next_due() == HOUR + 3602
+    assert scheduler.pop_due(HOUR + 3602) == [('BTC/USDT', '1h'), ('ETH/USDT', '1h')]
+
+
+def test_sync_only_adds_new_keys_and_drops_removed_ones(scheduler):
+    scheduler.sync([('BTC/USDT', '1h'), ('ETH/USDT', '5m')], HOUR)
+    scheduler.pop_due(HOUR)
+
+    assert scheduler.sync([('BTC/USDT', '1h'), ('XRP/USDT', '1h')], HOUR + 1) == [('XRP/USDT', '1h')]
+    assert len(scheduler) == 2
+    # The removed 5m key was due first; its heap entry is dropped lazily
+    assert scheduler.next_due() == HOUR + 1
+    assert scheduler.pop_due(HOUR + 1000) == [('XRP/USDT', '1h')]
+    assert scheduler.next_due() == HOUR + 3602
+
+
+def test_keys_of_different_timeframes_fire_separately(scheduler):
+    scheduler.sync([('BTC/USDT', '1h'), ('BTC/USDT', '5m')], HOUR)
+    scheduler.pop_due(HOUR)
+    assert scheduler.pop_due(HOUR + 302) == [('BTC/USDT', '5m')]
+    assert scheduler.pop_due(HOUR + 3602) == [('BTC/USDT', '1h'), ('BTC/USDT', '5m')]
+
+
+def test_retry_makes_a_key_due_after_the_retry_delay(scheduler):
+    scheduler.sync([('BTC/USDT', '1h'), ('ETH/USDT', '1h')], HOUR)
+    scheduler.pop_due(HOUR + 5)
+    scheduler.retry([('ETH/USDT', '1h')], HOUR + 5)
+
+    assert scheduler.next_due() == HOUR + 15
+    assert scheduler.pop_due(HOUR + 15) == [('ETH/USDT', '1h')]
+    assert scheduler.next_due() == HOUR + 3602
+
+
+def test_retry_never_moves_a_key_past_its_next_close(scheduler):
+    scheduler.sync([('BTC/USDT', '1m')], HOUR)
+    scheduler.pop_due(HOUR + 55)
+    # The next close is due at HOUR + 62, before the retry delay runs out
+    scheduler.retry([('BTC/USDT', '1m')], HOUR + 55)
+    assert scheduler.next_due() == HOUR + 62
+
+
+def test_retry_ignores_unscheduled_keys(scheduler):
+    scheduler.sync([('BTC/USDT', '1h')], HOUR)
+    scheduler.pop_due(HOUR)
+    scheduler.retry([('ETH/USDT', '1h')], HOUR)
+    assert len(scheduler) == 1
+    assert scheduler.next_due() == HOUR + 3602
+
+
+def test_nothing_scheduled(scheduler):
+    assert scheduler.next_due() is None
+    assert scheduler.pop_due(HOUR) == []
+    scheduler.sync([('BTC/USDT', '1h')], HOUR)
+    scheduler.sync([], HOUR)
+    assert scheduler.next_due() is None
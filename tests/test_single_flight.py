@@ -0,0 +1,125 @@
+"""Coalescing of concurrent identical calls"""
+import threading
+import time
+
+import pytest
+
+from candles import Candles
+from coinex_api import SingleFlight
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+class BlockingCall:
+    """Function that blocks until released and counts its calls"""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def run_concurrently(flight, key, fn, followers=5):
+    """Start a leader and followers on one key; returns (results, errors) per caller once fn is released"""
+    results, errors = [None] * (followers + 1), [None] * (followers + 1)
+
+    def call(index):
+        try:
+            results[index] = flight.do(key, fn)
+        except BaseException as e:
+            errors[index] = e
+
+    threads = [threading.Thread(target=call, args=(0,))]
+    threads[0].start()
+    wait_for(lambda: flight.stats()['in_flight'] == 1)
+    coalesced = flight.coalesced
+    for index in range(1, followers + 1):
+        threads.append(threading.Thread(target=call, args=(index,)))
+        threads[-1].start()
+    wait_for(lambda: flight.coalesced == coalesced + followers)
+
+    fn.release.set()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+
+def test_concurrent_calls_run_once():
+    flight = SingleFlight()
+    fn = BlockingCall({'last': 1.0})
+    results, errors = run_concurrently(flight, ('ticker', 'BTC/USDT'), fn)
+
+    assert fn.calls == 1
+    assert errors == [None] * 6
+    assert all(result == {'last': 1.0} for result in results)
+    assert flight.stats() == {'executed': 1, 'coalesced': 5, 'in_flight': 0}
+
+
+def test_coalesced_callers_get_their_own_copy():
+    flight = SingleFlight()
+    fn = BlockingCall({'last': 1.0})
+    results, _ = run_concurrently(flight, ('ticker', 'BTC/USDT'), fn)
+
+    assert results[0] is fn.result
+    assert len({id(result) for result in results}) == len(results)
+    results[1]['extra'] = True
+    assert 'extra' not in results[0] and 'extra' not in results[2]
+
+
+def test_coalesced_candles_can_be_appended_to():
+    flight = SingleFlight()
+    fn = BlockingCall(Candles([0, 60_000], [1, 2], [1, 2], [1, 2], [1, 2], [1, 1]))
+    results, _ = run_concurrently(flight, ('ohlcv', 'BTC/USDT', '1m', 2), fn, followers=2)
+
+    results[1].append(120_000, 3, 3, 3, 3, 1)
+    assert len(results[1]) == 3
+    assert len(results[0]) == 2 and len(results[2]) == 2
+
+
+def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+    assert flight.do(('a',), lambda: 1) == 1
+    assert flight.do(('b',), lambda: 2) == 2
+    assert flight.stats() == {'executed': 2, 'coalesced': 0, 'in_flight': 0}
+
+
+def test_errors_reach_every_caller_and_release_the_key():
+    flight = SingleFlight()
+    error = ValueError("exchange down")
+    results, errors = run_concurrently(flight, ('ticker', 'BTC/USDT'), BlockingCall(error=error))
+
+    assert results == [None] * 6
+    assert all(e is error for e in errors)
+    assert flight.do(('ticker', 'BTC/USDT'), lambda: 'retried') == 'retried'
+
+
+def test_interrupted_call_is_not_taken_for_a_none_result():
+    flight = SingleFlight()
+    results, errors = run_concurrently(flight, ('ticker', 'BTC/USDT'), BlockingCall(error=KeyboardInterrupt()))
+
+    assert isinstance(errors[0], KeyboardInterrupt)
+    assert all(isinstance(e, RuntimeError) for e in errors[1:])
+    assert flight.stats()['in_flight'] == 0
+    assert flight.do(('ticker', 'BTC/USDT'), lambda: 'retried') == 'retried'
+
+
+def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight()
+    fn = BlockingCall('result')
+    fn.release.set()
+    for _ in range(3):
+        assert flight.do(('key',), fn) == 'result'
+    assert fn.calls == 3
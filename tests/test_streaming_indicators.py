@@ -0,0 +1,96 @@
+"""Streaming indicators against the list implementations, and their snapshots"""
+import json
+
+import numpy as np
+import pytest
+
+from indicator_reference import (
+    SERIES, assert_close, assert_lines_close, random_candles, random_walk, ref_bollinger_bands,
+    ref_exponential_moving_average, ref_macd, ref_moving_average, ref_relative_strength_index,
+    ref_stochastic_oscillator
+)
+from streaming_indicators import (
+    StreamingBollingerBands, StreamingEMA, StreamingMACD, StreamingRSI, StreamingSMA, StreamingStochastic
+)
+
+
+def stream(indicator, *columns):
+    """Feed prices one at a time, returning the value after each update"""
+    values = []
+    for prices in zip(*columns):
+        value = indicator.update(*(float(price) for price in prices))
+        values.append(dict(value) if isinstance(value, dict) else value)
+    return values
+
+
+def lines(values, keys):
+    return {key: [value[key] for value in values] for key in keys}
+
+
+@pytest.mark.parametrize("name", ["random_300", "flat", "step", "large_prices"])
+def test_streaming_matches_batch(name):
+    prices = SERIES[name]
+    high, low, close = random_candles(len(prices), seed=7)
+
+    assert_close(stream(StreamingSMA(20), prices), ref_moving_average(list(prices), 20))
+    assert_close(stream(StreamingEMA(20), prices), ref_exponential_moving_average(list(prices), 20))
+
+    # The streaming RSI including price i is stored at index i - 1 by the batch
+    # function, which also leaves out the value at the seed average
+    rsi = np.asarray(stream(StreamingRSI(14), prices))[1:]
+    expected_rsi = np.asarray(ref_relative_strength_index(list(prices), 14))[:-1]
+    defined = ~np.isnan(expected_rsi)
+    assert defined.any()
+    assert_close(rsi[defined], expected_rsi[defined])
+
+    # The batch MACD line starts later; compare where both are defined
+    expected = ref_macd(list(prices))
+    streamed = lines(stream(StreamingMACD(), prices), ("macd", "signal", "histogram"))
+    defined = ~np.isnan(np.asarray(expected["macd"]))
+    for line in expected:
+        assert_close(np.asarray(streamed[line])[defined], np.asarray(expected[line])[defined])
+
+    bands = lines(stream(StreamingBollingerBands(20, 2.0), prices), ("upper", "middle", "lower"))
+    assert_lines_close(bands, ref_bollinger_bands(list(prices), 20, 2.0))
+
+    stochastic = lines(stream(StreamingStochastic(14, 3), high, low, close), ("k", "d"))
+    assert_lines_close(stochastic, ref_stochastic_oscillator(list(high), list(low), list(close)))
+
+
+@pytest.mark.parametrize("factory,columns", [
+    (lambda: StreamingSMA(20), 1),
+    (lambda: StreamingEMA(20), 1),
+    (lambda: StreamingRSI(14), 1),
+    (lambda: StreamingMACD(), 1),
+    (lambda: StreamingBollingerBands(20, 2.0), 1),
+    (lambda: StreamingStochastic(14, 3), 3),
+])
+@pytest.mark.parametrize("split", [0, 10, 37, 150])
+def test_streaming_snapshot_restore(factory, columns, split):
+    high, low, close = random_candles(300, seed=11)
+    data = (high, low, close) if columns == 3 else (close,)
+
+    uninterrupted = stream(factory(), *data)
+
+    first = factory()
+    head = stream(first, *(column[:split] for column in data))
+    # Snapshots are stored as JSON
+    state = json.loads(json.dumps(first.snapshot()))
+    second = factory()
+    second.restore(state)
+    tail = stream(second, *(column[split:] for column in data))
+
+    resumed = head + tail
+    if isinstance(uninterrupted[0], dict):
+        keys = tuple(uninterrupted[0])
+        assert_lines_close(lines(resumed, keys), lines(uninterrupted, keys))
+    else:
+        assert_close(resumed, uninterrupted)
+
+
+def test_streaming_sma_does_not_drift_over_long_runs():
+    prices = random_walk(20000, seed=13, start=60000.0)
+    streamed = np.asarray(stream(StreamingSMA(20), prices))
+    expected = np.asarray(ref_moving_average(list(prices[-100:]), 20))
+    assert_close(streamed[-81:], expected[-81:])
+
@@ -0,0 +1,147 @@
+"""Background-refreshed ticker snapshot"""
+import threading
+import time
+
+import pytest
+
+import ticker_snapshot
+from ticker_snapshot import TickerSnapshot
+
+
+class FakeClock:
+    """Stand-in for the time module with a settable time"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+class RecordingFetch:
+    """fetch_tickers stand-in that records the symbols of each call"""
+
+    def __init__(self):
+        self.calls = []
+        self.version = 0
+        self.fail = False
+
+    def __call__(self, symbols):
+        self.calls.append(sorted(symbols))
+        if self.fail:
+            raise RuntimeError("exchange down")
+        self.version += 1
+        return {symbol: {"symbol": symbol, "last": self.version} for symbol in symbols}
+
+
+@pytest.fixture
+def fetch():
+    return RecordingFetch()
+
+
+@pytest.fixture
+def snapshot(fetch):
+    snapshot = TickerSnapshot(fetch, refresh_interval=60, ttl=30)
+    yield snapshot
+    snapshot.stop()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ticker_snapshot, "time", clock)
+    return clock
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_missing_symbols_are_fetched_on_read(snapshot, fetch, clock):
+    tickers = snapshot.get(["BTC/USDT", "ETH/USDT"])
+    assert set(tickers) == {"BTC/USDT", "ETH/USDT"}
+    assert fetch.calls == [["BTC/USDT", "ETH/USDT"]]
+    assert snapshot._thread.is_alive()
+
+
+def test_fresh_tickers_are_served_from_memory(snapshot, fetch, clock):
+    first = snapshot.get(["BTC/USDT"])
+    clock.now += 29
+    assert snapshot.get(["BTC/USDT"]) == first
+    assert len(fetch.calls) == 1
+
+
+def test_only_stale_symbols_are_refetched(snapshot, fetch, clock):
+    snapshot.get(["BTC/USDT"])
+    clock.now += 20
+    snapshot.get(["ETH/USDT"])
+    clock.now += 15
+
+    tickers = snapshot.get(["BTC/USDT", "ETH/USDT"])
+    assert fetch.calls[-1] == ["BTC/USDT"]
+    assert tickers["BTC/USDT"]["last"] == 3
+    assert tickers["ETH/USDT"]["last"] == 2
+
+
+def test_fetch_error_keeps_the_previous_tickers(snapshot, fetch, clock):
+    first = snapshot.get(["BTC/USDT"])
+    clock.now += 60
+    fetch.fail = True
+    assert snapshot.get(["BTC/USDT"]) == first
+    assert snapshot.get(["SOL/USDT"]) == {}
+
+
+def test_pushed_tickers_are_stored(snapshot, fetch, clock):
+    snapshot.update({"BTC/USDT": {"last": 42}, "ETH/USDT": None})
+    assert snapshot.get(["BTC/USDT"]) == {"BTC/USDT": {"last": 42}}
+    assert fetch.calls == []
+    assert snapshot.updated_at(["ETH/USDT"]) is None
+
+
+def test_updated_at_is_the_oldest_ticker(snapshot, clock):
+    snapshot.update({"BTC/USDT": {"last": 1}})
+    clock.now += 10
+    snapshot.update({"ETH/USDT": {"last": 2}})
+    assert snapshot.updated_at(["BTC/USDT", "ETH/USDT", "XRP/USDT"]) == clock.now - 10
+    assert snapshot.updated_at(["ETH/USDT"]) == clock.now
+    assert snapshot.updated_at([]) is None
+
+
+def test_watched_symbols_are_refreshed_in_the_background(fetch):
+    snapshot = TickerSnapshot(fetch, refresh_interval=0.05, ttl=30)
+    try:
+        snapshot.get(["BTC/USDT"])
+        wait_for(lambda: len(fetch.calls) >= 3)
+        assert all(call == ["BTC/USDT"] for call in fetch.calls)
+        assert snapshot.get(["BTC/USDT"])["BTC/USDT"]["last"] >= 3
+    finally:
+        snapshot.stop()
+    assert not snapshot._thread.is_alive()
+
+
+def test_idle_symbols_stop_being_refreshed(fetch):
+    snapshot = TickerSnapshot(fetch, refresh_interval=0.05, ttl=30, idle_timeout=0.2)
+    try:
+        snapshot.get(["BTC/USDT"])
+        wait_for(lambda: not snapshot._watched)
+        calls = len(fetch.calls)
+        time.sleep(0.2)
+        assert len(fetch.calls) == calls
+    finally:
+        snapshot.stop()
+
+
+def test_one_refresher_serves_many_readers(fetch):
+    snapshot = TickerSnapshot(fetch, refresh_interval=0.05, ttl=30)
+    try:
+        readers = [threading.Thread(target=snapshot.get, args=(["BTC/USDT"],)) for _ in range(20)]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+        assert sum(thread.name == "ticker-snapshot" for thread in threading.enumerate()) == 1
+    finally:
+        snapshot.stop()
@@ -0,0 +1,223 @@
+"""Strategy signals: the get_signal fast path and the whole-history series"""
+import numpy as np
+import pytest
+
+from indicators import calculate_indicators
+from indicator_reference import make_candles
+from trading_strategies import MACrossoverStrategy, RSIStrategy, StrategyRegistry, get_strategy_by_name
+
+STRATEGIES = [
+    ("MA_CROSSOVER", {"fast_period": 5, "slow_period": 12}),
+    ("MA_CROSSOVER", {}),
+    ("RSI", {"period": 7, "oversold": 40, "overbought": 60}),
+    ("MACD", {"fast_period": 5, "slow_period": 10, "signal_period": 3}),
+    ("BOLLINGER_BANDS", {"period": 10, "std_dev": 1.0}),
+    ("BOLLINGER_BANDS", {"period": 10, "std_dev": 1.0, "use_close_price": False}),
+]
+
+
+@pytest.mark.parametrize("strategy_type,parameters", STRATEGIES)
+@pytest.mark.parametrize("seed", [0, 1])
+def test_get_signal_matches_analyze(strategy_type, parameters, seed):
+    candles = make_candles(300, seed)
+    strategy = get_strategy_by_name(strategy_type, parameters)
+
+    signals = []
+    for end in range(1, len(candles) + 1):
+        analysis = strategy.analyze(candles[:end])
+        expected = analysis.get("signal", "NEUTRAL")
+        assert strategy.get_signal(candles[:end]) == expected
+        signals.append(expected)
+    # The comparison is only meaningful if the strategy actually signals
+    assert {"BUY", "SELL"} & set(signals)
+
+
+@pytest.mark.parametrize("strategy_type,parameters", STRATEGIES)
+def test_get_signal_does_not_go_through_analyze(strategy_type, parameters, monkeypatch):
+    candles = make_candles(160, seed=0)
+    strategy = get_strategy_by_name(strategy_type, parameters)
+    expected = strategy.get_signal(candles)
+
+    def analyze(*args, **kwargs):
+        raise AssertionError("get_signal called analyze")
+
+    monkeypatch.setattr(type(strategy), "analyze", analyze)
+    assert strategy.get_signal(candles) == expected
+
+
+@pytest.mark.parametrize("strategy_type,parameters", STRATEGIES)
+def test_get_signal_with_shared_indicator_set(strategy_type, parameters):
+    candles = make_candles(160, seed=1)
+    strategy = get_strategy_by_name(strategy_type, parameters)
+    for end in (40, 100, 160):
+        indicator_set = calculate_indicators(candles[:end])
+        assert strategy.get_signal(candles[:end], indicator_set) == strategy.get_signal(candles[:end])
+
+
+@pytest.mark.parametrize("strategy_type,parameters", STRATEGIES)
+def test_get_signal_accepts_candle_dicts(strategy_type, parameters):
+    candles = make_candles(160, seed=0)
+    strategy = get_strategy_by_name(strategy_type, parameters)
+    for end in (60, 100, 160):
+        assert strategy.get_signal(candles[:end].to_dicts()) == strategy.get_signal(candles[:end])
+
+
+@pytest.mark.parametrize("strategy_type,parameters,window", [
+    ("MA_CROSSOVER", {"fast_period": 5, "slow_period": 12}, 13),
+    ("BOLLINGER_BANDS", {"period": 10, "std_dev": 1.0}, 11),
+])
+def test_windowed_strategies_only_read_the_tail(strategy_type, parameters, window):
+    candles = make_candles(400, seed=2)
+    strategy = get_strategy_by_name(strategy_type, parameters)
+    for end in range(window, len(candles) + 1, 7):
+        assert strategy.get_signal(candles[:end]) == strategy.get_signal(candles[end - window:end])
+
+
+@pytest.mark.parametrize("strategy_type,parameters", STRATEGIES)
+def test_get_signal_without_enough_data_is_neutral(strategy_type, parameters):
+    strategy = get_strategy_by_name(strategy_type, parameters)
+    assert strategy.get_signal([]) == "NEUTRAL"
+    assert strategy.get_signal(make_candles(3, seed=0)) == "NEUTRAL"
+
+
+
+@pytest.mark.parametrize("strategy_type,parameters", STRATEGIES)
+@pytest.mark.parametrize("seed", [0, 1])
+def test_signal_series_matches_get_signal(strategy_type, parameters, seed):
+    candles = make_candles(160, seed)
+    strategy = get_strategy_by_name(strategy_type, parameters)
+
+    series = strategy.signal_series(candles)
+    expected = [strategy.get_signal(candles[:i + 1]) for i in range(len(candles))]
+    assert list(series) == expected
+
+
+class FixedRSI:
+    """Indicator set stand-in that returns a given RSI array"""
+
+    def __init__(self, rsi):
+        self.rsi = np.array(rsi, dtype=np.float64)
+
+    def compute(self, name, **params):
+        assert name == "rsi"
+        return self.rsi
+
+
+# RSI arrays as the kernel lays them out: the value including bar i sits at
+# index i - 1, so the last element is always NaN
+NAN = float("nan")
+CROSSES_BELOW_OVERSOLD = [NAN, 55.0, 45.0, 35.0, NAN]
+CROSSES_ABOVE_OVERBOUGHT = [NAN, 45.0, 55.0, 65.0, NAN]
+STAYS_BELOW_OVERSOLD = [NAN, 38.0, 35.0, 31.0, NAN]
+
+
+@pytest.mark.parametrize("rsi,signal", [
+    (CROSSES_BELOW_OVERSOLD, "BUY"),
+    (CROSSES_ABOVE_OVERBOUGHT, "SELL"),
+    (STAYS_BELOW_OVERSOLD, "NEUTRAL"),
+])
+def test_rsi_signals_on_threshold_crossings(rsi, signal):
+    strategy = RSIStrategy({"period": 3, "oversold": 40, "overbought": 60})
+    candles = make_candles(len(rsi), seed=0)
+    indicators = FixedRSI(rsi)
+
+    assert strategy.get_signal(candles, indicators) == signal
+    analysis = strategy.analyze(candles, indicators)
+    assert analysis["signal"] == signal
+    assert analysis["latest_rsi"] == rsi[-2]
+    assert analysis["prev_rsi"] == rsi[-3]
+
+
+@pytest.mark.parametrize("rsi", [CROSSES_BELOW_OVERSOLD, CROSSES_ABOVE_OVERBOUGHT])
+def test_rsi_previous_value_is_not_the_latest(rsi):
+    # The lookup used to start at the second-to-last bar like the other
+    # strategies. That bar holds the latest RSI, so prev_rsi equalled
+    # latest_rsi and no crossing could ever be seen.
+    strategy = RSIStrategy({"period": 3, "oversold": 40, "overbought": 60})
+    rsi = np.array(rsi)
+    latest = strategy._latest_valid(rsi)
+
+    old_prev, = strategy._previous_valid(rsi)
+    assert old_prev == latest
+    assert strategy._signal(latest, old_prev) == "NEUTRAL"
+
+    assert strategy._previous_rsi(rsi) == rsi[-3]
+    assert strategy._signal(latest, strategy._previous_rsi(rsi)) != "NEUTRAL"
+
+
+def test_rsi_strategy_signals_on_real_prices():
+    strategy = RSIStrategy({"period": 7, "oversold": 40, "overbought": 60})
+    signals = strategy.signal_series(make_candles(300, seed=0))
+    assert {"BUY", "SELL"} <= set(signals)
+
+
+class CountingRSI(RSIStrategy):
+    """RSI strategy whose signal is its call number, counting get_signal calls"""
+
+    def __init__(self, parameters=None):
+        super().__init__(parameters)
+        self.calls = 0
+
+    def get_signal(self, ohlcv_data, indicators=None):
+        self.calls += 1
+        return f"signal {self.calls}"
+
+
+def test_latest_signal_is_memoized_per_candles():
+    candles = make_candles(100, seed=0)
+    strategy = CountingRSI()
+
+    assert strategy.latest_signal(candles) == "signal 1"
+    assert strategy.latest_signal(candles[:]) == "signal 1"
+    assert strategy.calls == 1
+    # A new candle, or a revised forming one, is evaluated again
+    assert strategy.latest_signal(candles[:-1]) == "signal 2"
+    revised = make_candles(100, seed=1)
+    assert revised.timestamp[-1] == candles.timestamp[-1]
+    assert strategy.latest_signal(revised) == "signal 3"
+    assert strategy.calls == 3
+
+
+
+def test_registry_reuses_instances_until_the_version_changes():
+    registry = StrategyRegistry()
+    first = registry.get(1, "RSI", {"period": 7}, version=1)
+    assert isinstance(first, RSIStrategy) and first.parameters["period"] == 7
+    assert registry.get(1, "RSI", {"period": 7}, version=1) is first
+
+    updated = registry.get(1, "RSI", {"period": 9}, version=2)
+    assert updated is not first and updated.parameters["period"] == 9
+    # Changing the type rebuilds even at the same version
+    assert isinstance(registry.get(1, "MA_CROSSOVER", {}, version=2), MACrossoverStrategy)
+    assert registry.stats() == {'instances': 1, 'hits': 1, 'builds': 3}
+
+
+def test_registry_instances_keep_their_signal_memo():
+    registry = StrategyRegistry()
+    candles = make_candles(100, seed=0)
+    signal = registry.get(1, "RSI", {}, version=1).latest_signal(candles)
+
+    strategy = registry.get(1, "RSI", {}, version=1)
+    calls = []
+    strategy.get_signal = lambda *args: calls.append(args)
+    assert strategy.latest_signal(candles) == signal
+    assert calls == []
+
+
+def test_registry_retain_drops_other_strategies():
+    registry = StrategyRegistry()
+    kept = registry.get(1, "RSI", {}, version=1)
+    registry.get(2, "MACD", {}, version=1)
+    registry.retain([1, 3])
+
+    assert registry.stats()['instances'] == 1
+    assert registry.get(1, "RSI", {}, version=1) is kept
+    assert registry.get(2, "MACD", {}, version=1) is not None
+    assert registry.stats()['builds'] == 3
+
+
+def test_registry_unknown_type_is_not_kept():
+    registry = StrategyRegistry()
+    registry.get(1, "RSI", {}, version=1)
+    assert registry.get(1, "NOPE", {}, version=2) is None
+    assert registry.stats()['instances'] == 0
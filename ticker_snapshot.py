@@ -0,0 +1,142 @@
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TickerSnapshot:
+    """
+    In-memory ticker snapshot kept fresh by a background thread
+
+    Readers get tickers from memory; a single refresher thread polls the
+    exchange for the symbols that were requested recently, so the exchange
+    load does not grow with the number of readers. Symbols that are missing
+    or older than the TTL are fetched synchronously on read.
+    """
+
+    def __init__(self, fetch_tickers: Callable[[List[str]], Dict[str, Dict]],
+                 refresh_interval: Optional[float] = None, ttl: Optional[float] = None,
+                 idle_timeout: float = 300.0):
+        """
+        Initialize the ticker snapshot
+
+        Args:
+            fetch_tickers: Function returning tickers keyed by symbol for a list of symbols
+            refresh_interval: Seconds between background refreshes
+                (defaults to TICKER_REFRESH_INTERVAL or 5)
+            ttl: Maximum age in seconds of a ticker served without refetching
+                (defaults to TICKER_TTL or 30)
+            idle_timeout: Seconds after the last read before a symbol stops being refreshed
+        """
+        self.fetch_tickers = fetch_tickers
+        self.refresh_interval = refresh_interval or float(os.environ.get('TICKER_REFRESH_INTERVAL', 5))
+        self.ttl = ttl or float(os.environ.get('TICKER_TTL', 30))
+        self.idle_timeout = idle_timeout
+
+        self._tickers: Dict[str, Dict] = {}
+        self._updated_at: Dict[str, float] = {}
+        self._watched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """Start the background refresher if it is not running"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='ticker-snapshot', daemon=True)
+            self._thread.start()
+        logger.info(f"Ticker snapshot refresher started (every {self.refresh_interval}s)")
+
+    def stop(self) -> None:
+        """Stop the background refresher"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.refresh_interval + 1)
+        logger.info("Ticker snapshot refresher stopped")
+
+    def get(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Get tickers for the given symbols
+
+        Args:
+            symbols: Trading pair symbols
+
+        Returns:
+            Tickers keyed by symbol; symbols without data are left out
+        """
+        symbols = list(symbols)
+        now = time.time()
+        with self._lock:
+            for symbol in symbols:
+                self._watched[symbol] = now
+            stale = [symbol for symbol in symbols if now - self._updated_at.get(symbol, 0) > self.ttl]
+
+        if stale:
+            self.refresh(stale)
+        self.start()
+
+        with self._lock:
+            return {symbol: self._tickers[symbol] for symbol in symbols if symbol in self._tickers}
+
+    def updated_at(self, symbols: Iterable[str]) -> Optional[float]:
+        """
+        Get the time of the oldest ticker among the given symbols
+
+        Args:
+            symbols: Trading pair symbols
+
+        Returns:
+            Unix timestamp, or None if none of the symbols has data
+        """
+        with self._lock:
+            times = [self._updated_at[symbol] for symbol in symbols if symbol in self._updated_at]
+        return min(times) if times else None
+
+    def refresh(self, symbols: List[str]) -> None:
+        """
+        Fetch tickers for the given symbols and store them in the snapshot
+
+        Args:
+            symbols: Trading pair symbols
+        """
+        try:
+            tickers = self.fetch_tickers(symbols)
+        except Exception as e:
+            logger.error(f"Error refreshing tickers: {str(e)}")
+            return
+        self.update(tickers)
+
+    def update(self, tickers: Dict[str, Dict]) -> None:
+        """
+        Store tickers pushed from elsewhere, e.g. a market data stream
+
+        Args:
+            tickers: Tickers keyed by symbol
+        """
+        now = time.time()
+        with self._lock:
+            for symbol, ticker in tickers.items():
+                if ticker:
+                    self._tickers[symbol] = ticker
+                    self._updated_at[symbol] = now
+
+    def _run(self) -> None:
+        """Refresh watched symbols until stopped"""
+        while not self._stop_event.wait(self.refresh_interval):
+            now = time.time()
+            with self._lock:
+                for symbol, last_read in list(self._watched.items()):
+                    if now - last_read > self.idle_timeout:
+                        del self._watched[symbol]
+                # Skip symbols that were pushed since the last refresh
+                symbols = [symbol for symbol in self._watched
+                           if now - self._updated_at.get(symbol, 0) >= self.refresh_interval]
+
+            if symbols:
+                self.refresh(symbols)
@@ -1,7 +1,10 @@
 import numpy as np
-from typing import Dict, List, Optional, Union, Tuple
+from typing import Any, Dict, Hashable, List, Optional, Union, Tuple
 import logging
-from indicators import calculate_indicators
+import threading
+from candles import Candles, as_candles
+from indicators import (IndicatorSet, calculate_indicators, moving_average_array,
+                        bollinger_bands_array)
 
 logger = logging.getLogger(__name__)
 
@@ -21,29 +24,167 @@ class TradingStrategy:
         self.description = description
         self.parameters = parameters or {}
         
-    def analyze(self, ohlcv_data: List[Dict]) -> Dict:
+        # (candles key, signal) of the last latest_signal() call; replaced as one
+        # tuple so threads sharing the instance never pair a key with another's signal
+        self._memo: Optional[Tuple[Tuple, str]] = None
+        
+    def analyze(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> Dict:
         """
         Analyze market data and generate signals
         
         Args:
-            ohlcv_data: List of OHLCV data dictionaries
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
             
         Returns:
             Dictionary with analysis results
         """
         raise NotImplementedError("Subclasses must implement analyze method")
     
-    def get_signal(self, ohlcv_data: List[Dict]) -> str:
+    def get_signal(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> str:
         """
         Get trading signal based on market data
         
         Args:
-            ohlcv_data: List of OHLCV data dictionaries
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
             
         Returns:
             Signal string: 'BUY', 'SELL', or 'NEUTRAL'
         """
         raise NotImplementedError("Subclasses must implement get_signal method")
+    
+    def latest_signal(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> str:
+        """
+        Get the trading signal, reusing the previous result for unchanged candles
+        
+        Instances kept in strategy_registry live across bot cycles and
+        requests, so repeated evaluations of the same candles (e.g. dashboard
+        refreshes between candle closes) skip the indicator work.
+        
+        Args:
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
+            
+        Returns:
+            Signal string: 'BUY', 'SELL', or 'NEUTRAL'
+        """
+        candles = as_candles(ohlcv_data)
+        if not len(candles):
+            return self.get_signal(candles, indicators)
+        
+        key = (len(candles), int(candles.timestamp[0]), int(candles.timestamp[-1]), float(candles.close[-1]))
+        memo = self._memo
+        if memo is not None and memo[0] == key:
+            return memo[1]
+        signal = self.get_signal(candles, indicators)
+        self._memo = (key, signal)
+        return signal
+    
+    def signal_series(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> np.ndarray:
+        """
+        Get the trading signal for every bar at once
+        
+        Element i is the signal get_signal would return for ohlcv_data[:i + 1],
+        computed with array comparisons of shifted indicator arrays.
+        
+        Args:
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
+            
+        Returns:
+            Array of 'BUY', 'SELL' or 'NEUTRAL' strings, one per candle
+        """
+        raise NotImplementedError("Subclasses must implement signal_series method")
+    
+    def required_indicators(self) -> List[Tuple[str, Dict]]:
+        """
+        Get the indicators get_signal reads from the indicator set
+        
+        Lets callers evaluating many pairs compute them for all pairs at once
+        (see indicators.compute_batch) before asking for signals.
+        
+        Returns:
+            List of (indicator name, parameters) tuples
+        """
+        return []
+    
+    @staticmethod
+    def _shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+        """Shift an array forward by periods bars, filling the start with NaN"""
+        shifted = np.full(len(values), np.nan)
+        shifted[periods:] = values[:len(values) - periods]
+        return shifted
+    
+    @staticmethod
+    def _ready(*series: np.ndarray) -> np.ndarray:
+        """Bars where every value is valid and non-zero, as the signal checks require"""
+        ready = np.ones(len(series[0]), dtype=bool)
+        for values in series:
+            ready &= ~np.isnan(values) & (values != 0)
+        return ready
+    
+    @staticmethod
+    def _combine_signals(buy: np.ndarray, sell: np.ndarray) -> np.ndarray:
+        """Build the signal array from BUY and SELL masks, BUY taking precedence"""
+        signals = np.full(len(buy), "NEUTRAL", dtype="<U7")
+        signals[sell] = "SELL"
+        signals[buy] = "BUY"
+        return signals
+    
+    @classmethod
+    def _crossover_series(cls, fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+        """Signals for a line crossing above (BUY) or below (SELL) another line"""
+        prev_fast = cls._shift(fast)
+        prev_slow = cls._shift(slow)
+        ready = cls._ready(fast, slow, prev_fast, prev_slow)
+        with np.errstate(invalid='ignore'):
+            buy = ready & (fast > slow) & (prev_fast <= prev_slow)
+            sell = ready & (fast < slow) & (prev_fast >= prev_slow)
+        return cls._combine_signals(buy, sell)
+    
+    @staticmethod
+    def _latest_valid(values: np.ndarray) -> Optional[float]:
+        """
+        Get the most recent non-NaN value of an indicator series
+        
+        Args:
+            values: Indicator array
+            
+        Returns:
+            Latest valid value or None
+        """
+        valid = np.flatnonzero(~np.isnan(values))
+        return float(values[valid[-1]]) if len(valid) else None
+    
+    @staticmethod
+    def _previous_valid(*series: np.ndarray) -> List[Optional[float]]:
+        """
+        Get the previous values of one or more indicator series
+        
+        Walks back from the second-to-last bar until every series has a
+        valid value, keeping the value at the furthest bar visited for each
+        series. Only the last few bars are touched once the series are
+        warmed up.
+        
+        Args:
+            *series: Indicator arrays of equal length
+            
+        Returns:
+            List with the previous value (or None) for each series
+        """
+        previous = [None] * len(series)
+        length = len(series[0])
+        if length <= 1:
+            return previous
+        
+        idx = -2
+        while idx >= -length and any(value is None for value in previous):
+            for i, values in enumerate(series):
+                if not np.isnan(values[idx]):
+                    previous[i] = float(values[idx])
+            idx -= 1
+        return previous
 
 
 class MACrossoverStrategy(TradingStrategy):
@@ -71,12 +212,22 @@ class MACrossoverStrategy(TradingStrategy):
             parameters=default_params
         )
     
-    def analyze(self, ohlcv_data: List[Dict]) -> Dict:
+    def _signal(self, latest_fast, latest_slow, prev_fast, prev_slow) -> str:
+        """Decide the crossover signal from the latest and previous MA values"""
+        if latest_fast and latest_slow and prev_fast and prev_slow:
+            if latest_fast > latest_slow and prev_fast <= prev_slow:
+                return "BUY"
+            elif latest_fast < latest_slow and prev_fast >= prev_slow:
+                return "SELL"
+        return "NEUTRAL"
+    
+    def analyze(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> Dict:
         """
         Analyze market data using MA crossover
         
         Args:
-            ohlcv_data: List of OHLCV data dictionaries
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
             
         Returns:
             Dictionary with analysis results
@@ -84,72 +235,74 @@ class MACrossoverStrategy(TradingStrategy):
         if not ohlcv_data or len(ohlcv_data) < self.parameters["slow_period"]:
             return {"error": "Insufficient data for analysis"}
         
-        # Calculate indicators
-        indicators = calculate_indicators(ohlcv_data)
+        # Calculate indicators unless the caller passed in a shared set
+        if indicators is None:
+            indicators = calculate_indicators(ohlcv_data)
         
-        # Get MA values based on parameters
-        fast_key = f"sma_{self.parameters['fast_period']}"
-        slow_key = f"sma_{self.parameters['slow_period']}"
+        # Get MA values for the configured periods
+        fast_ma = indicators.compute("sma", period=self.parameters["fast_period"])
+        slow_ma = indicators.compute("sma", period=self.parameters["slow_period"])
         
-        # Use default MAs if the requested ones aren't available
-        if fast_key not in indicators:
-            fast_ma = indicators.get("sma_20", [])
-        else:
-            fast_ma = indicators[fast_key]
-            
-        if slow_key not in indicators:
-            slow_ma = indicators.get("sma_50", [])
-        else:
-            slow_ma = indicators[slow_key]
-        
-        # Get the most recent valid values
-        latest_fast = next((x for x in reversed(fast_ma) if not np.isnan(x)), None)
-        latest_slow = next((x for x in reversed(slow_ma) if not np.isnan(x)), None)
+        # Get the most recent valid values and the previous ones
+        latest_fast = self._latest_valid(fast_ma)
+        latest_slow = self._latest_valid(slow_ma)
+        prev_fast, prev_slow = self._previous_valid(fast_ma, slow_ma)
         
-        # Get previous values
-        prev_idx = -2
-        prev_fast = None
-        prev_slow = None
-        
-        if len(fast_ma) > 1 and len(slow_ma) > 1:
-            while prev_idx >= -len(fast_ma) and (prev_fast is None or prev_slow is None):
-                if not np.isnan(fast_ma[prev_idx]):
-                    prev_fast = fast_ma[prev_idx]
-                if not np.isnan(slow_ma[prev_idx]):
-                    prev_slow = slow_ma[prev_idx]
-                prev_idx -= 1
-        
-        result = {
-            "fast_ma": fast_ma,
-            "slow_ma": slow_ma,
+        return {
+            "fast_ma": fast_ma.tolist(),
+            "slow_ma": slow_ma.tolist(),
             "latest_fast": latest_fast,
             "latest_slow": latest_slow,
             "prev_fast": prev_fast,
             "prev_slow": prev_slow,
-            "signal": "NEUTRAL"
+            "signal": self._signal(latest_fast, latest_slow, prev_fast, prev_slow)
         }
-        
-        # Determine signal
-        if latest_fast and latest_slow and prev_fast and prev_slow:
-            if latest_fast > latest_slow and prev_fast <= prev_slow:
-                result["signal"] = "BUY"
-            elif latest_fast < latest_slow and prev_fast >= prev_slow:
-                result["signal"] = "SELL"
-        
-        return result
     
-    def get_signal(self, ohlcv_data: List[Dict]) -> str:
+    def get_signal(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> str:
         """
         Get trading signal based on MA crossover
         
+        Only the last slow_period + 1 candles are needed for the latest and
+        previous moving averages, so just that tail is evaluated.
+        
         Args:
-            ohlcv_data: List of OHLCV data dictionaries
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
             
         Returns:
             Signal string: 'BUY', 'SELL', or 'NEUTRAL'
         """
-        analysis = self.analyze(ohlcv_data)
-        return analysis.get("signal", "NEUTRAL")
+        slow_period = self.parameters["slow_period"]
+        if not ohlcv_data or len(ohlcv_data) < slow_period:
+            return "NEUTRAL"
+        
+        window = max(self.parameters["fast_period"], slow_period) + 1
+        close_prices = as_candles(ohlcv_data[-window:]).close
+        fast_ma = moving_average_array(close_prices, self.parameters["fast_period"])
+        slow_ma = moving_average_array(close_prices, slow_period)
+        
+        prev_fast, prev_slow = self._previous_valid(fast_ma, slow_ma)
+        return self._signal(self._latest_valid(fast_ma), self._latest_valid(slow_ma), prev_fast, prev_slow)
+    
+    def signal_series(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> np.ndarray:
+        """
+        Get the MA crossover signal for every bar at once
+        
+        Args:
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
+            
+        Returns:
+            Array of 'BUY', 'SELL' or 'NEUTRAL' strings, one per candle
+        """
+        if indicators is None:
+            indicators = calculate_indicators(ohlcv_data)
+        if not ohlcv_data:
+            return np.array([], dtype="<U7")
+        
+        fast_ma = indicators.compute("sma", period=self.parameters["fast_period"])
+        slow_ma = indicators.compute("sma", period=self.parameters["slow_period"])
+        return self._crossover_series(fast_ma, slow_ma)
 
 
 class RSIStrategy(TradingStrategy):
@@ -178,12 +331,47 @@ class RSIStrategy(TradingStrategy):
             parameters=default_params
         )
     
-    def analyze(self, ohlcv_data: List[Dict]) -> Dict:
+    def _signal(self, latest_rsi, prev_rsi) -> str:
+        """Decide the signal from the latest and previous RSI values"""
+        if latest_rsi is not None and prev_rsi is not None:
+            if latest_rsi < self.parameters["oversold"] and prev_rsi >= self.parameters["oversold"]:
+                return "BUY"
+            elif latest_rsi > self.parameters["overbought"] and prev_rsi <= self.parameters["overbought"]:
+                return "SELL"
+        return "NEUTRAL"
+    
+    def required_indicators(self) -> List[Tuple[str, Dict]]:
+        """Get the indicators get_signal reads from the indicator set"""
+        return [("rsi", {"period": self.parameters["period"]})]
+    
+    def _rsi(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet]) -> np.ndarray:
+        """Get the RSI series for the configured period"""
+        if indicators is None:
+            indicators = calculate_indicators(ohlcv_data)
+        return indicators.compute("rsi", period=self.parameters["period"])
+    
+    def _previous_rsi(self, rsi: np.ndarray) -> Optional[float]:
+        """
+        Get the valid RSI value before the latest one
+        
+        The RSI including bar i is stored at index i - 1, so the last element
+        is always NaN and the latest value sits at the second-to-last bar.
+        The scan therefore starts one bar earlier than _previous_valid does.
+        Scanning from the second-to-last bar returned the latest value
+        again, so prev_rsi always equalled latest_rsi and the strategy could
+        never signal; live RSI strategies signal on threshold crossings
+        since this lookup changed.
+        """
+        prev_rsi, = self._previous_valid(rsi[:-1])
+        return prev_rsi
+    
+    def analyze(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> Dict:
         """
         Analyze market data using RSI
         
         Args:
-            ohlcv_data: List of OHLCV data dictionaries
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
             
         Returns:
             Dictionary with analysis results
@@ -191,57 +379,66 @@ class RSIStrategy(TradingStrategy):
         if not ohlcv_data or len(ohlcv_data) < self.parameters["period"]:
             return {"error": "Insufficient data for analysis"}
         
-        # Calculate indicators
-        indicators = calculate_indicators(ohlcv_data)
-        
-        # Get RSI values
-        rsi_key = f"rsi_{self.parameters['period']}"
-        if rsi_key not in indicators:
-            rsi = indicators.get("rsi_14", [])
-        else:
-            rsi = indicators[rsi_key]
-        
-        # Get the latest valid RSI value
-        latest_rsi = next((x for x in reversed(rsi) if not np.isnan(x)), None)
-        
-        # Get previous RSI value
-        prev_idx = -2
-        prev_rsi = None
+        rsi = self._rsi(ohlcv_data, indicators)
         
-        if len(rsi) > 1:
-            while prev_idx >= -len(rsi) and prev_rsi is None:
-                if not np.isnan(rsi[prev_idx]):
-                    prev_rsi = rsi[prev_idx]
-                prev_idx -= 1
+        # Get the latest valid RSI value and the previous one
+        latest_rsi = self._latest_valid(rsi)
+        prev_rsi = self._previous_rsi(rsi)
         
-        result = {
-            "rsi": rsi,
+        return {
+            "rsi": rsi.tolist(),
             "latest_rsi": latest_rsi,
             "prev_rsi": prev_rsi,
-            "signal": "NEUTRAL"
+            "signal": self._signal(latest_rsi, prev_rsi)
         }
-        
-        # Determine signal
-        if latest_rsi is not None and prev_rsi is not None:
-            if latest_rsi < self.parameters["oversold"] and prev_rsi >= self.parameters["oversold"]:
-                result["signal"] = "BUY"
-            elif latest_rsi > self.parameters["overbought"] and prev_rsi <= self.parameters["overbought"]:
-                result["signal"] = "SELL"
-        
-        return result
     
-    def get_signal(self, ohlcv_data: List[Dict]) -> str:
+    def get_signal(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> str:
         """
         Get trading signal based on RSI
         
+        Wilder smoothing depends on the whole history, so the full RSI array
+        is computed (or taken from the shared set), but only its last values
+        are read and no result lists are built.
+        
         Args:
-            ohlcv_data: List of OHLCV data dictionaries
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
             
         Returns:
             Signal string: 'BUY', 'SELL', or 'NEUTRAL'
         """
-        analysis = self.analyze(ohlcv_data)
-        return analysis.get("signal", "NEUTRAL")
+        if not ohlcv_data or len(ohlcv_data) < self.parameters["period"]:
+            return "NEUTRAL"
+        
+        rsi = self._rsi(ohlcv_data, indicators)
+        return self._signal(self._latest_valid(rsi), self._previous_rsi(rsi))
+    
+    def signal_series(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> np.ndarray:
+        """
+        Get the RSI signal for every bar at once
+        
+        Args:
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
+            
+        Returns:
+            Array of 'BUY', 'SELL' or 'NEUTRAL' strings, one per candle
+        """
+        if not ohlcv_data:
+            return np.array([], dtype="<U7")
+        
+        # The RSI including bar i is stored at index i - 1
+        rsi = self._rsi(ohlcv_data, indicators)
+        latest_rsi = self._shift(rsi, 1)
+        prev_rsi = self._shift(rsi, 2)
+        ready = ~np.isnan(latest_rsi) & ~np.isnan(prev_rsi)
+        
+        oversold = self.parameters["oversold"]
+        overbought = self.parameters["overbought"]
+        with np.errstate(invalid='ignore'):
+            buy = ready & (latest_rsi < oversold) & (prev_rsi >= oversold)
+            sell = ready & (latest_rsi > overbought) & (prev_rsi <= overbought)
+        return self._combine_signals(buy, sell)
 
 
 class MACDStrategy(TradingStrategy):
@@ -270,77 +467,113 @@ class MACDStrategy(TradingStrategy):
             parameters=default_params
         )
     
-    def analyze(self, ohlcv_data: List[Dict]) -> Dict:
+    def _signal(self, latest_macd, latest_signal, prev_macd, prev_signal) -> str:
+        """Decide the crossover signal from the latest and previous MACD values"""
+        if latest_macd and latest_signal and prev_macd and prev_signal:
+            if latest_macd > latest_signal and prev_macd <= prev_signal:
+                return "BUY"
+            elif latest_macd < latest_signal and prev_macd >= prev_signal:
+                return "SELL"
+        return "NEUTRAL"
+    
+    def _has_enough_data(self, ohlcv_data: Union[Candles, List[Dict]]) -> bool:
+        """Check that there are enough candles for the signal line"""
+        return bool(ohlcv_data) and len(ohlcv_data) >= self.parameters["slow_period"] + self.parameters["signal_period"]
+    
+    def required_indicators(self) -> List[Tuple[str, Dict]]:
+        """Get the indicators get_signal reads from the indicator set"""
+        return [("macd", {
+            "fast_period": self.parameters["fast_period"],
+            "slow_period": self.parameters["slow_period"],
+            "signal_period": self.parameters["signal_period"]
+        })]
+    
+    def _macd(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet]) -> Dict[str, np.ndarray]:
+        """Get the MACD lines for the configured periods"""
+        if indicators is None:
+            indicators = calculate_indicators(ohlcv_data)
+        return indicators.compute(
+            "macd",
+            fast_period=self.parameters["fast_period"],
+            slow_period=self.parameters["slow_period"],
+            signal_period=self.parameters["signal_period"]
+        )
+    
+    def analyze(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> Dict:
         """
         Analyze market data using MACD
         
         Args:
-            ohlcv_data: List of OHLCV data dictionaries
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
             
         Returns:
             Dictionary with analysis results
         """
-        if not ohlcv_data or len(ohlcv_data) < self.parameters["slow_period"] + self.parameters["signal_period"]:
+        if not self._has_enough_data(ohlcv_data):
             return {"error": "Insufficient data for analysis"}
         
-        # Calculate indicators
-        indicators = calculate_indicators(ohlcv_data)
+        macd_data = self._macd(ohlcv_data, indicators)
+        macd_line = macd_data["macd"]
+        signal_line = macd_data["signal"]
         
-        # Get MACD values
-        macd_data = indicators.get("macd", {})
-        macd_line = macd_data.get("macd", [])
-        signal_line = macd_data.get("signal", [])
-        histogram = macd_data.get("histogram", [])
+        # Get the latest valid values and the previous ones
+        latest_macd = self._latest_valid(macd_line)
+        latest_signal = self._latest_valid(signal_line)
+        prev_macd, prev_signal = self._previous_valid(macd_line, signal_line)
         
-        # Get the latest valid values
-        latest_macd = next((x for x in reversed(macd_line) if not np.isnan(x)), None)
-        latest_signal = next((x for x in reversed(signal_line) if not np.isnan(x)), None)
-        
-        # Get previous values
-        prev_idx = -2
-        prev_macd = None
-        prev_signal = None
-        
-        if len(macd_line) > 1 and len(signal_line) > 1:
-            while prev_idx >= -len(macd_line) and (prev_macd is None or prev_signal is None):
-                if not np.isnan(macd_line[prev_idx]):
-                    prev_macd = macd_line[prev_idx]
-                if not np.isnan(signal_line[prev_idx]):
-                    prev_signal = signal_line[prev_idx]
-                prev_idx -= 1
-        
-        result = {
-            "macd_line": macd_line,
-            "signal_line": signal_line,
-            "histogram": histogram,
+        return {
+            "macd_line": macd_line.tolist(),
+            "signal_line": signal_line.tolist(),
+            "histogram": macd_data["histogram"].tolist(),
             "latest_macd": latest_macd,
             "latest_signal": latest_signal,
             "prev_macd": prev_macd,
             "prev_signal": prev_signal,
-            "signal": "NEUTRAL"
+            "signal": self._signal(latest_macd, latest_signal, prev_macd, prev_signal)
         }
-        
-        # Determine signal
-        if latest_macd and latest_signal and prev_macd and prev_signal:
-            if latest_macd > latest_signal and prev_macd <= prev_signal:
-                result["signal"] = "BUY"
-            elif latest_macd < latest_signal and prev_macd >= prev_signal:
-                result["signal"] = "SELL"
-        
-        return result
     
-    def get_signal(self, ohlcv_data: List[Dict]) -> str:
+    def get_signal(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> str:
         """
         Get trading signal based on MACD
         
+        The EMAs depend on the whole history, so the MACD arrays are computed
+        in full (or taken from the shared set), but only their last values
+        are read and no result lists are built.
+        
         Args:
-            ohlcv_data: List of OHLCV data dictionaries
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
             
         Returns:
             Signal string: 'BUY', 'SELL', or 'NEUTRAL'
         """
-        analysis = self.analyze(ohlcv_data)
-        return analysis.get("signal", "NEUTRAL")
+        if not self._has_enough_data(ohlcv_data):
+            return "NEUTRAL"
+        
+        macd_data = self._macd(ohlcv_data, indicators)
+        macd_line = macd_data["macd"]
+        signal_line = macd_data["signal"]
+        prev_macd, prev_signal = self._previous_valid(macd_line, signal_line)
+        return self._signal(self._latest_valid(macd_line), self._latest_valid(signal_line),
+                            prev_macd, prev_signal)
+    
+    def signal_series(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> np.ndarray:
+        """
+        Get the MACD crossover signal for every bar at once
+        
+        Args:
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
+            
+        Returns:
+            Array of 'BUY', 'SELL' or 'NEUTRAL' strings, one per candle
+        """
+        if not ohlcv_data:
+            return np.array([], dtype="<U7")
+        
+        macd_data = self._macd(ohlcv_data, indicators)
+        return self._crossover_series(macd_data["macd"], macd_data["signal"])
 
 
 class BollingerBandsStrategy(TradingStrategy):
@@ -369,12 +602,29 @@ class BollingerBandsStrategy(TradingStrategy):
             parameters=default_params
         )
     
-    def analyze(self, ohlcv_data: List[Dict]) -> Dict:
+    def _signal(self, latest_upper, latest_lower, latest_close, prev_upper, prev_lower, prev_close) -> str:
+        """Decide the band-touch signal from the latest and previous band values"""
+        if latest_upper and latest_lower and latest_close and prev_upper and prev_lower and prev_close:
+            # Check if price touched or crossed the lower band (buy signal)
+            if latest_close <= latest_lower and prev_close > prev_lower:
+                return "BUY"
+            # Check if price touched or crossed the upper band (sell signal)
+            elif latest_close >= latest_upper and prev_close < prev_upper:
+                return "SELL"
+        return "NEUTRAL"
+    
+    @staticmethod
+    def _previous_band(band: np.ndarray) -> Optional[float]:
+        """Get the band value of the previous bar if it is valid"""
+        return float(band[-2]) if len(band) > 1 and not np.isnan(band[-2]) else None
+    
+    def analyze(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> Dict:
         """
         Analyze market data using Bollinger Bands
         
         Args:
-            ohlcv_data: List of OHLCV data dictionaries
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
             
         Returns:
             Dictionary with analysis results
@@ -382,64 +632,107 @@ class BollingerBandsStrategy(TradingStrategy):
         if not ohlcv_data or len(ohlcv_data) < self.parameters["period"]:
             return {"error": "Insufficient data for analysis"}
         
-        # Calculate indicators
-        indicators = calculate_indicators(ohlcv_data)
+        # Calculate indicators unless the caller passed in a shared set
+        if indicators is None:
+            indicators = calculate_indicators(ohlcv_data)
         
-        # Get Bollinger Bands values
-        bb_data = indicators.get("bollinger", {})
-        upper_band = bb_data.get("upper", [])
-        middle_band = bb_data.get("middle", [])
-        lower_band = bb_data.get("lower", [])
+        # Get Bollinger Bands values for the configured period and width
+        bb_data = indicators.compute(
+            "bollinger",
+            period=self.parameters["period"],
+            std_dev=self.parameters["std_dev"]
+        )
+        upper_band = bb_data["upper"]
+        lower_band = bb_data["lower"]
         
         # Get close prices
-        close_prices = [candle['close'] for candle in ohlcv_data]
+        close_prices = indicators.column("close").tolist()
         
         # Get the latest valid values
-        latest_upper = next((x for x in reversed(upper_band) if not np.isnan(x)), None)
-        latest_middle = next((x for x in reversed(middle_band) if not np.isnan(x)), None)
-        latest_lower = next((x for x in reversed(lower_band) if not np.isnan(x)), None)
+        latest_upper = self._latest_valid(upper_band)
+        latest_middle = self._latest_valid(bb_data["middle"])
+        latest_lower = self._latest_valid(lower_band)
         latest_close = close_prices[-1] if close_prices else None
         
         # Get previous values
-        prev_upper = upper_band[-2] if len(upper_band) > 1 and not np.isnan(upper_band[-2]) else None
-        prev_lower = lower_band[-2] if len(lower_band) > 1 and not np.isnan(lower_band[-2]) else None
+        prev_upper = self._previous_band(upper_band)
+        prev_lower = self._previous_band(lower_band)
         prev_close = close_prices[-2] if len(close_prices) > 1 else None
         
-        result = {
-            "upper_band": upper_band,
-            "middle_band": middle_band,
-            "lower_band": lower_band,
+        return {
+            "upper_band": upper_band.tolist(),
+            "middle_band": bb_data["middle"].tolist(),
+            "lower_band": lower_band.tolist(),
             "close_prices": close_prices,
             "latest_upper": latest_upper,
             "latest_middle": latest_middle,
             "latest_lower": latest_lower,
             "latest_close": latest_close,
-            "signal": "NEUTRAL"
+            "signal": self._signal(latest_upper, latest_lower, latest_close, prev_upper, prev_lower, prev_close)
         }
-        
-        # Determine signal
-        if latest_upper and latest_lower and latest_close and prev_upper and prev_lower and prev_close:
-            # Check if price touched or crossed the lower band (buy signal)
-            if latest_close <= latest_lower and prev_close > prev_lower:
-                result["signal"] = "BUY"
-            # Check if price touched or crossed the upper band (sell signal)
-            elif latest_close >= latest_upper and prev_close < prev_upper:
-                result["signal"] = "SELL"
-        
-        return result
     
-    def get_signal(self, ohlcv_data: List[Dict]) -> str:
+    def get_signal(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> str:
         """
         Get trading signal based on Bollinger Bands
         
+        Only the last period + 1 candles are needed for the latest and
+        previous bands, so just that tail is evaluated.
+        
         Args:
-            ohlcv_data: List of OHLCV data dictionaries
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
             
         Returns:
             Signal string: 'BUY', 'SELL', or 'NEUTRAL'
         """
-        analysis = self.analyze(ohlcv_data)
-        return analysis.get("signal", "NEUTRAL")
+        period = self.parameters["period"]
+        if not ohlcv_data or len(ohlcv_data) < period:
+            return "NEUTRAL"
+        
+        close_prices = as_candles(ohlcv_data[-(period + 1):]).close
+        bb_data = bollinger_bands_array(close_prices, period, self.parameters["std_dev"])
+        upper_band = bb_data["upper"]
+        lower_band = bb_data["lower"]
+        
+        return self._signal(
+            self._latest_valid(upper_band), self._latest_valid(lower_band), close_prices[-1],
+            self._previous_band(upper_band), self._previous_band(lower_band),
+            close_prices[-2] if len(close_prices) > 1 else None
+        )
+    
+    def signal_series(self, ohlcv_data: Union[Candles, List[Dict]], indicators: Optional[IndicatorSet] = None) -> np.ndarray:
+        """
+        Get the Bollinger Bands signal for every bar at once
+        
+        Args:
+            ohlcv_data: OHLCV candles (Candles or list of OHLCV dictionaries)
+            indicators: Precomputed indicator set for ohlcv_data (optional)
+            
+        Returns:
+            Array of 'BUY', 'SELL' or 'NEUTRAL' strings, one per candle
+        """
+        if indicators is None:
+            indicators = calculate_indicators(ohlcv_data)
+        if not ohlcv_data:
+            return np.array([], dtype="<U7")
+        
+        bb_data = indicators.compute(
+            "bollinger",
+            period=self.parameters["period"],
+            std_dev=self.parameters["std_dev"]
+        )
+        upper_band = bb_data["upper"]
+        lower_band = bb_data["lower"]
+        close_prices = indicators.column("close")
+        prev_upper = self._shift(upper_band)
+        prev_lower = self._shift(lower_band)
+        prev_close = self._shift(close_prices)
+        
+        ready = self._ready(upper_band, lower_band, close_prices, prev_upper, prev_lower, prev_close)
+        with np.errstate(invalid='ignore'):
+            buy = ready & (close_prices <= lower_band) & (prev_close > prev_lower)
+            sell = ready & (close_prices >= upper_band) & (prev_close < prev_upper)
+        return self._combine_signals(buy, sell)
 
 
 def get_strategy_by_name(strategy_name: str, parameters: Dict = None) -> Optional[TradingStrategy]:
@@ -468,6 +761,74 @@ def get_strategy_by_name(strategy_name: str, parameters: Dict = None) -> Optiona
         return None
 
 
+class StrategyRegistry:
+    """
+    Live strategy instances keyed by strategy id
+    
+    An instance is rebuilt only when the version of its row (its updated_at
+    timestamp) changes, so instances and their latest_signal() memo survive
+    between bot cycles and requests.
+    """
+    
+    def __init__(self):
+        # Per strategy id: (version, strategy type, instance)
+        self._instances: Dict[Hashable, Tuple[Any, str, TradingStrategy]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+    
+    def get(self, strategy_id: Hashable, strategy_type: str, parameters: Dict = None,
+            version: Any = None) -> Optional[TradingStrategy]:
+        """
+        Get the live instance of a strategy, building it if missing or outdated
+        
+        Args:
+            strategy_id: Id of the strategy row
+            strategy_type: Name of the strategy to create
+            parameters: Parameters for the strategy
+            version: Row version, e.g. its updated_at timestamp
+            
+        Returns:
+            TradingStrategy instance or None if the type is not found
+        """
+        with self._lock:
+            cached = self._instances.get(strategy_id)
+            if cached and cached[0] == version and cached[1] == strategy_type:
+                self.hits += 1
+                return cached[2]
+        
+        instance = get_strategy_by_name(strategy_type, parameters)
+        with self._lock:
+            self.builds += 1
+            if instance:
+                self._instances[strategy_id] = (version, strategy_type, instance)
+            else:
+                self._instances.pop(strategy_id, None)
+        return instance
+    
+    def retain(self, strategy_ids) -> None:
+        """
+        Drop the instances of strategies not in the given ids
+        
+        Args:
+            strategy_ids: Ids of the strategies still in use
+        """
+        strategy_ids = set(strategy_ids)
+        with self._lock:
+            for strategy_id in list(self._instances):
+                if strategy_id not in strategy_ids:
+                    del self._instances[strategy_id]
+    
+    def stats(self) -> Dict[str, int]:
+        """Get the number of live instances, reuses and builds"""
+        with self._lock:
+            return {'instances': len(self._instances), 'hits': self.hits, 'builds': self.builds}
+
+
+# Shared by the bot and the web routes (each worker process has its own)
+strategy_registry = StrategyRegistry()
+
+
 def get_available_strategies() -> List[Dict]:
     """
     Get information about all available strategies